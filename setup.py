@@ -8,4 +8,9 @@ setup(
         "pytest>=7.4.2",
         "pytest-cov>=4.1.0",
     ],
+    entry_points={
+        "console_scripts": [
+            "customer-analytics=src.cli:main",
+        ],
+    },
 )
\ No newline at end of file
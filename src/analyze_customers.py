@@ -1,6 +1,11 @@
 """
 This script demonstrates the customer analytics solution using CSV files.
+
+The dataset is only generated on the first run. Counts are kept in a
+checkpoint next to the CSV, so later runs only parse rows appended since
+the previous run.
 """
+import os
 from datetime import datetime
 from customer_analytics import CustomerAnalytics
 from csv_handler import TransactionCSVHandler
@@ -24,20 +29,16 @@ def generate_and_save_dataset():
     print(f"Dataset saved to {csv_path}")
     return csv_path
 
-def analyze_top_customers(csv_path: str):
-    """Analyze top customers from CSV data"""
+def analyze_top_customers(csv_path: str, checkpoint_path: str):
+    """Analyze top customers from CSV data, counting only new rows"""
     print("\nAnalyzing customer frequencies...")
     
-    # Load transactions from CSV
-    print("Loading transactions from CSV...")
-    transactions = TransactionCSVHandler.load_transactions(csv_path)
-    
-    # Analyze top customers
+    # Merge rows appended since the last run into the checkpointed counts
+    print("Counting new transactions from CSV...")
     analytics = CustomerAnalytics()
-    top_customers = analytics.get_top_customers(
-        transactions=transactions,
-        start_date=datetime(2023, 1, 1),
-        end_date=datetime(2023, 12, 31),
+    top_customers = analytics.get_top_customers_incremental(
+        csv_path=csv_path,
+        checkpoint_path=checkpoint_path,
         top_n=10
     )
     
@@ -50,8 +51,10 @@ def analyze_top_customers(csv_path: str):
         print(f"{customer_id:<15} {count:<15}")
 
 if __name__ == "__main__":
-    # Generate and save dataset
-    csv_path = generate_and_save_dataset()
+    # Generate and save dataset on the first run only
+    csv_path = 'transactions.csv'
+    if not os.path.exists(csv_path):
+        csv_path = generate_and_save_dataset()
     
     # Analyze the dataset
-    analyze_top_customers(csv_path)
\ No newline at end of file
+    analyze_top_customers(csv_path, 'transactions.checkpoint.json')
\ No newline at end of file
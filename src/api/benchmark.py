@@ -0,0 +1,142 @@
+"""
+This script benchmarks the pricing engines and the request/response
+serialization paths of the order processing API.
+
+Usage:
+    python -m src.api.benchmark [--orders N] [--products-per-order N] [--repeat N]
+"""
+import argparse
+import json
+import random
+import timeit
+from decimal import Decimal
+from typing import Dict, List, Optional
+from .models import OrderRequest, OrderResponse, Product
+from .pricing import PRICING_ENGINES
+
+def generate_orders(num_orders: int, products_per_order: int, seed: int = 42) -> List[OrderRequest]:
+    """
+    Generate random orders with whole-cent prices.
+
+    Args:
+        num_orders: Number of orders to generate
+        products_per_order: Number of products in each order
+        seed: Random seed so runs are comparable between builds
+
+    Returns:
+        List of OrderRequest objects
+    """
+    rng = random.Random(seed)
+    orders = []
+    for _ in range(num_orders):
+        products = [
+            Product(
+                id=str(i),
+                name=f"Product {i}",
+                price=Decimal(rng.randint(100, 5000000)).scaleb(-2),
+                quantity=rng.randint(1, 5)
+            )
+            for i in range(products_per_order)
+        ]
+        orders.append(OrderRequest(
+            products=products,
+            stratum=rng.randint(1, 6),
+            address="Benchmark Address 123"
+        ))
+    return orders
+
+def benchmark_pricing_engines(
+    orders: List[OrderRequest],
+    repeat: int = 5
+) -> Dict[str, float]:
+    """
+    Measure the best-of-`repeat` time per order for every pricing engine.
+
+    Returns:
+        Dictionary mapping engine name to microseconds per order
+    """
+    results = {}
+    for name, engine in PRICING_ENGINES.items():
+        timer = timeit.Timer(lambda: [engine(order) for order in orders])
+        best = min(timer.repeat(repeat=repeat, number=1))
+        results[name] = best / len(orders) * 1e6
+    return results
+
+def benchmark_serialization(
+    orders: List[OrderRequest],
+    repeat: int = 5
+) -> Dict[str, float]:
+    """
+    Measure the best-of-`repeat` time per order to parse a request body and
+    render its response, with FastAPI's standard path and the fast path.
+
+    Returns:
+        Dictionary mapping path name to microseconds per order
+    """
+    # Imported here so pricing-only runs do not load FastAPI
+    from fastapi.encoders import jsonable_encoder
+    from .serialization import ORDER_REQUEST_ADAPTER, PydanticJSONResponse
+
+    def standard_round_trip(body: bytes, response: OrderResponse) -> bytes:
+        # What FastAPI does for a model body and response_model: decode with
+        # the json module, validate the dict, encode through jsonable_encoder
+        OrderRequest.model_validate(json.loads(body))
+        content = jsonable_encoder(response.model_dump(mode="json"))
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+    def fast_round_trip(body: bytes, response: OrderResponse) -> bytes:
+        ORDER_REQUEST_ADAPTER.validate_json(body)
+        return PydanticJSONResponse(response).body
+
+    engine = PRICING_ENGINES["decimal"]
+    bodies = [order.model_dump_json().encode() for order in orders]
+    responses = []
+    for order in orders:
+        subtotal, shipping_fee, discount_amount, total = engine(order)
+        responses.append(OrderResponse(
+            subtotal=subtotal,
+            shipping_fee=shipping_fee,
+            discount_amount=discount_amount,
+            total=total,
+            order_id="00000000-0000-0000-0000-000000000000",
+            status="created"
+        ))
+    pairs = list(zip(bodies, responses))
+
+    results = {}
+    for name, round_trip in (("standard", standard_round_trip), ("fast", fast_round_trip)):
+        timer = timeit.Timer(lambda: [round_trip(body, response) for body, response in pairs])
+        best = min(timer.repeat(repeat=repeat, number=1))
+        results[name] = best / len(pairs) * 1e6
+    return results
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Benchmark order pricing engines")
+    parser.add_argument("--orders", type=int, default=20000)
+    parser.add_argument("--products-per-order", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    orders = generate_orders(args.orders, args.products_per_order)
+    results = benchmark_pricing_engines(orders, args.repeat)
+
+    baseline = results["decimal"]
+    print(f"Pricing {args.orders} orders with {args.products_per_order} products each")
+    print("-" * 45)
+    print(f"{'Engine':<10} {'us/order':>12} {'speedup':>10}")
+    print("-" * 45)
+    for name, micros in results.items():
+        print(f"{name:<10} {micros:>12.2f} {baseline / micros:>9.2f}x")
+
+    results = benchmark_serialization(orders, args.repeat)
+    baseline = results["standard"]
+    print()
+    print("Parsing the request and rendering the response")
+    print("-" * 45)
+    print(f"{'Path':<10} {'us/order':>12} {'speedup':>10}")
+    print("-" * 45)
+    for name, micros in results.items():
+        print(f"{name:<10} {micros:>12.2f} {baseline / micros:>9.2f}x")
+
+if __name__ == "__main__":
+    main()
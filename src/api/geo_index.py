@@ -0,0 +1,230 @@
+"""
+In-memory spatial index for driver locations.
+
+Drivers are bucketed into a uniform grid of latitude/longitude cells. A
+location update touches at most two cells, and radius or k-nearest queries
+only scan the cells around the query point, so no query ever walks the full
+driver set.
+
+Distances use the equirectangular approximation, which stays well under a
+metre of error at the few-kilometre scale of delivery dispatch.
+"""
+import heapq
+import math
+from typing import Dict, Iterable, List, Optional, Tuple
+
+EARTH_RADIUS_M = 6371000.0
+METERS_PER_DEGREE = math.pi * EARTH_RADIUS_M / 180.0
+
+Cell = Tuple[int, int]
+# driver_id -> (latitude, longitude, status)
+CellEntries = Dict[str, Tuple[float, float, str]]
+
+class DriverGridIndex:
+    """
+    Uniform grid index of driver positions.
+
+    Time Complexity:
+    - update/remove: O(1)
+    - nearby: O(C + m log m) where C is the number of drivers in the scanned
+      cells and m the number of matches
+    - nearest: O(C log k) over the rings of cells needed to find k drivers
+
+    Space Complexity: O(D) where D is the number of indexed drivers
+    """
+
+    def __init__(self, cell_size_m: float = 500.0):
+        if cell_size_m <= 0:
+            raise ValueError("Cell size must be positive")
+        self.cell_size_m = cell_size_m
+        self._cell_deg = cell_size_m / METERS_PER_DEGREE
+        self._cells: Dict[Cell, CellEntries] = {}
+        self._drivers: Dict[str, Tuple[Cell, float, float, str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._drivers)
+
+    def __contains__(self, driver_id: str) -> bool:
+        return driver_id in self._drivers
+
+    def _cell(self, lat: float, lon: float) -> Cell:
+        return (math.floor(lat / self._cell_deg), math.floor(lon / self._cell_deg))
+
+    def update(self, driver_id: str, lat: float, lon: float, status: str = "available") -> None:
+        """
+        Insert or move a driver.
+
+        Raises:
+            ValueError: If the driver ID or coordinates are invalid
+        """
+        if not driver_id:
+            raise ValueError("Driver ID cannot be empty")
+        if not (-90.0 <= lat <= 90.0 and -180.0 <= lon <= 180.0):
+            raise ValueError(f"Invalid coordinates ({lat}, {lon})")
+
+        cell = self._cell(lat, lon)
+        previous = self._drivers.get(driver_id)
+        if previous is not None and previous[0] != cell:
+            self._discard_from_cell(previous[0], driver_id)
+
+        entries = self._cells.get(cell)
+        if entries is None:
+            entries = self._cells[cell] = {}
+        entries[driver_id] = (lat, lon, status)
+        self._drivers[driver_id] = (cell, lat, lon, status)
+
+    def remove(self, driver_id: str) -> None:
+        """
+        Remove a driver from the index.
+
+        Raises:
+            ValueError: If the driver is not indexed
+        """
+        previous = self._drivers.pop(driver_id, None)
+        if previous is None:
+            raise ValueError(f"Driver {driver_id} is not indexed")
+        self._discard_from_cell(previous[0], driver_id)
+
+    def get(self, driver_id: str) -> Optional[Tuple[float, float, str]]:
+        """Return (latitude, longitude, status) of a driver, or None."""
+        entry = self._drivers.get(driver_id)
+        return entry[1:] if entry is not None else None
+
+    def nearby(
+        self,
+        lat: float,
+        lon: float,
+        radius_m: float,
+        limit: Optional[int] = None,
+        status: Optional[str] = "available"
+    ) -> List[Tuple[str, float, str]]:
+        """
+        Find drivers within a radius, closest first.
+
+        Args:
+            lat: Latitude of the query point
+            lon: Longitude of the query point
+            radius_m: Search radius in metres
+            limit: Maximum number of drivers to return
+            status: Only return drivers with this status; None returns all
+
+        Returns:
+            List of (driver_id, distance_m, status) tuples sorted by distance
+        """
+        if radius_m <= 0:
+            raise ValueError("Radius must be positive")
+
+        lon_scale = math.cos(math.radians(lat)) * METERS_PER_DEGREE
+        row, col = self._cell(lat, lon)
+        row_span = math.ceil(radius_m / self.cell_size_m)
+        col_span = self._col_span(radius_m, lon_scale)
+
+        matches = []
+        radius_sq = radius_m * radius_m
+        cell_deg = self._cell_deg
+        for cell_row in range(row - row_span, row + row_span + 1):
+            # Vertical gap between the query point and this row of cells
+            dy = max(cell_row * cell_deg - lat, 0.0, lat - (cell_row + 1) * cell_deg) * METERS_PER_DEGREE
+            if dy * dy > radius_sq:
+                continue
+            for cell_col in range(col - col_span, col + col_span + 1):
+                entries = self._cells.get((cell_row, cell_col))
+                if not entries:
+                    continue
+                # Skip cells whose closest point is outside the circle
+                dx = max(cell_col * cell_deg - lon, 0.0, lon - (cell_col + 1) * cell_deg) * lon_scale
+                if dx * dx + dy * dy > radius_sq:
+                    continue
+                self._collect(entries, lat, lon, lon_scale, radius_sq, status, matches)
+
+        if limit is not None and limit < len(matches):
+            matches = heapq.nsmallest(limit, matches)
+        else:
+            matches.sort()
+        return [(driver_id, math.sqrt(dist_sq), found) for dist_sq, driver_id, found in matches]
+
+    def nearest(
+        self,
+        lat: float,
+        lon: float,
+        k: int,
+        max_radius_m: float = 20000.0,
+        status: Optional[str] = "available"
+    ) -> List[Tuple[str, float, str]]:
+        """
+        Find the k closest drivers within max_radius_m.
+
+        Rings of cells are scanned outwards until k drivers are known to be
+        closer than anything in the unscanned rings.
+
+        Returns:
+            List of (driver_id, distance_m, status) tuples sorted by distance
+        """
+        if k < 1:
+            raise ValueError("k must be positive")
+
+        lon_scale = math.cos(math.radians(lat)) * METERS_PER_DEGREE
+        # Narrowest cell side, so every ring covers at least this many metres
+        min_cell_m = min(self.cell_size_m, self._cell_deg * lon_scale)
+        row, col = self._cell(lat, lon)
+        max_ring = max(math.ceil(max_radius_m / self.cell_size_m), self._col_span(max_radius_m, lon_scale))
+
+        candidates = []
+        max_radius_sq = max_radius_m * max_radius_m
+        for ring in range(max_ring + 1):
+            for cell in _ring_cells(row, col, ring):
+                entries = self._cells.get(cell)
+                if entries:
+                    self._collect(entries, lat, lon, lon_scale, max_radius_sq, status, candidates)
+            if len(candidates) >= k:
+                covered_m = ring * min_cell_m
+                kth_dist_sq = heapq.nsmallest(k, candidates)[-1][0]
+                if kth_dist_sq <= covered_m * covered_m:
+                    break
+
+        return [
+            (driver_id, math.sqrt(dist_sq), found)
+            for dist_sq, driver_id, found in heapq.nsmallest(k, candidates)
+        ]
+
+    def _col_span(self, radius_m: float, lon_scale: float) -> int:
+        # Longitude cells shrink with latitude; cap the span near the poles
+        cell_width_m = max(self._cell_deg * lon_scale, 1e-6)
+        return min(math.ceil(radius_m / cell_width_m), math.ceil(360.0 / self._cell_deg))
+
+    @staticmethod
+    def _collect(
+        entries: CellEntries,
+        lat: float,
+        lon: float,
+        lon_scale: float,
+        radius_sq: float,
+        status: Optional[str],
+        out: list
+    ) -> None:
+        for driver_id, (driver_lat, driver_lon, driver_status) in entries.items():
+            if status is not None and driver_status != status:
+                continue
+            dy = (driver_lat - lat) * METERS_PER_DEGREE
+            dx = (driver_lon - lon) * lon_scale
+            dist_sq = dx * dx + dy * dy
+            if dist_sq <= radius_sq:
+                out.append((dist_sq, driver_id, driver_status))
+
+    def _discard_from_cell(self, cell: Cell, driver_id: str) -> None:
+        entries = self._cells[cell]
+        del entries[driver_id]
+        if not entries:
+            del self._cells[cell]
+
+def _ring_cells(row: int, col: int, ring: int) -> Iterable[Cell]:
+    """Yield the cells at Chebyshev distance `ring` from (row, col)."""
+    if ring == 0:
+        yield (row, col)
+        return
+    for c in range(col - ring, col + ring + 1):
+        yield (row - ring, c)
+        yield (row + ring, c)
+    for r in range(row - ring + 1, row + ring):
+        yield (r, col - ring)
+        yield (r, col + ring)
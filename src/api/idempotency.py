@@ -0,0 +1,151 @@
+"""
+Idempotent request handling for order submission.
+
+Clients send an ``Idempotency-Key`` header and may retry the same request
+freely: the first successful result is stored and returned for every repeat
+of the key, and concurrent duplicates wait for the single in-flight
+computation instead of running their own.
+
+Results are kept in an ``IdempotencyStore``. ``InMemoryIdempotencyStore`` is a
+bounded LRU with per-entry TTL; other local stores can be plugged in by
+implementing the same two methods.
+
+A key is bound to the fingerprint of the request that first used it. Reusing
+a key with a different payload raises ``IdempotencyKeyConflict``. Failed
+computations are not stored, so a retry after an error runs again.
+
+The cache is meant to be used from a single event loop; it takes no locks.
+"""
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+class IdempotencyKeyConflict(Exception):
+    """Raised when an idempotency key is reused with a different request."""
+
+@dataclass(frozen=True)
+class IdempotencyRecord:
+    fingerprint: str
+    response: Any
+
+class IdempotencyStore(ABC):
+    """Storage backend for completed idempotent requests."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[IdempotencyRecord]:
+        """Return the stored record for a key, or None if absent or expired."""
+
+    @abstractmethod
+    def set(self, key: str, record: IdempotencyRecord) -> None:
+        """Store the record for a key."""
+
+class InMemoryIdempotencyStore(IdempotencyStore):
+    """
+    Bounded in-memory store with LRU eviction and a TTL per entry.
+
+    Time Complexity:
+    - get/set: O(1) amortized
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        ttl_seconds: float = 24 * 3600,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        if max_entries < 1:
+            raise ValueError("max_entries must be positive")
+        if ttl_seconds <= 0:
+            raise ValueError("ttl_seconds must be positive")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, IdempotencyRecord]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[IdempotencyRecord]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, record = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return record
+
+    def set(self, key: str, record: IdempotencyRecord) -> None:
+        self._entries[key] = (self._clock() + self.ttl_seconds, record)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class IdempotencyCache:
+    """Coalesces and replays requests sharing an idempotency key."""
+
+    def __init__(self, store: IdempotencyStore):
+        self.store = store
+        self._in_flight: Dict[str, Tuple[str, asyncio.Future]] = {}
+
+    async def execute(
+        self,
+        key: str,
+        fingerprint: str,
+        compute: Callable[[], Awaitable[Any]]
+    ) -> Tuple[Any, bool]:
+        """
+        Run `compute` once per key and replay its result afterwards.
+
+        Args:
+            key: Client supplied idempotency key
+            fingerprint: Digest of the request payload bound to the key
+            compute: Coroutine function producing the response
+
+        Returns:
+            Tuple of (response, replayed) where replayed is True when the
+            response was not computed by this call
+
+        Raises:
+            IdempotencyKeyConflict: If the key was used with another payload
+        """
+        record = self.store.get(key)
+        if record is not None:
+            self._check_fingerprint(key, record.fingerprint, fingerprint)
+            return record.response, True
+
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            in_flight_fingerprint, future = in_flight
+            self._check_fingerprint(key, in_flight_fingerprint, fingerprint)
+            return await asyncio.shield(future), True
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = (fingerprint, future)
+        try:
+            response = await compute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved in case nobody was waiting
+            future.exception()
+            raise
+        else:
+            self.store.set(key, IdempotencyRecord(fingerprint, response))
+            future.set_result(response)
+            return response, False
+        finally:
+            del self._in_flight[key]
+
+    @staticmethod
+    def _check_fingerprint(key: str, stored: str, received: str) -> None:
+        if stored != received:
+            raise IdempotencyKeyConflict(
+                f"Idempotency-Key '{key}' was already used with a different request"
+            )
@@ -0,0 +1,296 @@
+"""
+This script load tests the order processing API.
+
+Orders are sent by a fixed number of concurrent clients, either in-process
+through httpx's ASGI transport (no network, the app's lifespan runs inside
+the harness) or over HTTP against a uvicorn server that is spawned locally or
+already running. Cart sizes and strata are drawn from weighted mixes, so runs
+are reproducible for a given seed.
+
+The report (throughput, latency percentiles, status codes) is printed as
+JSON and can be written to a file to compare builds.
+
+Usage:
+    python -m src.api.load_test [--requests N] [--concurrency N]
+        [--cart-sizes 1:5,3:3,10:2] [--strata 1:1,2:1,3:1,4:1,5:1,6:1]
+        [--transport asgi|uvicorn] [--url URL] [--output FILE]
+"""
+import argparse
+import asyncio
+import json
+import math
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+import httpx
+
+ORDERS_PATH = "/api/v1/orders"
+
+DEFAULT_CART_SIZES = {1: 5.0, 3: 3.0, 10: 2.0}
+DEFAULT_STRATA = {stratum: 1.0 for stratum in range(1, 7)}
+
+def parse_mix(value: str) -> Dict[int, float]:
+    """
+    Parse a weighted mix such as "1:5,3:3,10:2" into {1: 5.0, 3: 3.0, 10: 2.0}.
+
+    Raises:
+        ValueError: If the mix is malformed or has no positive weight
+    """
+    mix = {}
+    for item in value.split(","):
+        key, _, weight = item.partition(":")
+        mix[int(key)] = float(weight) if weight else 1.0
+    if any(weight < 0 for weight in mix.values()) or not any(mix.values()):
+        raise ValueError(f"Invalid mix '{value}': weights must be non-negative and not all zero")
+    return mix
+
+def generate_payloads(
+    num_requests: int,
+    cart_sizes: Dict[int, float],
+    strata: Dict[int, float],
+    seed: int = 42
+) -> List[bytes]:
+    """
+    Generate serialized order bodies with cart sizes and strata drawn from the mixes.
+
+    Returns:
+        List of JSON request bodies
+    """
+    rng = random.Random(seed)
+    sizes = rng.choices(list(cart_sizes), weights=list(cart_sizes.values()), k=num_requests)
+    chosen_strata = rng.choices(list(strata), weights=list(strata.values()), k=num_requests)
+    payloads = []
+    for size, stratum in zip(sizes, chosen_strata):
+        order = {
+            "products": [
+                {
+                    "id": str(i),
+                    "name": f"Product {i}",
+                    "price": f"{rng.randint(100, 5000000) / 100:.2f}",
+                    "quantity": rng.randint(1, 5)
+                }
+                for i in range(size)
+            ],
+            "stratum": stratum,
+            "address": "Load Test Address 123"
+        }
+        payloads.append(json.dumps(order).encode())
+    return payloads
+
+def percentile(sorted_values: List[float], quantile: float) -> float:
+    """Nearest-rank percentile of an ascending list (0 if empty)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(quantile * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+async def run_load(
+    client: httpx.AsyncClient,
+    payloads: List[bytes],
+    concurrency: int
+) -> Tuple[List[float], Counter, float]:
+    """
+    Send every payload with `concurrency` clients working in parallel.
+
+    Returns:
+        Tuple of (latencies in seconds, status code counts, elapsed seconds);
+        transport errors are counted under the "error" status
+    """
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    pending = iter(payloads)
+    headers = {"content-type": "application/json"}
+
+    async def worker():
+        for body in pending:
+            started = time.perf_counter()
+            try:
+                response = await client.post(ORDERS_PATH, content=body, headers=headers)
+                status = str(response.status_code)
+            except httpx.HTTPError:
+                status = "error"
+            latencies.append(time.perf_counter() - started)
+            statuses[status] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, statuses, time.perf_counter() - started
+
+def build_report(
+    latencies: List[float],
+    statuses: Counter,
+    elapsed: float,
+    config: Dict
+) -> Dict:
+    """Summarize a run as a JSON-serializable report."""
+    ordered = sorted(latencies)
+    succeeded = statuses.get("200", 0)
+    return {
+        "config": config,
+        "environment": {"python": platform.python_version(), "platform": platform.platform()},
+        "requests": len(latencies),
+        "succeeded": succeeded,
+        "failed": len(latencies) - succeeded,
+        "status_codes": dict(sorted(statuses.items())),
+        "duration_seconds": round(elapsed, 4),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "mean": round(sum(ordered) / len(ordered) * 1000, 3) if ordered else 0.0,
+            "p50": round(percentile(ordered, 0.5) * 1000, 3),
+            "p90": round(percentile(ordered, 0.9) * 1000, 3),
+            "p99": round(percentile(ordered, 0.99) * 1000, 3),
+            "p999": round(percentile(ordered, 0.999) * 1000, 3),
+            "max": round(ordered[-1] * 1000, 3) if ordered else 0.0,
+        },
+    }
+
+@asynccontextmanager
+async def asgi_client(app=None) -> AsyncIterator[httpx.AsyncClient]:
+    """Client calling the app in-process, with its lifespan running."""
+    if app is None:
+        from .main import app
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+            yield client
+
+@asynccontextmanager
+async def http_client(base_url: str, concurrency: int) -> AsyncIterator[httpx.AsyncClient]:
+    """Client calling a running server over HTTP."""
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0) as client:
+        yield client
+
+def start_uvicorn(port: Optional[int] = None, timeout: float = 15.0) -> Tuple[subprocess.Popen, str]:
+    """
+    Spawn a local uvicorn server for the app and wait until it answers.
+
+    Returns:
+        Tuple of (server process, base URL)
+
+    Raises:
+        RuntimeError: If the server does not start within `timeout` seconds
+    """
+    if port is None:
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+    process = subprocess.Popen([
+        sys.executable, "-m", "uvicorn", "src.api.main:app",
+        "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"
+    ])
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with code {process.returncode}")
+        try:
+            httpx.get(f"{base_url}/metrics", timeout=1.0)
+            return process, base_url
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError(f"uvicorn did not start within {timeout} seconds")
+
+async def load_test(
+    num_requests: int = 2000,
+    concurrency: int = 32,
+    cart_sizes: Optional[Dict[int, float]] = None,
+    strata: Optional[Dict[int, float]] = None,
+    transport: str = "asgi",
+    url: Optional[str] = None,
+    warmup: int = 100,
+    seed: int = 42,
+    app=None
+) -> Dict:
+    """
+    Run a load test and return its report.
+
+    Args:
+        num_requests: Number of measured order requests
+        concurrency: Number of concurrent clients
+        cart_sizes: Weighted mix of products per order
+        strata: Weighted mix of strata
+        transport: "asgi" for in-process calls, "uvicorn" for HTTP
+        url: Base URL of a running server; with transport "uvicorn" and no
+            URL a local server is spawned
+        warmup: Requests sent before measuring
+        seed: Random seed so runs are comparable between builds
+        app: ASGI app for the "asgi" transport (defaults to the order API)
+
+    Returns:
+        Report dictionary (see build_report)
+    """
+    if num_requests < 1 or concurrency < 1:
+        raise ValueError("Requests and concurrency must be positive")
+    if transport not in ("asgi", "uvicorn"):
+        raise ValueError(f"Unknown transport '{transport}'")
+    cart_sizes = cart_sizes or DEFAULT_CART_SIZES
+    strata = strata or DEFAULT_STRATA
+    payloads = generate_payloads(warmup + num_requests, cart_sizes, strata, seed)
+    config = {
+        "requests": num_requests,
+        "concurrency": concurrency,
+        "cart_sizes": cart_sizes,
+        "strata": strata,
+        "transport": transport,
+        "warmup": warmup,
+        "seed": seed,
+    }
+
+    server = None
+    if transport == "uvicorn" and url is None:
+        server, url = start_uvicorn()
+    try:
+        client_context = asgi_client(app) if transport == "asgi" else http_client(url, concurrency)
+        async with client_context as client:
+            if warmup:
+                await run_load(client, payloads[:warmup], concurrency)
+            latencies, statuses, elapsed = await run_load(client, payloads[warmup:], concurrency)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    return build_report(latencies, statuses, elapsed, config)
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Load test the order processing API")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--cart-sizes", type=parse_mix, default=DEFAULT_CART_SIZES,
+                        help="Weighted products-per-order mix, e.g. 1:5,3:3,10:2")
+    parser.add_argument("--strata", type=parse_mix, default=DEFAULT_STRATA,
+                        help="Weighted stratum mix, e.g. 1:2,3:1,6:1")
+    parser.add_argument("--transport", choices=("asgi", "uvicorn"), default="asgi")
+    parser.add_argument("--url", help="Base URL of a running server (uvicorn transport)")
+    parser.add_argument("--warmup", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(load_test(
+        num_requests=args.requests,
+        concurrency=args.concurrency,
+        cart_sizes=args.cart_sizes,
+        strata=args.strata,
+        transport=args.transport,
+        url=args.url,
+        warmup=args.warmup,
+        seed=args.seed
+    ))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+if __name__ == "__main__":
+    main()
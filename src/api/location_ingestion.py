@@ -0,0 +1,192 @@
+"""
+Driver location ingestion pipeline.
+
+Driver apps report their position every few seconds. Instead of touching the
+spatial index on every ping, updates are coalesced in a pending map keyed by
+driver (only the newest report per driver survives) and applied to the
+index in bulk on a fixed tick. Between two ticks a driver costs one dict
+write no matter how often it reports.
+
+Backpressure: when ``max_pending_drivers`` distinct drivers are waiting for
+the next tick, updates for drivers not already pending are rejected and
+counted, so callers can slow down instead of growing memory without bound.
+
+The timestamp of the last applied update is kept per online driver to drop
+reordered reports. Offline drivers move to a bounded LRU of recent offline
+timestamps (``max_pending_drivers`` entries), so drivers that never come back
+do not accumulate.
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
+from .geo_index import DriverGridIndex
+
+logger = logging.getLogger(__name__)
+
+OFFLINE = "offline"
+
+@dataclass(frozen=True)
+class LocationUpdate:
+    driver_id: str
+    lat: float
+    lon: float
+    status: str
+    timestamp: float
+
+class LocationIngestionPipeline:
+    """
+    Coalescing, tick-driven writer of driver locations into a DriverGridIndex.
+
+    All methods run on the event loop thread; no locks are taken.
+    """
+
+    def __init__(
+        self,
+        index: DriverGridIndex,
+        tick_interval: float = 0.1,
+        max_pending_drivers: int = 200000
+    ):
+        if tick_interval <= 0:
+            raise ValueError("Tick interval must be positive")
+        if max_pending_drivers < 1:
+            raise ValueError("max_pending_drivers must be positive")
+        self.index = index
+        self.tick_interval = tick_interval
+        self.max_pending_drivers = max_pending_drivers
+        self._pending: Dict[str, LocationUpdate] = {}
+        self._last_applied: Dict[str, float] = {}  # online drivers only
+        self._offline_at: "OrderedDict[str, float]" = OrderedDict()
+        self._task: Optional[asyncio.Task] = None
+
+        self.received = 0
+        self.coalesced = 0
+        self.stale = 0
+        self.rejected = 0
+        self.applied = 0
+        self.ticks = 0
+        self.last_tick_seconds = 0.0
+        self.max_tick_seconds = 0.0
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def submit(self, updates: Iterable[LocationUpdate]) -> Tuple[int, int]:
+        """
+        Queue location updates for the next tick.
+
+        Updates older than the one already pending or applied for the same
+        driver are dropped as stale.
+
+        Returns:
+            Tuple of (accepted, rejected) counts; rejected updates hit the
+            pending limit and should be retried later
+        """
+        pending = self._pending
+        last_applied = self._last_applied
+        offline_at = self._offline_at
+        accepted = rejected = 0
+        for update in updates:
+            self.received += 1
+            current = pending.get(update.driver_id)
+            if current is not None:
+                if update.timestamp < current.timestamp:
+                    self.stale += 1
+                else:
+                    self.coalesced += 1
+                    pending[update.driver_id] = update
+                accepted += 1
+                continue
+            applied_at = last_applied.get(update.driver_id)
+            if applied_at is None:
+                applied_at = offline_at.get(update.driver_id, float('-inf'))
+            if update.timestamp < applied_at:
+                self.stale += 1
+                accepted += 1
+                continue
+            if len(pending) >= self.max_pending_drivers:
+                rejected += 1
+                continue
+            pending[update.driver_id] = update
+            accepted += 1
+
+        self.rejected += rejected
+        return accepted, rejected
+
+    def apply_pending(self) -> int:
+        """
+        Apply every pending update to the index in one pass.
+
+        Returns:
+            Number of drivers updated
+        """
+        if not self._pending:
+            return 0
+        started = time.perf_counter()
+        batch, self._pending = self._pending, {}
+
+        index = self.index
+        last_applied = self._last_applied
+        offline_at = self._offline_at
+        for driver_id, update in batch.items():
+            if update.status == OFFLINE:
+                if driver_id in index:
+                    index.remove(driver_id)
+                last_applied.pop(driver_id, None)
+                offline_at[driver_id] = update.timestamp
+                offline_at.move_to_end(driver_id)
+            else:
+                index.update(driver_id, update.lat, update.lon, update.status)
+                last_applied[driver_id] = update.timestamp
+                offline_at.pop(driver_id, None)
+        while len(offline_at) > self.max_pending_drivers:
+            offline_at.popitem(last=False)
+
+        elapsed = time.perf_counter() - started
+        self.applied += len(batch)
+        self.ticks += 1
+        self.last_tick_seconds = elapsed
+        self.max_tick_seconds = max(self.max_tick_seconds, elapsed)
+        return len(batch)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop ticking and apply whatever is still pending."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.apply_pending()
+
+    def stats(self) -> Dict[str, float]:
+        """Counters and gauges describing throughput and backpressure."""
+        return {
+            "received": self.received,
+            "coalesced": self.coalesced,
+            "stale": self.stale,
+            "rejected": self.rejected,
+            "applied": self.applied,
+            "pending": self.pending,
+            "max_pending_drivers": self.max_pending_drivers,
+            "indexed_drivers": len(self.index),
+            "ticks": self.ticks,
+            "last_tick_ms": self.last_tick_seconds * 1000,
+            "max_tick_ms": self.max_tick_seconds * 1000,
+        }
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.tick_interval)
+            try:
+                self.apply_pending()
+            except Exception:
+                logger.exception("Failed to apply driver location updates")
@@ -1,19 +1,211 @@
 """
 FastAPI endpoint for order processing.
 """
-from fastapi import FastAPI, HTTPException
-from .models import OrderRequest, OrderResponse
+import asyncio
+import hashlib
+import json
+import os
+import time
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import List, Optional
+from fastapi import FastAPI, Header, HTTPException, Query, Request, Response
+from fastapi.responses import PlainTextResponse
+from .geo_index import DriverGridIndex
+from .order_cache import OrderStatusCache
+from .location_ingestion import LocationIngestionPipeline, LocationUpdate
+from .metrics import MetricsMiddleware, MetricsRegistry, timed_route_class
+from .idempotency import IdempotencyCache, IdempotencyKeyConflict, InMemoryIdempotencyStore
+from .models import (
+    BatchOrderResponse,
+    DriverLocationUpdate,
+    DriverNearbyResponse,
+    LocationIngestionResponse,
+    OrderRequest,
+    OrderResponse,
+    OrderStatusUpdate,
+    PaymentRequest,
+    PaymentResponse,
+    TopCustomer,
+    TopCustomersResponse,
+)
+from .payments import FakePaymentProvider, Payment, PaymentQueueFull, PaymentStore, PaymentWorkerPool
+from .persistence import (
+    DEFAULT_ORDER_DB,
+    ORDER_DB_ENV,
+    OrderRecord,
+    OrderRepository,
+    OrderWriteBehind,
+    SQLiteConnectionPool,
+    WriteBufferFull,
+)
+from .pricing import get_pricing_engine
+from .serialization import ORDER_REQUEST_ADAPTER, PydanticJSONResponse, parse_body
 from .service import OrderService
+from .top_customers import DEFAULT_TRANSACTIONS_CSV, TRANSACTIONS_CSV_ENV, TopCustomersIndex
 
-app = FastAPI(title="Order Processing API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start and stop the background components of the API."""
+    OrderService.pricing_rules.start_auto_reload()
+    pool = SQLiteConnectionPool(os.getenv(ORDER_DB_ENV, DEFAULT_ORDER_DB))
+    repository = OrderRepository(pool)
+    repository.create_schema()
+    writer = OrderWriteBehind(repository)
+    writer.start()
+    app.state.order_repository = repository
+    app.state.order_writer = writer
+    location_pipeline.start()
+    payment_workers.start()
+    top_customers.start()
+    try:
+        yield
+    finally:
+        await top_customers.stop()
+        await payment_workers.stop()
+        await location_pipeline.stop()
+        await writer.stop()
+        app.state.order_writer = None
+        app.state.order_repository = None
+        pool.close()
+        OrderService.pricing_rules.stop_auto_reload()
+
+app = FastAPI(title="Order Processing API", lifespan=lifespan)
+# Persistence is only available while the lifespan is running
+app.state.order_repository = None
+app.state.order_writer = None
+
+# Per-route latency histograms, in-flight gauges and stage timings served on
+# /metrics; the route class must be set before any route is declared
+metrics = MetricsRegistry()
+app.router.route_class = timed_route_class(metrics)
+app.add_middleware(MetricsMiddleware, registry=metrics)
+
+# Pricing engine selected per deployment (ORDER_PRICING_ENGINE=decimal|cents)
+pricing_engine = get_pricing_engine()
+
+# Responses of idempotent order submissions, kept for 24 hours
+idempotency_cache = IdempotencyCache(InMemoryIdempotencyStore(max_entries=100000, ttl_seconds=24 * 3600))
+
+async def _load_order(order_id: str) -> Optional[OrderResponse]:
+    repository = app.state.order_repository
+    if repository is None:
+        return None
+    return await asyncio.to_thread(repository.get_order, order_id)
+
+# Serialized order status responses served to polling clients
+order_cache = OrderStatusCache(_load_order)
+
+# Live driver positions used by dispatch queries, fed by the ingestion pipeline
+driver_index = DriverGridIndex()
+location_pipeline = LocationIngestionPipeline(driver_index)
+
+# Payments are charged by background workers; the fake provider stands in
+# for the real gateway
+payment_store = PaymentStore()
+payment_workers = PaymentWorkerPool(FakePaymentProvider(), payment_store)
+
+# Top-customer answers precomputed from the transactions CSV, refreshed as it grows
+top_customers = TopCustomersIndex(os.getenv(TRANSACTIONS_CSV_ENV, DEFAULT_TRANSACTIONS_CSV))
+
+# Upper bound on orders accepted in a single batch request
+MAX_BATCH_SIZE = 10000
 
-@app.post("/api/v1/orders", response_model=OrderResponse)
-async def process_order(order: OrderRequest):
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+ORDERS_ROUTE = "/api/v1/orders"
+# Longest a status update waits for its order to leave the write-behind buffer
+ORDER_WRITE_TIMEOUT = 5.0
+
+# Order bodies are parsed by hand, so their schema is documented explicitly.
+# Nested models are referenced from the OpenAPI components, where they are
+# registered by _openapi below
+ORDER_REQUEST_SCHEMA = OrderRequest.model_json_schema(ref_template="#/components/schemas/{model}")
+ORDER_REQUEST_DEFS = ORDER_REQUEST_SCHEMA.pop("$defs", {})
+
+_default_openapi = app.openapi
+
+def _openapi() -> dict:
+    """Generate the OpenAPI schema, adding the models of hand-parsed bodies to its components."""
+    schema = _default_openapi()
+    components = schema.setdefault("components", {}).setdefault("schemas", {})
+    for name, definition in {**ORDER_REQUEST_DEFS, "OrderRequest": ORDER_REQUEST_SCHEMA}.items():
+        components.setdefault(name, definition)
+    return schema
+
+app.openapi = _openapi
+
+@app.post(
+    ORDERS_ROUTE,
+    response_model=OrderResponse,
+    response_class=PydanticJSONResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": ORDER_REQUEST_SCHEMA}},
+        }
+    },
+)
+async def process_order(
+    request: Request,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", min_length=1, max_length=255)
+):
     """
     Process a new order with products, calculating totals with shipping and discounts.
+
+    Requests carrying an Idempotency-Key header are computed once per key;
+    retries receive the stored response with an Idempotent-Replayed header.
+    The order is queued for write-behind persistence, so the handler never
+    waits on the database.
+
+    The body is decoded and validated in one pass and the response rendered
+    by pydantic-core (see serialization.py), bypassing FastAPI's generic
+    body parsing and response encoding.
     """
+    body = await request.body()
+    with metrics.stage(ORDERS_ROUTE, "validation"):
+        order = parse_body(ORDER_REQUEST_ADAPTER, body)
+
+    if idempotency_key is None:
+        return PydanticJSONResponse(_create_order(order))
+
+    async def compute():
+        return _create_order(order)
+
+    fingerprint = hashlib.sha256(order.model_dump_json().encode()).hexdigest()
+    try:
+        result, replayed = await idempotency_cache.execute(idempotency_key, fingerprint, compute)
+    except IdempotencyKeyConflict as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    response = PydanticJSONResponse(result)
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return response
+
+def _create_order(order: OrderRequest) -> OrderResponse:
+    """Price an order, assign its id and queue it for persistence."""
+    record = OrderRecord.from_order(str(uuid.uuid4()), order, _price_order(order))
+    # Amounts are rounded to cents once, here: the response, the cache and
+    # storage all hold the same values
+    result = record.to_response()
+
+    writer = app.state.order_writer
+    if writer is not None:
+        try:
+            writer.submit(record)
+        except WriteBufferFull as e:
+            raise HTTPException(status_code=503, detail=str(e))
+        # Clients start polling right away, before the write-behind flush
+        order_cache.put(result.order_id, result)
+    return result
+
+def _price_order(order: OrderRequest) -> OrderResponse:
+    """Price an order with the configured engine, mapping failures to HTTP 400."""
     try:
-        subtotal, shipping_fee, discount_amount, total = OrderService.calculate_order_totals(order)
+        with metrics.stage(ORDERS_ROUTE, "pricing"):
+            subtotal, shipping_fee, discount_amount, total = pricing_engine(order)
         
         return OrderResponse(
             subtotal=subtotal,
@@ -22,4 +214,263 @@ async def process_order(order: OrderRequest):
             total=total
         )
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get(
+    "/api/v1/orders/{order_id}",
+    response_model=OrderResponse,
+    responses={304: {"description": "Not modified"}, 404: {"description": "Order not found"}}
+)
+async def get_order(order_id: str, if_none_match: Optional[str] = Header(None)):
+    """
+    Get the totals and status of an order.
+
+    Responses carry an ETag; polls sending it back in If-None-Match receive
+    304 Not Modified until the order changes.
+    """
+    cached = await order_cache.get(order_id)
+    if cached is None:
+        raise HTTPException(status_code=404, detail=f"Order {order_id} not found")
+    if if_none_match is not None and _etag_matches(if_none_match, cached.etag):
+        return Response(status_code=304, headers={"ETag": cached.etag})
+    return Response(content=cached.body, media_type="application/json", headers={"ETag": cached.etag})
+
+@app.patch("/api/v1/orders/{order_id}/status", response_model=OrderResponse)
+async def update_order_status(order_id: str, update: OrderStatusUpdate):
+    """
+    Move an order to its next status (created -> preparing -> assigned -> delivered,
+    or cancelled before delivery).
+    """
+    repository = app.state.order_repository
+    if repository is None:
+        raise HTTPException(status_code=503, detail="Order storage is not available")
+
+    # The order may still be waiting in the write-behind buffer; wait for
+    # that order only, not for the rest of the queue
+    try:
+        written = await app.state.order_writer.wait_written(order_id, ORDER_WRITE_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=503, detail=f"Order {order_id} is not stored yet, retry later")
+    if not written:
+        raise HTTPException(status_code=503, detail=f"Order {order_id} could not be stored")
+    updated = await asyncio.to_thread(
+        repository.transition_status,
+        order_id,
+        update.status,
+        OrderService.previous_statuses(update.status)
+    )
+    order_cache.invalidate(order_id)
+
+    cached = await order_cache.get(order_id)
+    if cached is None:
+        raise HTTPException(status_code=404, detail=f"Order {order_id} not found")
+    if not updated:
+        current = json.loads(cached.body)["status"]
+        raise HTTPException(
+            status_code=409,
+            detail=f"Cannot move order {order_id} from {current} to {update.status}"
+        )
+    return Response(content=cached.body, media_type="application/json", headers={"ETag": cached.etag})
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag."""
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (candidate.strip() for candidate in if_none_match.split(","))
+    return any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+@app.post(
+    "/api/v1/orders/batch",
+    response_model=BatchOrderResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {"type": "array", "items": {"$ref": "#/components/schemas/OrderRequest"}}
+                },
+                "application/x-ndjson": {"schema": {"type": "string"}},
+            },
+        }
+    },
+)
+async def process_order_batch(request: Request):
+    """
+    Quote a batch of orders in a single request.
+
+    Accepts either a JSON array of orders or an NDJSON body (one order per line).
+    Every order is validated and priced on its own; failures are reported per
+    order in the response instead of rejecting the whole batch.
+
+    Decoding and pricing run in a worker thread, so large batches do not
+    stall other requests or the background tasks on the event loop.
+    """
+    body = await request.body()
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    return await asyncio.to_thread(_quote_batch, body, content_type)
+
+def _quote_batch(body: bytes, content_type: str) -> BatchOrderResponse:
+    """Decode and price a batch body (blocking; runs in a worker thread)."""
+    if content_type in NDJSON_MEDIA_TYPES:
+        payloads = [_decode_ndjson_line(line) for line in body.splitlines() if line.strip()]
+    else:
+        try:
+            payloads = json.loads(body)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid JSON body: {e}")
+        if not isinstance(payloads, list):
+            raise HTTPException(status_code=400, detail="Batch body must be a JSON array of orders")
+
+    if len(payloads) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch exceeds the maximum of {MAX_BATCH_SIZE} orders"
+        )
+
+    return OrderService.calculate_batch_totals(payloads, pricing_engine)
+
+def _decode_ndjson_line(line: bytes):
+    """
+    Decode one NDJSON line. Undecodable lines are returned as-is so that the
+    batch reports them as invalid orders instead of failing the request.
+    """
+    try:
+        return json.loads(line)
+    except ValueError:
+        return line.decode("utf-8", errors="replace")
+
+@app.get("/api/v1/drivers/nearby", response_model=List[DriverNearbyResponse])
+async def get_nearby_drivers(
+    lat: float = Query(ge=-90, le=90),
+    lon: float = Query(ge=-180, le=180),
+    radius_m: int = Query(1000, gt=0, le=50000),
+    limit: int = Query(50, ge=1, le=500)
+):
+    """
+    List available drivers within radius_m metres of (lat, lon), closest first.
+    """
+    return [
+        DriverNearbyResponse(driver_id=driver_id, distance_meters=round(distance), status=status)
+        for driver_id, distance, status in driver_index.nearby(lat, lon, radius_m, limit=limit)
+    ]
+
+@app.post(
+    "/api/v1/drivers/locations",
+    response_model=LocationIngestionResponse,
+    status_code=202
+)
+async def ingest_driver_locations(updates: List[DriverLocationUpdate], response: Response):
+    """
+    Accept a batch of driver location reports.
+
+    Reports are coalesced per driver and applied to the nearby-driver index
+    on the next pipeline tick. Reports rejected by backpressure should be
+    retried after the Retry-After delay.
+    """
+    now = time.time()
+    accepted, rejected = location_pipeline.submit(
+        LocationUpdate(
+            driver_id=update.driver_id,
+            lat=update.lat,
+            lon=update.lon,
+            status=update.status,
+            timestamp=update.timestamp.timestamp() if update.timestamp is not None else now
+        )
+        for update in updates
+    )
+    if rejected:
+        response.headers["Retry-After"] = "1"
+    return LocationIngestionResponse(accepted=accepted, rejected=rejected)
+
+@app.get("/api/v1/drivers/locations/stats")
+async def get_location_ingestion_stats():
+    """
+    Throughput and backpressure counters of the location ingestion pipeline.
+    """
+    return location_pipeline.stats()
+
+@app.post("/api/v1/payments", response_model=PaymentResponse, status_code=201)
+async def create_payment(payment: PaymentRequest):
+    """
+    Start a payment for an order.
+
+    The payment is queued for the provider workers and returned immediately;
+    poll GET /api/v1/payments/{payment_id} for the outcome.
+    """
+    try:
+        created = payment_workers.submit(payment.order_id, payment.amount, payment.method)
+    except PaymentQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return _payment_response(created)
+
+@app.get("/api/v1/payments/{payment_id}", response_model=PaymentResponse)
+async def get_payment(payment_id: str):
+    """
+    Get the current status of a payment.
+    """
+    payment = payment_store.get(payment_id)
+    if payment is None:
+        raise HTTPException(status_code=404, detail=f"Payment {payment_id} not found")
+    return _payment_response(payment)
+
+def _payment_response(payment: Payment) -> PaymentResponse:
+    return PaymentResponse(
+        payment_id=payment.id,
+        order_id=payment.order_id,
+        status=payment.status,
+        amount=payment.amount,
+        method=payment.method,
+        retry_count=payment.retry_count
+    )
+
+@app.get("/api/v1/analytics/top-customers", response_model=TopCustomersResponse)
+async def get_top_customers(
+    start_date: datetime,
+    end_date: datetime,
+    top_n: int = Query(10, ge=1, le=1000)
+):
+    """
+    Top N customers by number of transactions between start_date and end_date
+    (inclusive).
+
+    Answered from counters kept up to date in the background as the
+    transactions file grows; repeated queries are served from memory.
+    """
+    if not top_customers.loaded:
+        raise HTTPException(status_code=503, detail="Transaction data is not available yet")
+    try:
+        customers = top_customers.top_customers(start_date, end_date, top_n)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return TopCustomersResponse(
+        start_date=start_date,
+        end_date=end_date,
+        customers=[
+            TopCustomer(customer_id=customer_id, transaction_count=count)
+            for customer_id, count in customers
+        ],
+        transactions_indexed=top_customers.transactions,
+        refreshed_at=top_customers.refreshed_at
+    )
+
+@app.get("/api/v1/analytics/top-customers/stats")
+async def get_top_customers_stats():
+    """
+    Refresh and cache counters of the top-customers precomputation.
+    """
+    return top_customers.stats()
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def get_metrics():
+    """
+    Request metrics in the Prometheus text exposition format.
+
+    Stages per route: "framework" (body parsing, validation and response
+    serialization done by FastAPI), "endpoint" (the handler) and, for order
+    creation, "validation" (OrderRequest parsing inside the handler) and
+    "pricing" (OrderService totals).
+    """
+    return PlainTextResponse(
+        metrics.render_prometheus(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
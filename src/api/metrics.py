@@ -0,0 +1,318 @@
+"""
+Latency and throughput metrics for the API, exposed in Prometheus text format.
+
+The module provides:
+- ``LatencyHistogram``: an HDR-style log-linear histogram. Every power of two
+  is split into ``sub_buckets`` linear buckets, so percentiles keep a bounded
+  relative error (about 3% with 32 sub-buckets) from microseconds to a minute.
+- ``MetricsRegistry``: per-route request counters, latency histograms,
+  in-flight gauges and per-stage timings.
+- ``MetricsMiddleware``: a pure ASGI middleware timing every HTTP request.
+- ``TimedRoute``: an ``APIRoute`` that splits each request into the
+  ``endpoint`` stage (the handler function) and the ``framework`` stage
+  (body parsing, pydantic validation and response serialization).
+  FastAPI is only imported when a route class is built, so processes that
+  only record or render metrics do not pay for it.
+
+Recording is lock-free: all updates happen on the event loop thread, and a
+sample costs a ``perf_counter`` call, a ``frexp`` and a few list increments.
+"""
+import asyncio
+import functools
+import math
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Type
+
+QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+class LatencyHistogram:
+    """
+    Log-linear histogram of durations in seconds.
+
+    Values below 2**(min_exponent - 1) fall in the first bucket. Values of
+    2**max_exponent or more are counted in a separate overflow bucket at the
+    end, which only appears in the Prometheus ``+Inf`` bucket.
+    """
+
+    __slots__ = ("sub_buckets", "min_exponent", "max_exponent", "counts", "count", "sum", "max")
+
+    def __init__(self, sub_buckets: int = 32, min_exponent: int = -19, max_exponent: int = 6):
+        self.sub_buckets = sub_buckets
+        self.min_exponent = min_exponent
+        self.max_exponent = max_exponent
+        # One extra slot at the end for overflowing values
+        self.counts = [0] * ((max_exponent - min_exponent + 1) * sub_buckets + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+        mantissa, exponent = math.frexp(seconds)
+        if seconds <= 0 or exponent < self.min_exponent:
+            index = 0
+        elif exponent > self.max_exponent:
+            index = len(self.counts) - 1
+        else:
+            index = (exponent - self.min_exponent) * self.sub_buckets + int((mantissa - 0.5) * 2 * self.sub_buckets)
+        self.counts[index] += 1
+
+    def bucket_upper_bound(self, index: int) -> float:
+        exponent, sub_bucket = divmod(index, self.sub_buckets)
+        return math.ldexp(1.0 + (sub_bucket + 1) / self.sub_buckets, exponent + self.min_exponent - 1)
+
+    def percentile(self, quantile: float) -> float:
+        """Upper bound of the bucket holding the given quantile (0 if empty)."""
+        if not self.count:
+            return 0.0
+        rank = quantile * self.count
+        seen = 0
+        last = len(self.counts) - 1
+        for index, bucket_count in enumerate(self.counts[:last]):
+            seen += bucket_count
+            if bucket_count and seen >= rank:
+                return min(self.bucket_upper_bound(index), self.max)
+        # Overflow bucket: the maximum is the only known value
+        return self.max
+
+    def cumulative_buckets(self) -> List[Tuple[float, int]]:
+        """Cumulative counts at every power of two, for Prometheus buckets."""
+        buckets = []
+        seen = 0
+        for exponent_index in range(self.max_exponent - self.min_exponent + 1):
+            start = exponent_index * self.sub_buckets
+            seen += sum(self.counts[start:start + self.sub_buckets])
+            buckets.append((math.ldexp(1.0, exponent_index + self.min_exponent), seen))
+        return buckets
+
+class MetricsRegistry:
+    """Holds every metric exported on /metrics."""
+
+    def __init__(self):
+        self.requests: Dict[Tuple[str, str, int], int] = {}
+        self.latency: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self.stages: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self.in_flight: Dict[str, int] = {}
+        self.started_at = time.time()
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float) -> None:
+        key = (method, route, status)
+        self.requests[key] = self.requests.get(key, 0) + 1
+        histogram = self.latency.get((method, route))
+        if histogram is None:
+            histogram = self.latency[(method, route)] = LatencyHistogram()
+        histogram.record(seconds)
+
+    def observe_stage(self, route: str, stage: str, seconds: float) -> None:
+        histogram = self.stages.get((route, stage))
+        if histogram is None:
+            histogram = self.stages[(route, stage)] = LatencyHistogram()
+        histogram.record(seconds)
+
+    @contextmanager
+    def stage(self, route: str, stage: str) -> Iterator[None]:
+        """Time a block of code as a stage of a route."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_stage(route, stage, time.perf_counter() - started)
+
+    def render_prometheus(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        lines = [
+            "# HELP http_requests_total Total HTTP requests by route and status.",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route, status), count in sorted(self.requests.items()):
+            lines.append(
+                f'http_requests_total{{method="{method}",route="{_escape(route)}",status="{status}"}} {count}'
+            )
+
+        lines += [
+            "# HELP http_requests_in_flight Requests currently being handled by route.",
+            "# TYPE http_requests_in_flight gauge",
+        ]
+        for route, count in sorted(self.in_flight.items()):
+            lines.append(f'http_requests_in_flight{{route="{_escape(route)}"}} {count}')
+
+        request_labels = {
+            key: f'method="{key[0]}",route="{_escape(key[1])}"' for key in self.latency
+        }
+        stage_labels = {
+            key: f'route="{_escape(key[0])}",stage="{key[1]}"' for key in self.stages
+        }
+        lines += _render_histograms(
+            "http_request_duration_seconds",
+            "HTTP request latency by route.",
+            self.latency,
+            request_labels
+        )
+        lines += _render_histograms(
+            "http_request_stage_duration_seconds",
+            "Time spent per request stage (framework: parsing, validation and serialization).",
+            self.stages,
+            stage_labels
+        )
+        lines += _render_quantiles(
+            "http_request_duration_quantile_seconds",
+            "HTTP request latency percentiles by route.",
+            self.latency,
+            request_labels
+        )
+        lines += _render_quantiles(
+            "http_request_stage_duration_quantile_seconds",
+            "Request stage latency percentiles by route.",
+            self.stages,
+            stage_labels
+        )
+        lines += [
+            "# HELP process_start_time_seconds Start time of the process since unix epoch.",
+            "# TYPE process_start_time_seconds gauge",
+            f"process_start_time_seconds {self.started_at}",
+        ]
+        return "\n".join(lines) + "\n"
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording latency and status of HTTP requests."""
+
+    def __init__(self, app, registry: MetricsRegistry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            self.registry.observe_request(
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                status,
+                time.perf_counter() - started
+            )
+
+class TimedRouteMixin:
+    """
+    APIRoute mixin recording in-flight requests and the endpoint/framework split.
+
+    Routes read the shared registry from the ``registry`` class attribute;
+    use ``timed_route_class`` to bind one.
+    """
+
+    registry: MetricsRegistry
+
+    def get_route_handler(self) -> Callable:
+        registry = self.registry
+        path = self.path
+        if not getattr(self.dependant.call, "_timed", False):
+            self.dependant.call = _timed_endpoint(self.dependant.call, registry, path)
+        handler = super().get_route_handler()
+
+        async def timed_handler(request):
+            started = time.perf_counter()
+            # Mutable cell so the endpoint wrapper can report back, even from
+            # the threadpool where sync endpoints run on a copied context
+            endpoint_seconds = [0.0]
+            token = _endpoint_seconds.set(endpoint_seconds)
+            registry.in_flight[path] = registry.in_flight.get(path, 0) + 1
+            try:
+                return await handler(request)
+            finally:
+                registry.in_flight[path] -= 1
+                _endpoint_seconds.reset(token)
+                elapsed = time.perf_counter() - started
+                registry.observe_stage(path, "framework", max(elapsed - endpoint_seconds[0], 0.0))
+
+        return timed_handler
+
+_timed_route: Optional[type] = None
+
+def _timed_route_base() -> type:
+    global _timed_route
+    if _timed_route is None:
+        from fastapi.routing import APIRoute
+
+        _timed_route = type("TimedRoute", (TimedRouteMixin, APIRoute), {})
+    return _timed_route
+
+def timed_route_class(registry: MetricsRegistry) -> Type[TimedRouteMixin]:
+    """Build a TimedRoute subclass recording into the given registry."""
+    return type("TimedRoute", (_timed_route_base(),), {"registry": registry})
+
+def __getattr__(name: str):
+    # TimedRoute is built on first access so importing this module does not
+    # import FastAPI
+    if name == "TimedRoute":
+        return _timed_route_base()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+_endpoint_seconds: ContextVar[List[float]] = ContextVar("endpoint_seconds")
+
+def _record_endpoint(registry: MetricsRegistry, path: str, seconds: float) -> None:
+    registry.observe_stage(path, "endpoint", seconds)
+    cell = _endpoint_seconds.get(None)
+    if cell is not None:
+        cell[0] += seconds
+
+def _timed_endpoint(endpoint: Callable, registry: MetricsRegistry, path: str) -> Callable:
+    if asyncio.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                _record_endpoint(registry, path, time.perf_counter() - started)
+    else:
+        @functools.wraps(endpoint)
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                _record_endpoint(registry, path, time.perf_counter() - started)
+    timed._timed = True
+    return timed
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _render_histograms(name, help_text, histograms, labels) -> List[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for key, histogram in sorted(histograms.items()):
+        label = labels[key]
+        for upper_bound, count in histogram.cumulative_buckets():
+            lines.append(f'{name}_bucket{{{label},le="{upper_bound:.9g}"}} {count}')
+        lines.append(f'{name}_bucket{{{label},le="+Inf"}} {histogram.count}')
+        lines.append(f"{name}_sum{{{label}}} {histogram.sum:.9g}")
+        lines.append(f"{name}_count{{{label}}} {histogram.count}")
+    return lines
+
+def _render_quantiles(name, help_text, histograms, labels) -> List[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+    for key, histogram in sorted(histograms.items()):
+        for quantile in QUANTILES:
+            lines.append(
+                f'{name}{{{labels[key]},quantile="{quantile}"}} {histogram.percentile(quantile):.9g}'
+            )
+    return lines
@@ -1,7 +1,8 @@
 """
 Data models for the order processing API.
 """
-from typing import List
+from datetime import datetime
+from typing import List, Literal, Optional
 from pydantic import BaseModel, Field, field_validator
 from decimal import Decimal
 
@@ -15,6 +16,7 @@ class OrderRequest(BaseModel):
     products: List[Product]
     stratum: int = Field(ge=1, le=6)
     address: str
+    city: Optional[str] = None
 
     @field_validator('stratum')
     @classmethod
@@ -23,8 +25,65 @@ class OrderRequest(BaseModel):
             raise ValueError('Stratum must be between 1 and 6')
         return v
 
-class OrderResponse(BaseModel):
+class OrderQuote(BaseModel):
     subtotal: Decimal
     shipping_fee: Decimal
     discount_amount: Decimal
-    total: Decimal
\ No newline at end of file
+    total: Decimal
+
+class OrderResponse(OrderQuote):
+    order_id: Optional[str] = None
+    status: Optional[str] = None
+
+class OrderStatusUpdate(BaseModel):
+    status: Literal["preparing", "assigned", "delivered", "cancelled"]
+
+class BatchOrderResult(BaseModel):
+    index: int
+    result: Optional[OrderQuote] = None
+    error: Optional[str] = None
+
+class BatchOrderResponse(BaseModel):
+    results: List[BatchOrderResult]
+    succeeded: int
+    failed: int
+
+class DriverNearbyResponse(BaseModel):
+    driver_id: str
+    distance_meters: int
+    status: str
+
+class DriverLocationUpdate(BaseModel):
+    driver_id: str = Field(min_length=1)
+    lat: float = Field(ge=-90, le=90)
+    lon: float = Field(ge=-180, le=180)
+    status: Literal["available", "busy", "offline"] = "available"
+    timestamp: Optional[datetime] = None
+
+class LocationIngestionResponse(BaseModel):
+    accepted: int
+    rejected: int
+
+class PaymentRequest(BaseModel):
+    order_id: str = Field(min_length=1)
+    amount: Decimal = Field(gt=0, max_digits=12, decimal_places=2)
+    method: str = Field(min_length=1)
+
+class PaymentResponse(BaseModel):
+    payment_id: str
+    order_id: str
+    status: str
+    amount: Decimal
+    method: str
+    retry_count: int
+
+class TopCustomer(BaseModel):
+    customer_id: str
+    transaction_count: int
+
+class TopCustomersResponse(BaseModel):
+    start_date: datetime
+    end_date: datetime
+    customers: List[TopCustomer]
+    transactions_indexed: int
+    refreshed_at: Optional[datetime] = None
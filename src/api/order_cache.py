@@ -0,0 +1,124 @@
+"""
+Read-through cache of serialized order status responses.
+
+Clients poll ``GET /orders/{order_id}`` while an order moves through its
+statuses. Each cached entry keeps the already-serialized JSON body and its
+ETag, so a hit costs neither a storage read nor serialization, and a poll
+with a matching ``If-None-Match`` can be answered with ``304 Not Modified``.
+
+- Misses are coalesced: concurrent requests for the same uncached order
+  share a single storage read.
+- Writes invalidate: after a status transition is stored the entry is
+  dropped, and a load that was already in flight is not cached, so a stale
+  read can never overwrite the invalidation.
+- The cache is a bounded LRU. Missing orders are not cached, since an order
+  may still be waiting in the write-behind buffer.
+
+The cache is meant to be used from a single event loop; it takes no locks.
+"""
+import asyncio
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Optional
+from .models import OrderResponse
+
+@dataclass(frozen=True)
+class CachedOrder:
+    body: bytes
+    etag: str
+
+    @classmethod
+    def from_response(cls, response: OrderResponse) -> "CachedOrder":
+        body = response.model_dump_json().encode()
+        return cls(body=body, etag=f'"{hashlib.sha1(body).hexdigest()}"')
+
+class _Load:
+    __slots__ = ("future", "stale")
+
+    def __init__(self, future: asyncio.Future):
+        self.future = future
+        self.stale = False
+
+class OrderStatusCache:
+    """
+    Bounded LRU read-through cache with miss coalescing.
+
+    Time Complexity:
+    - hit, put, invalidate: O(1)
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[str], Awaitable[Optional[OrderResponse]]],
+        max_entries: int = 100000
+    ):
+        if max_entries < 1:
+            raise ValueError("max_entries must be positive")
+        self.loader = loader
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CachedOrder]" = OrderedDict()
+        self._loads: Dict[str, _Load] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, order_id: str) -> Optional[CachedOrder]:
+        """
+        Return the cached order, loading it from storage on a miss.
+
+        Returns:
+            CachedOrder, or None if the order does not exist
+        """
+        entry = self._entries.get(order_id)
+        if entry is not None:
+            self._entries.move_to_end(order_id)
+            self.hits += 1
+            return entry
+
+        load = self._loads.get(order_id)
+        if load is not None:
+            self.hits += 1
+            return await asyncio.shield(load.future)
+
+        self.misses += 1
+        load = self._loads[order_id] = _Load(asyncio.get_running_loop().create_future())
+        try:
+            response = await self.loader(order_id)
+            entry = CachedOrder.from_response(response) if response is not None else None
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                load.future.cancel()
+            else:
+                load.future.set_exception(e)
+                # Mark the exception as retrieved in case nobody was waiting
+                load.future.exception()
+            raise
+        finally:
+            del self._loads[order_id]
+
+        if entry is not None and not load.stale:
+            self._store(order_id, entry)
+        load.future.set_result(entry)
+        return entry
+
+    def put(self, order_id: str, response: OrderResponse) -> CachedOrder:
+        """Cache a response that was just written (write-through)."""
+        entry = CachedOrder.from_response(response)
+        self._store(order_id, entry)
+        return entry
+
+    def invalidate(self, order_id: str) -> None:
+        """Drop an order after its stored state changed."""
+        self._entries.pop(order_id, None)
+        load = self._loads.get(order_id)
+        if load is not None:
+            load.stale = True
+
+    def _store(self, order_id: str, entry: CachedOrder) -> None:
+        self._entries[order_id] = entry
+        self._entries.move_to_end(order_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
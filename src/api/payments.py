@@ -0,0 +1,271 @@
+"""
+Asynchronous payment processing.
+
+Payments follow the ``payments`` table of ``base_database_ddl.sql``. The HTTP
+handler only records the payment and queues it; provider calls run on a pool
+of asyncio workers with bounded concurrency, so a slow provider never holds
+up a request.
+
+Failed attempts (provider errors, timeouts, unexpected exceptions from the
+provider or an explicit "retry" answer) are rescheduled with exponential
+backoff driven by ``retry_count``:
+``min(max_delay, base_delay * 2 ** (retry_count - 1))`` scaled by a random
+jitter in [0.5, 1]. After ``max_retries`` retries the payment is marked
+``failed``.
+
+Providers implement ``PaymentProvider``; ``FakePaymentProvider`` is a local
+stand-in for tests and development.
+
+``PaymentStore`` keeps payments in memory, bounded by evicting the oldest
+payments that already reached a final status.
+"""
+import asyncio
+import logging
+import random
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+INITIATED = "initiated"
+PENDING = "pending"
+CONFIRMED = "confirmed"
+FAILED = "failed"
+RETRY = "retry"
+
+class ProviderError(Exception):
+    """Transient provider failure; the attempt will be retried."""
+
+class PaymentQueueFull(Exception):
+    """Raised when the worker pool cannot accept more payments."""
+
+@dataclass
+class Payment:
+    id: str
+    order_id: str
+    amount: Decimal
+    method: str
+    currency: str = "COP"
+    status: str = INITIATED
+    provider_transaction_id: Optional[str] = None
+    provider_response: Optional[dict] = None
+    retry_count: int = 0
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+@dataclass(frozen=True)
+class ProviderResult:
+    status: str  # confirmed, failed or retry
+    transaction_id: Optional[str] = None
+    response: Optional[dict] = None
+
+class PaymentProvider(ABC):
+    """Payment gateway client."""
+
+    @abstractmethod
+    async def charge(self, payment: Payment) -> ProviderResult:
+        """
+        Charge a payment.
+
+        Raises:
+            ProviderError: On transient failures that should be retried
+        """
+
+class FakePaymentProvider(PaymentProvider):
+    """
+    Local provider that answers from a script of outcomes.
+
+    Each call consumes the next outcome ("confirmed", "failed", "retry" or
+    "error" to raise ProviderError); once the script is exhausted every
+    charge is confirmed.
+    """
+
+    def __init__(self, outcomes: Optional[List[str]] = None, latency: float = 0.0):
+        self.outcomes = list(outcomes or [])
+        self.latency = latency
+        self.calls = 0
+
+    async def charge(self, payment: Payment) -> ProviderResult:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        outcome = self.outcomes.pop(0) if self.outcomes else CONFIRMED
+        if outcome == "error":
+            raise ProviderError("Fake provider error")
+        return ProviderResult(
+            status=outcome,
+            transaction_id=f"fake-{uuid.uuid4()}" if outcome == CONFIRMED else None,
+            response={"provider": "fake", "outcome": outcome, "attempt": payment.retry_count + 1}
+        )
+
+class PaymentStore:
+    """
+    In-memory payment storage keyed by payment id.
+
+    Holds at most ``max_payments`` payments: once over the limit, the
+    payments that were finalized (confirmed or failed) first are evicted.
+    Payments still being processed are never evicted.
+    """
+
+    def __init__(self, max_payments: int = 100000):
+        if max_payments < 1:
+            raise ValueError("max_payments must be positive")
+        self.max_payments = max_payments
+        self._payments: Dict[str, Payment] = {}
+        # Finalized payment ids, oldest first
+        self._finished: "OrderedDict[str, None]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._payments)
+
+    def save(self, payment: Payment) -> None:
+        payment.updated_at = datetime.now(timezone.utc)
+        self._payments[payment.id] = payment
+        if payment.status in (CONFIRMED, FAILED):
+            self._finished[payment.id] = None
+            self._finished.move_to_end(payment.id)
+        while len(self._payments) > self.max_payments and self._finished:
+            payment_id, _ = self._finished.popitem(last=False)
+            del self._payments[payment_id]
+
+    def get(self, payment_id: str) -> Optional[Payment]:
+        return self._payments.get(payment_id)
+
+class PaymentWorkerPool:
+    """
+    Bounded pool of asyncio workers that charge queued payments.
+
+    At most ``concurrency`` provider calls are in flight at any time.
+    """
+
+    def __init__(
+        self,
+        provider: PaymentProvider,
+        store: PaymentStore,
+        concurrency: int = 8,
+        max_retries: int = 5,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        attempt_timeout: float = 10.0,
+        max_queued: int = 10000
+    ):
+        if concurrency < 1:
+            raise ValueError("Concurrency must be positive")
+        self.provider = provider
+        self.store = store
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.attempt_timeout = attempt_timeout
+        self.max_queued = max_queued
+        # Unbounded so retries can always be requeued; submit enforces max_queued
+        self._queue: "asyncio.Queue[str]" = asyncio.Queue()
+        self._workers: List[asyncio.Task] = []
+        self._retry_handles: Set[asyncio.TimerHandle] = set()
+
+    @property
+    def scheduled_retries(self) -> int:
+        return len(self._retry_handles)
+
+    def start(self) -> None:
+        if self._workers:
+            return
+        # Queues bind to the loop that first waits on them; rebuild the queue
+        # so the pool can be restarted under a new event loop
+        queue: "asyncio.Queue[str]" = asyncio.Queue()
+        while not self._queue.empty():
+            queue.put_nowait(self._queue.get_nowait())
+        self._queue = queue
+        loop = asyncio.get_running_loop()
+        self._workers = [loop.create_task(self._work()) for _ in range(self.concurrency)]
+
+    async def stop(self) -> None:
+        """Cancel workers and scheduled retries; unfinished payments stay pending."""
+        for handle in self._retry_handles:
+            handle.cancel()
+        self._retry_handles.clear()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def submit(self, order_id: str, amount: Decimal, method: str) -> Payment:
+        """
+        Record a payment and queue its first provider attempt.
+
+        Raises:
+            PaymentQueueFull: If too many payments are already queued
+        """
+        if self._queue.qsize() >= self.max_queued:
+            raise PaymentQueueFull("Payment queue is full")
+        payment = Payment(id=str(uuid.uuid4()), order_id=order_id, amount=amount, method=method)
+        self.store.save(payment)
+        self._queue.put_nowait(payment.id)
+        return payment
+
+    async def join(self) -> None:
+        """Wait until every queued attempt, including retries, has finished."""
+        while True:
+            await self._queue.join()
+            if not self._retry_handles:
+                return
+            await asyncio.sleep(min(self.base_delay, 0.01))
+
+    def retry_delay(self, retry_count: int) -> float:
+        """Backoff delay in seconds before retry number `retry_count`."""
+        delay = min(self.max_delay, self.base_delay * 2 ** (retry_count - 1))
+        return delay * random.uniform(0.5, 1.0)
+
+    async def _work(self) -> None:
+        while True:
+            payment_id = await self._queue.get()
+            try:
+                payment = self.store.get(payment_id)
+                if payment is not None and payment.status in (INITIATED, PENDING):
+                    await self._attempt(payment)
+            except Exception:
+                logger.exception("Unexpected error processing payment %s", payment_id)
+            finally:
+                self._queue.task_done()
+
+    async def _attempt(self, payment: Payment) -> None:
+        payment.status = PENDING
+        self.store.save(payment)
+        try:
+            result = await asyncio.wait_for(self.provider.charge(payment), self.attempt_timeout)
+        except (ProviderError, asyncio.TimeoutError) as e:
+            result = ProviderResult(status=RETRY, response={"error": str(e) or type(e).__name__})
+        except Exception as e:
+            # Unexpected errors (e.g. connection failures) are retried too, so
+            # every attempt ends in a retry or a final status
+            logger.exception("Unexpected error charging payment %s", payment.id)
+            result = ProviderResult(status=RETRY, response={"error": str(e) or type(e).__name__})
+
+        payment.provider_response = result.response
+        if result.status == RETRY:
+            self._schedule_retry(payment)
+        else:
+            payment.status = CONFIRMED if result.status == CONFIRMED else FAILED
+            payment.provider_transaction_id = result.transaction_id
+        self.store.save(payment)
+
+    def _schedule_retry(self, payment: Payment) -> None:
+        if payment.retry_count >= self.max_retries:
+            payment.status = FAILED
+            return
+        payment.retry_count += 1
+        loop = asyncio.get_running_loop()
+        handle: Optional[asyncio.TimerHandle] = None
+
+        def requeue():
+            self._retry_handles.discard(handle)
+            self._queue.put_nowait(payment.id)
+
+        handle = loop.call_later(self.retry_delay(payment.retry_count), requeue)
+        self._retry_handles.add(handle)
@@ -0,0 +1,464 @@
+"""
+Order persistence following the ``orders`` and ``order_items`` tables of
+``base_database_ddl.sql``.
+
+The module provides:
+- ``SQLiteConnectionPool``: a fixed-size pool of SQLite connections, used as
+  the local stand-in for the production Postgres database
+- ``OrderRepository``: schema creation, batched multi-row inserts, order
+  lookups and status transitions
+- ``OrderWriteBehind``: an asyncio write-behind buffer that groups submitted
+  orders into batches and writes them on a worker thread, so request
+  handlers never block the event loop on database I/O
+
+Amounts are stored as text with two decimal places (``numeric(12, 2)``),
+rounded half up as Postgres does.
+"""
+import asyncio
+import logging
+import queue
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from .models import OrderRequest, OrderResponse
+
+logger = logging.getLogger(__name__)
+
+ORDER_DB_ENV = "ORDER_DB_PATH"
+# Shared in-memory database, alive while the pool keeps a connection open
+DEFAULT_ORDER_DB = "file:jikkosoft_orders?mode=memory&cache=shared"
+
+# SQLite limits bound parameters per statement (999 on older builds)
+MAX_SQL_PARAMETERS = 999
+
+SCHEMA = """
+create table if not exists orders (
+  id text primary key,
+  customer_id text,
+  restaurant_id text,
+  status text,
+  subtotal text,
+  shipping text,
+  discount text,
+  total text,
+  created_at timestamp,
+  updated_at timestamp
+);
+
+create table if not exists order_items (
+  id text primary key,
+  order_id text references orders (id),
+  menu_item_id text,
+  quantity int,
+  price text
+);
+
+create index if not exists idx_order_items_order_id on order_items (order_id);
+"""
+
+ORDER_COLUMNS = (
+    "id", "customer_id", "restaurant_id", "status", "subtotal",
+    "shipping", "discount", "total", "created_at", "updated_at"
+)
+ORDER_ITEM_COLUMNS = ("id", "order_id", "menu_item_id", "quantity", "price")
+
+CENT = Decimal('0.01')
+
+class WriteBufferFull(Exception):
+    """Raised when the write-behind buffer cannot accept more orders."""
+
+@dataclass(frozen=True)
+class OrderItemRecord:
+    id: str
+    menu_item_id: str
+    quantity: int
+    price: Decimal
+
+@dataclass(frozen=True)
+class OrderRecord:
+    id: str
+    status: str
+    subtotal: Decimal
+    shipping: Decimal
+    discount: Decimal
+    total: Decimal
+    created_at: datetime
+    items: Tuple[OrderItemRecord, ...] = field(default_factory=tuple)
+    customer_id: Optional[str] = None
+    restaurant_id: Optional[str] = None
+
+    @classmethod
+    def from_order(cls, order_id: str, order: OrderRequest, totals: OrderResponse) -> "OrderRecord":
+        """Build the record for a priced order."""
+        return cls(
+            id=order_id,
+            status="created",
+            subtotal=totals.subtotal,
+            shipping=totals.shipping_fee,
+            discount=totals.discount_amount,
+            total=totals.total,
+            created_at=datetime.now(timezone.utc),
+            items=tuple(
+                OrderItemRecord(
+                    id=str(uuid.uuid4()),
+                    menu_item_id=product.id,
+                    quantity=product.quantity,
+                    price=product.price
+                )
+                for product in order.products
+            )
+        )
+
+    def to_response(self) -> OrderResponse:
+        """The order as OrderRepository.get_order will return it once stored."""
+        return OrderResponse(
+            order_id=self.id,
+            status=self.status,
+            subtotal=Decimal(_money(self.subtotal)),
+            shipping_fee=Decimal(_money(self.shipping)),
+            discount_amount=Decimal(_money(self.discount)),
+            total=Decimal(_money(self.total))
+        )
+
+class SQLiteConnectionPool:
+    """
+    Fixed-size pool of SQLite connections shareable across threads.
+
+    Connections are created up front and handed out one at a time; callers
+    block until a connection is free. In-memory databases use a single
+    connection, since shared-cache connections fail instead of waiting on
+    table locks held by each other.
+    """
+
+    def __init__(self, database: str, size: int = 4, timeout: float = 30.0):
+        if size < 1:
+            raise ValueError("Pool size must be positive")
+        if _is_memory_database(database):
+            size = 1
+        self.database = database
+        self.size = size
+        self._timeout = timeout
+        self._connections: "queue.Queue[sqlite3.Connection]" = queue.Queue(maxsize=size)
+        for _ in range(size):
+            self._connections.put(self._connect())
+
+    def _connect(self) -> sqlite3.Connection:
+        uri = self.database.startswith("file:")
+        connection = sqlite3.connect(
+            self.database, timeout=self._timeout, uri=uri, check_same_thread=False
+        )
+        if not _is_memory_database(self.database):
+            connection.execute("pragma journal_mode=wal")
+        return connection
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a connection, committing on success and rolling back on error."""
+        connection = self._connections.get(timeout=self._timeout)
+        try:
+            with connection:
+                yield connection
+        finally:
+            self._connections.put(connection)
+
+    def close(self) -> None:
+        """Close every pooled connection."""
+        while True:
+            try:
+                self._connections.get_nowait().close()
+            except queue.Empty:
+                break
+
+class OrderRepository:
+    """Reads and writes orders through a connection pool."""
+
+    def __init__(self, pool: SQLiteConnectionPool):
+        self.pool = pool
+
+    def create_schema(self) -> None:
+        with self.pool.connection() as connection:
+            connection.executescript(SCHEMA)
+
+    def insert_orders(self, records: Sequence[OrderRecord]) -> None:
+        """
+        Insert orders and their items in a single transaction.
+
+        Rows are written with multi-row INSERT statements, chunked to stay
+        under the SQLite bound parameter limit.
+        """
+        order_rows = [_order_row(record) for record in records]
+        item_rows = [
+            (item.id, record.id, item.menu_item_id, item.quantity, _money(item.price))
+            for record in records
+            for item in record.items
+        ]
+        with self.pool.connection() as connection:
+            _insert_many(connection, "orders", ORDER_COLUMNS, order_rows)
+            _insert_many(connection, "order_items", ORDER_ITEM_COLUMNS, item_rows)
+
+    def get_order(self, order_id: str) -> Optional[OrderResponse]:
+        """Load the totals and status of an order, or None if it does not exist."""
+        with self.pool.connection() as connection:
+            row = connection.execute(
+                "select id, status, subtotal, shipping, discount, total from orders where id = ?",
+                (order_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return OrderResponse(
+            order_id=row[0],
+            status=row[1],
+            subtotal=Decimal(row[2]),
+            shipping_fee=Decimal(row[3]),
+            discount_amount=Decimal(row[4]),
+            total=Decimal(row[5])
+        )
+
+    def transition_status(self, order_id: str, status: str, from_statuses: Sequence[str]) -> bool:
+        """
+        Set the status of an order if its current status is in `from_statuses`.
+
+        Returns:
+            True if the order was updated
+        """
+        if not from_statuses:
+            return False
+        placeholders = ", ".join(["?"] * len(from_statuses))
+        with self.pool.connection() as connection:
+            cursor = connection.execute(
+                f"update orders set status = ?, updated_at = ? where id = ? and status in ({placeholders})",
+                (status, datetime.now(timezone.utc).isoformat(sep=" "), order_id, *from_statuses)
+            )
+            return cursor.rowcount == 1
+
+    def count_orders(self) -> int:
+        with self.pool.connection() as connection:
+            return connection.execute("select count(*) from orders").fetchone()[0]
+
+class OrderWriteBehind:
+    """
+    Asyncio write-behind buffer for orders.
+
+    ``submit`` only appends to an in-memory queue. A background task drains
+    the queue in batches of up to ``max_batch_size`` orders and writes each
+    batch with ``OrderRepository.insert_orders`` on a worker thread.
+
+    Clients already hold the ids of buffered orders, so failed writes are
+    retried with exponential backoff: transient errors (database locked or
+    busy) for up to ``max_retry_seconds``, other errors up to
+    ``max_attempts`` times. A batch that still fails with a non-transient
+    error is written order by order, so only the orders that cannot be
+    stored are dropped.
+
+    ``wait_written`` lets a caller wait for one buffered order without
+    waiting for the rest of the queue.
+    """
+
+    def __init__(
+        self,
+        repository: OrderRepository,
+        max_batch_size: int = 500,
+        max_pending: int = 50000,
+        max_attempts: int = 3,
+        retry_delay: float = 0.1,
+        max_retry_delay: float = 5.0,
+        max_retry_seconds: float = 30.0
+    ):
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be positive")
+        self.repository = repository
+        self.max_batch_size = max_batch_size
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.max_retry_seconds = max_retry_seconds
+        self._queue: "asyncio.Queue[OrderRecord]" = asyncio.Queue(maxsize=max_pending)
+        self._task: Optional[asyncio.Task] = None
+        # Buffered order id -> future resolved with whether it was written
+        self._outcomes: Dict[str, asyncio.Future] = {}
+        self.written = 0
+        self.failed = 0
+        self.retries = 0
+        self.batches = 0
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def submit(self, record: OrderRecord) -> None:
+        """
+        Queue an order for persistence without waiting for the write.
+
+        Raises:
+            WriteBufferFull: If max_pending orders are already buffered
+        """
+        try:
+            self._queue.put_nowait(record)
+        except asyncio.QueueFull:
+            raise WriteBufferFull("Order write buffer is full")
+        self._outcomes[record.id] = asyncio.get_running_loop().create_future()
+
+    async def wait_written(self, order_id: str, timeout: float) -> bool:
+        """
+        Wait until a buffered order has been written.
+
+        Returns True once the order is in the repository (or was not
+        buffered at all) and False if its write failed.
+
+        Raises:
+            asyncio.TimeoutError: If the order is still buffered after
+                `timeout` seconds
+        """
+        outcome = self._outcomes.get(order_id)
+        if outcome is None:
+            return True
+        return await asyncio.wait_for(asyncio.shield(outcome), timeout)
+
+    async def flush(self) -> None:
+        """Wait until every submitted order has been written (or failed)."""
+        await self._queue.join()
+
+    async def stop(self, timeout: float = 30.0) -> None:
+        """
+        Flush pending orders and stop the background task.
+
+        Gives up after `timeout` seconds (e.g. while the database stays
+        locked), so shutdown never hangs; orders still buffered are logged
+        as lost.
+        """
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(self.flush(), timeout)
+        except asyncio.TimeoutError:
+            logger.error("Stopping with %d orders not persisted after %.1fs", self.pending, timeout)
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        for outcome in self._outcomes.values():
+            if not outcome.done():
+                outcome.set_result(False)
+        self._outcomes.clear()
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.max_batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await self._write(batch)
+                self.written += len(batch)
+                self._resolve(batch, True)
+            except Exception as e:
+                if len(batch) == 1 or _is_transient(e):
+                    # Writing order by order cannot help while the database is locked
+                    self.failed += len(batch)
+                    self._resolve(batch, False)
+                    logger.exception("Failed to persist a batch of %d orders", len(batch))
+                else:
+                    logger.exception("Failed to persist a batch of %d orders, writing them one by one", len(batch))
+                    await self._write_each(batch)
+            finally:
+                self.batches += 1
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _write(self, records: List[OrderRecord]) -> None:
+        """
+        Insert records, retrying failures with exponential backoff.
+
+        Raises:
+            Exception: The last error, once a non-transient error has
+                failed max_attempts times or transient errors have lasted
+                max_retry_seconds
+        """
+        attempt = 0
+        deadline = time.monotonic() + self.max_retry_seconds
+        while True:
+            try:
+                await asyncio.to_thread(self.repository.insert_orders, records)
+                return
+            except Exception as e:
+                attempt += 1
+                if _is_transient(e):
+                    if time.monotonic() >= deadline:
+                        raise
+                elif attempt >= self.max_attempts:
+                    raise
+                delay = min(self.retry_delay * 2 ** (attempt - 1), self.max_retry_delay)
+                logger.warning("Retrying %d orders in %.2fs after: %s", len(records), delay, e)
+                self.retries += 1
+                await asyncio.sleep(delay)
+
+    async def _write_each(self, records: List[OrderRecord]) -> None:
+        for record in records:
+            try:
+                await self._write([record])
+                self.written += 1
+                self._resolve([record], True)
+            except Exception:
+                self.failed += 1
+                self._resolve([record], False)
+                logger.exception("Failed to persist order %s", record.id)
+
+    def _resolve(self, records: List[OrderRecord], written: bool) -> None:
+        for record in records:
+            outcome = self._outcomes.pop(record.id, None)
+            if outcome is not None and not outcome.done():
+                outcome.set_result(written)
+
+def _is_transient(error: Exception) -> bool:
+    """Whether a write error is expected to go away when retried."""
+    if not isinstance(error, sqlite3.OperationalError):
+        return False
+    message = str(error).lower()
+    return "locked" in message or "busy" in message
+
+def _is_memory_database(database: str) -> bool:
+    return database == ":memory:" or "mode=memory" in database
+
+def _money(amount: Decimal) -> str:
+    return str(amount.quantize(CENT, rounding=ROUND_HALF_UP))
+
+def _order_row(record: OrderRecord) -> tuple:
+    return (
+        record.id,
+        record.customer_id,
+        record.restaurant_id,
+        record.status,
+        _money(record.subtotal),
+        _money(record.shipping),
+        _money(record.discount),
+        _money(record.total),
+        record.created_at.isoformat(sep=" "),
+        record.created_at.isoformat(sep=" ")
+    )
+
+def _insert_many(
+    connection: sqlite3.Connection,
+    table: str,
+    columns: Sequence[str],
+    rows: List[tuple]
+) -> None:
+    """Insert rows with multi-row VALUES statements."""
+    if not rows:
+        return
+    row_placeholder = "(" + ", ".join(["?"] * len(columns)) + ")"
+    chunk_size = max(1, MAX_SQL_PARAMETERS // len(columns))
+    prefix = f"insert into {table} ({', '.join(columns)}) values "
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        sql = prefix + ", ".join([row_placeholder] * len(chunk))
+        connection.execute(sql, [value for row in chunk for value in row])
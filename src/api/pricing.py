@@ -0,0 +1,101 @@
+"""
+Pricing engines for order totals.
+
+Two interchangeable engines are provided, both returning the same
+(subtotal, shipping_fee, discount_amount, total) tuple:
+
+- ``decimal``: the reference implementation, ``OrderService.calculate_order_totals``,
+  which performs every operation with ``Decimal``.
+- ``cents``: integer arithmetic in COP minor units (cents), returning
+  amounts rounded to whole cents.
+
+Rounding rules of the ``cents`` engine:
+- The subtotal is summed with ``Decimal`` and converted exactly to cents. If
+  it has sub-cent precision (more than two decimal places) the order is
+  priced with the ``decimal`` engine instead, so no input is ever rounded.
+- Discount rates are stored as integer basis points (1/10000). The discount
+  is computed exactly as ``subtotal_cents * rate_bp`` (units of 1e-6 COP) and
+  rounded once to whole cents with ROUND_HALF_UP.
+- All returned amounts are ``Decimal`` values with exactly two decimal places.
+
+Whenever the discount is a whole number of cents both engines return
+numerically identical results; otherwise they differ only by the cent
+rounding of ``discount_amount`` and ``total``.
+
+The ``cents`` engine is not faster: ``decimal`` runs in C (libmpdec), and
+converting the amounts to and from cents costs at least as much as the
+arithmetic it saves (0.7-1.0x the speed of ``decimal`` in
+``src.api.benchmark``). Choose it only for its cent-rounded amounts.
+
+The engine is selected per deployment with the ``ORDER_PRICING_ENGINE``
+environment variable (``decimal`` by default).
+"""
+import os
+from decimal import Decimal
+from typing import Callable, Dict, Optional, Tuple
+from .models import OrderRequest
+from .pricing_rules import BASIS_POINTS, CENTS_PER_UNIT, from_cents
+from .service import OrderService
+
+PricingEngine = Callable[[OrderRequest], Tuple[Decimal, Decimal, Decimal, Decimal]]
+
+PRICING_ENGINE_ENV = "ORDER_PRICING_ENGINE"
+DEFAULT_PRICING_ENGINE = "decimal"
+
+def calculate_order_totals_cents(order: OrderRequest) -> Tuple[Decimal, Decimal, Decimal, Decimal]:
+    """
+    Calculate order totals using integer cents arithmetic.
+
+    Returns:
+        Tuple containing (subtotal, shipping_fee, discount_amount, total)
+    """
+    # Sum the subtotal with Decimal (C speed) and convert it to cents once,
+    # falling back on sub-cent subtotals
+    subtotal_amount = sum(item.price * item.quantity for item in order.products)
+    numerator, denominator = subtotal_amount.as_integer_ratio()
+    if CENTS_PER_UNIT % denominator:
+        return OrderService.calculate_order_totals(order)
+    subtotal = numerator * (CENTS_PER_UNIT // denominator)
+
+    pricing = OrderService.pricing_rules.current().lookup(order.stratum, order.city)
+
+    # Calculate discount, rounding half up to whole cents
+    basis_points = pricing.discount_basis_points(subtotal)
+    discount_amount = (subtotal * basis_points + BASIS_POINTS // 2) // BASIS_POINTS
+
+    total = subtotal + pricing.shipping_fee_cents - discount_amount
+
+    return (
+        from_cents(subtotal),
+        pricing.shipping_fee_rounded,
+        from_cents(discount_amount),
+        from_cents(total)
+    )
+
+PRICING_ENGINES: Dict[str, PricingEngine] = {
+    "decimal": OrderService.calculate_order_totals,
+    "cents": calculate_order_totals_cents,
+}
+
+def get_pricing_engine(name: Optional[str] = None) -> PricingEngine:
+    """
+    Resolve a pricing engine by name.
+
+    Args:
+        name: Engine name; defaults to the ORDER_PRICING_ENGINE environment
+            variable, or "decimal" when unset
+
+    Returns:
+        Callable that computes (subtotal, shipping_fee, discount_amount, total)
+
+    Raises:
+        ValueError: If the engine name is unknown
+    """
+    if name is None:
+        name = os.getenv(PRICING_ENGINE_ENV, DEFAULT_PRICING_ENGINE)
+    try:
+        return PRICING_ENGINES[name.strip().lower()]
+    except KeyError:
+        raise ValueError(
+            f"Unknown pricing engine '{name}'. Available: {', '.join(sorted(PRICING_ENGINES))}"
+        )
@@ -0,0 +1,494 @@
+"""
+Compiled pricing rule tables for shipping fees and discounts.
+
+Rules are read from a local JSON file and compiled into immutable lookup
+tables, so pricing an order costs two dictionary lookups and at most two
+`bisect` searches regardless of how many promotions are configured:
+
+- Per city: shipping fees per stratum and discount tiers, falling back to the
+  default rules for anything a city does not override.
+- Per stratum: promotions may target a subset of strata.
+- Time-bound promotions: every promotion is active in ``[starts_at, ends_at)``.
+  The timeline is split into segments at every promotion boundary and each
+  segment gets its own precomputed discount table.
+
+Discount tiers follow the ``OrderService.DISCOUNT_RULES`` semantics: a tier
+applies when ``subtotal >= threshold`` and, within one rule set, the tier with
+the highest threshold wins. When promotions are active, the best rate among
+the base rules and the active promotions applies.
+
+Example configuration::
+
+    {
+        "shipping_fees": {"1": "2000.00", "2": "3000.00", ...},
+        "discount_rules": [{"threshold": "100000", "rate": "0.10"}, ...],
+        "cities": {
+            "medellin": {"shipping_fees": {"1": "2500.00"}}
+        },
+        "promotions": [
+            {
+                "name": "black-friday",
+                "starts_at": "2025-11-28T00:00:00",
+                "ends_at": "2025-11-29T00:00:00",
+                "cities": ["medellin"],
+                "strata": [1, 2, 3],
+                "discount_rules": [{"threshold": "30000", "rate": "0.15"}]
+            }
+        ]
+    }
+
+Naive timestamps are interpreted as local time. Rates must be representable
+in basis points (at most four decimal places) so the integer cents engine can
+use the same tables.
+
+Reloading compiles a complete new table set and publishes it with a single
+reference assignment; requests already holding the previous tables finish
+with them, and no request ever waits on a reload.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+PRICING_RULES_ENV = "PRICING_RULES_PATH"
+DEFAULT_CITY = "default"
+
+CENTS_PER_UNIT = 100
+BASIS_POINTS = 10000
+
+DiscountTiers = Tuple[Tuple[Decimal, Decimal], ...]
+
+def to_cents(amount: Decimal) -> Optional[int]:
+    """
+    Convert an amount to integer cents.
+
+    Returns:
+        The amount in cents, or None if it has sub-cent precision
+    """
+    scaled = amount * CENTS_PER_UNIT
+    cents = int(scaled)
+    if cents != scaled:
+        return None
+    return cents
+
+def from_cents(cents: int) -> Decimal:
+    """Convert integer cents back to a Decimal with two decimal places."""
+    return Decimal(cents).scaleb(-2)
+
+def to_basis_points(rate: Decimal) -> int:
+    """
+    Convert a discount rate to integer basis points.
+
+    Raises:
+        ValueError: If the rate cannot be represented exactly in basis points
+    """
+    scaled = rate * BASIS_POINTS
+    basis_points = int(scaled)
+    if basis_points != scaled:
+        raise ValueError(f"Discount rate {rate} is not representable in basis points")
+    return basis_points
+
+@dataclass(frozen=True)
+class StratumPricing:
+    """
+    Pricing for one city, stratum and time segment.
+
+    Discount thresholds are sorted ascending; ``rates[i]`` applies to
+    subtotals in ``[thresholds[i], thresholds[i + 1])``.
+    """
+    shipping_fee: Decimal
+    thresholds: Tuple[Decimal, ...]
+    rates: Tuple[Decimal, ...]
+    shipping_fee_cents: int
+    shipping_fee_rounded: Decimal
+    thresholds_cents: Tuple[int, ...]
+    rates_bp: Tuple[int, ...]
+
+    def discount_rate(self, subtotal: Decimal) -> Optional[Decimal]:
+        """Return the discount rate for a subtotal, or None if no tier applies."""
+        index = bisect_right(self.thresholds, subtotal)
+        return self.rates[index - 1] if index else None
+
+    def discount_basis_points(self, subtotal_cents: int) -> int:
+        """Return the discount rate in basis points for a subtotal in cents."""
+        index = bisect_right(self.thresholds_cents, subtotal_cents)
+        return self.rates_bp[index - 1] if index else 0
+
+@dataclass(frozen=True)
+class CityPricing:
+    """Pricing timeline of a city: segment start timestamps and their tables."""
+    segment_starts: Tuple[float, ...]
+    segments: Tuple[Dict[int, StratumPricing], ...]
+
+@dataclass(frozen=True)
+class _Promotion:
+    name: str
+    starts_at: float
+    ends_at: float
+    cities: Optional[frozenset]
+    strata: Optional[frozenset]
+    tiers: DiscountTiers
+
+class CompiledPricingRules:
+    """
+    Immutable, precompiled pricing tables.
+
+    Time Complexity:
+    - lookup: O(log P) where P is the number of promotion boundaries
+    - discount rate: O(log T) where T is the number of discount tiers
+    """
+
+    def __init__(self, cities: Dict[str, CityPricing]):
+        self._cities = cities
+        self._default = cities[DEFAULT_CITY]
+
+    def lookup(self, stratum: int, city: Optional[str] = None, at: Optional[float] = None) -> StratumPricing:
+        """
+        Get the pricing that applies to an order.
+
+        Args:
+            stratum: Delivery stratum (1-6)
+            city: City of the delivery; unknown cities use the default rules
+            at: POSIX timestamp to price at; defaults to now
+
+        Raises:
+            KeyError: If the stratum has no configured shipping fee
+        """
+        city_pricing = self._default
+        if city:
+            city_pricing = self._cities.get(city.strip().lower(), self._default)
+
+        segments = city_pricing.segments
+        if len(segments) == 1:
+            return segments[0][stratum]
+
+        index = bisect_right(city_pricing.segment_starts, time.time() if at is None else at) - 1
+        return segments[index][stratum]
+
+def compile_pricing_rules(
+    config: Dict[str, Any],
+    default_shipping_fees: Dict[int, Decimal],
+    default_discount_rules: Sequence[Tuple[Decimal, Decimal]]
+) -> CompiledPricingRules:
+    """
+    Compile a pricing rules configuration into lookup tables.
+
+    Args:
+        config: Parsed configuration (see module docstring); may be empty
+        default_shipping_fees: Shipping fees used when the config has none
+        default_discount_rules: (threshold, rate) tiers used when the config has none
+
+    Returns:
+        CompiledPricingRules ready to be published
+
+    Raises:
+        ValueError: If the configuration is invalid
+    """
+    base_fees = dict(default_shipping_fees)
+    base_fees.update(_parse_shipping_fees(config.get("shipping_fees", {}), "shipping_fees"))
+    base_tiers = _normalize_tiers(default_discount_rules)
+    if "discount_rules" in config:
+        base_tiers = _parse_tiers(config["discount_rules"], "discount_rules")
+
+    city_rules = {DEFAULT_CITY: (base_fees, base_tiers)}
+    for city, rules in _expect(config.get("cities", {}), dict, "cities").items():
+        _expect(rules, dict, f"cities.{city}")
+        name = city.strip().lower()
+        if not name:
+            raise ValueError("City names cannot be empty")
+        fees = dict(base_fees)
+        fees.update(_parse_shipping_fees(rules.get("shipping_fees", {}), f"cities.{city}.shipping_fees"))
+        tiers = base_tiers
+        if "discount_rules" in rules:
+            tiers = _parse_tiers(rules["discount_rules"], f"cities.{city}.discount_rules")
+        city_rules[name] = (fees, tiers)
+
+    promotions = [
+        _parse_promotion(promotion, index)
+        for index, promotion in enumerate(_expect(config.get("promotions", []), list, "promotions"))
+    ]
+    # Cities only targeted by promotions otherwise use the default rules
+    for promotion in promotions:
+        for city in promotion.cities or ():
+            city_rules.setdefault(city, (base_fees, base_tiers))
+
+    # Tables are shared between cities and segments with the same inputs
+    table_cache: Dict[Tuple, StratumPricing] = {}
+    cities = {
+        name: _compile_city(name, fees, tiers, promotions, table_cache)
+        for name, (fees, tiers) in city_rules.items()
+    }
+    return CompiledPricingRules(cities)
+
+def load_pricing_rules(
+    path: str,
+    default_shipping_fees: Dict[int, Decimal],
+    default_discount_rules: Sequence[Tuple[Decimal, Decimal]]
+) -> CompiledPricingRules:
+    """
+    Load and compile pricing rules from a JSON file.
+
+    Raises:
+        ValueError: If the file is not valid JSON or the rules are invalid
+    """
+    with open(path, 'r') as config_file:
+        try:
+            config = json.load(config_file, parse_float=Decimal)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid pricing rules file {path}: {e}")
+    if not isinstance(config, dict):
+        raise ValueError(f"Pricing rules file {path} must contain a JSON object")
+    return compile_pricing_rules(config, default_shipping_fees, default_discount_rules)
+
+class PricingRules:
+    """
+    Holder of the active compiled pricing tables.
+
+    ``current()`` is a plain attribute read, so the hot path never takes a
+    lock. ``reload()`` compiles a new table set off to the side and swaps the
+    reference in one assignment. When a rules file is configured, a daemon
+    thread started with ``start_auto_reload()`` recompiles it whenever its
+    modification time changes.
+    """
+
+    def __init__(
+        self,
+        default_shipping_fees: Dict[int, Decimal],
+        default_discount_rules: Sequence[Tuple[Decimal, Decimal]],
+        path: Optional[str] = None
+    ):
+        self._default_shipping_fees = dict(default_shipping_fees)
+        self._default_discount_rules = list(default_discount_rules)
+        self.path = path
+        self._mtime: Optional[float] = None
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._rules = compile_pricing_rules({}, self._default_shipping_fees, self._default_discount_rules)
+        if path:
+            self.reload()
+
+    def current(self) -> CompiledPricingRules:
+        """Return the active compiled tables."""
+        return self._rules
+
+    def reload(self) -> None:
+        """
+        Recompile the rules file and publish the new tables.
+
+        Raises:
+            ValueError: If the rules file is invalid; the active tables are kept
+        """
+        if not self.path:
+            return
+        mtime = os.path.getmtime(self.path)
+        rules = load_pricing_rules(self.path, self._default_shipping_fees, self._default_discount_rules)
+        self._rules = rules
+        self._mtime = mtime
+
+    def reload_if_changed(self) -> bool:
+        """
+        Reload the rules file if it was modified since the last load.
+
+        Invalid files are logged and ignored so a bad edit never takes down
+        pricing; the previous tables stay active.
+
+        Returns:
+            True if new tables were published
+        """
+        if not self.path:
+            return False
+        try:
+            if os.path.getmtime(self.path) == self._mtime:
+                return False
+            self.reload()
+            return True
+        except (OSError, ValueError) as e:
+            logger.warning("Keeping current pricing rules, reload of %s failed: %s", self.path, e)
+            return False
+
+    def start_auto_reload(self, interval: float = 1.0) -> None:
+        """Start watching the rules file for changes in a daemon thread."""
+        if not self.path or self._watcher is not None:
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(
+            target=self._watch, args=(interval,), name="pricing-rules-reload", daemon=True
+        )
+        self._watcher.start()
+
+    def stop_auto_reload(self) -> None:
+        """Stop the file watcher, if running."""
+        if self._watcher is None:
+            return
+        self._stop.set()
+        self._watcher.join()
+        self._watcher = None
+
+    def _watch(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            # Nothing may end the thread, or hot reload would stop for good
+            try:
+                self.reload_if_changed()
+            except Exception:
+                logger.exception("Unexpected error reloading pricing rules from %s", self.path)
+
+def _compile_city(
+    city: str,
+    fees: Dict[int, Decimal],
+    tiers: DiscountTiers,
+    promotions: List[_Promotion],
+    table_cache: Dict[Tuple, StratumPricing]
+) -> CityPricing:
+    applicable = [p for p in promotions if p.cities is None or city in p.cities]
+    boundaries = sorted({p.starts_at for p in applicable} | {p.ends_at for p in applicable})
+    segment_starts = [float('-inf')] + boundaries
+
+    segments = []
+    for start in segment_starts:
+        active = [p for p in applicable if p.starts_at <= start < p.ends_at]
+        segment = {}
+        for stratum, fee in fees.items():
+            sources = [tiers] + [p.tiers for p in active if p.strata is None or stratum in p.strata]
+            key = (fee, tuple(sources))
+            if key not in table_cache:
+                table_cache[key] = _build_stratum_pricing(fee, sources)
+            segment[stratum] = table_cache[key]
+        segments.append(segment)
+
+    return CityPricing(segment_starts=tuple(segment_starts), segments=tuple(segments))
+
+def _build_stratum_pricing(fee: Decimal, sources: List[DiscountTiers]) -> StratumPricing:
+    """Merge several tier sets into one step function taking the best rate."""
+    breakpoints = sorted({threshold for tiers in sources for threshold, _ in tiers})
+    source_tables = [([t for t, _ in tiers], [r for _, r in tiers]) for tiers in sources]
+
+    thresholds: List[Decimal] = []
+    rates: List[Decimal] = []
+    for point in breakpoints:
+        best = None
+        for source_thresholds, source_rates in source_tables:
+            index = bisect_right(source_thresholds, point)
+            if index and (best is None or source_rates[index - 1] > best):
+                best = source_rates[index - 1]
+        if rates and rates[-1] == best:
+            continue
+        thresholds.append(point)
+        rates.append(best)
+
+    fee_cents = to_cents(fee)
+    if fee_cents is None:
+        raise ValueError(f"Shipping fee {fee} has sub-cent precision")
+    thresholds_cents = []
+    for threshold in thresholds:
+        cents = to_cents(threshold)
+        if cents is None:
+            raise ValueError(f"Discount threshold {threshold} has sub-cent precision")
+        thresholds_cents.append(cents)
+
+    return StratumPricing(
+        shipping_fee=fee,
+        thresholds=tuple(thresholds),
+        rates=tuple(rates),
+        shipping_fee_cents=fee_cents,
+        shipping_fee_rounded=from_cents(fee_cents),
+        thresholds_cents=tuple(thresholds_cents),
+        rates_bp=tuple(to_basis_points(rate) for rate in rates)
+    )
+
+def _parse_decimal(value: Any, field: str) -> Decimal:
+    try:
+        amount = Decimal(str(value))
+    except InvalidOperation:
+        raise ValueError(f"{field}: invalid amount {value!r}")
+    if not amount.is_finite() or amount < 0:
+        raise ValueError(f"{field}: amount must be a non-negative number, got {value!r}")
+    return amount
+
+def _expect(value: Any, kind: type, field: str) -> Any:
+    """Return value if it has the expected JSON type, else raise ValueError."""
+    if not isinstance(value, kind):
+        names = {dict: "an object", list: "an array", str: "a string"}
+        raise ValueError(f"{field}: must be {names.get(kind, kind.__name__)}, got {value!r}")
+    return value
+
+def _parse_shipping_fees(fees: Dict[str, Any], field: str) -> Dict[int, Decimal]:
+    _expect(fees, dict, field)
+    parsed = {}
+    for stratum, fee in fees.items():
+        try:
+            stratum_number = int(stratum)
+        except ValueError:
+            raise ValueError(f"{field}: invalid stratum {stratum!r}")
+        parsed[stratum_number] = _parse_decimal(fee, f"{field}.{stratum}")
+    return parsed
+
+def _normalize_tiers(rules: Sequence[Tuple[Decimal, Decimal]]) -> DiscountTiers:
+    """Sort (threshold, rate) tiers ascending, validating rates."""
+    tiers = sorted((Decimal(threshold), Decimal(rate)) for threshold, rate in rules)
+    thresholds = [threshold for threshold, _ in tiers]
+    if len(set(thresholds)) != len(thresholds):
+        raise ValueError("Discount thresholds must be unique")
+    for _, rate in tiers:
+        if not 0 <= rate <= 1:
+            raise ValueError(f"Discount rate {rate} must be between 0 and 1")
+        to_basis_points(rate)
+    return tuple(tiers)
+
+def _parse_tiers(rules: List[Dict[str, Any]], field: str) -> DiscountTiers:
+    _expect(rules, list, field)
+    try:
+        tiers = [
+            (_parse_decimal(rule["threshold"], field), _parse_decimal(rule["rate"], field))
+            for rule in rules
+        ]
+    except (KeyError, TypeError):
+        raise ValueError(f"{field}: every rule needs a threshold and a rate")
+    try:
+        return _normalize_tiers(tiers)
+    except ValueError as e:
+        raise ValueError(f"{field}: {e}")
+
+def _parse_timestamp(value: Any, field: str) -> float:
+    try:
+        return datetime.fromisoformat(str(value)).timestamp()
+    except ValueError:
+        raise ValueError(f"{field}: invalid ISO timestamp {value!r}")
+
+def _parse_promotion(promotion: Dict[str, Any], index: int) -> _Promotion:
+    _expect(promotion, dict, f"promotions[{index}]")
+    name = str(promotion.get("name", f"promotion-{index}"))
+    field = f"promotions.{name}"
+    if "starts_at" not in promotion or "ends_at" not in promotion:
+        raise ValueError(f"{field}: starts_at and ends_at are required")
+    starts_at = _parse_timestamp(promotion["starts_at"], field)
+    ends_at = _parse_timestamp(promotion["ends_at"], field)
+    if starts_at >= ends_at:
+        raise ValueError(f"{field}: starts_at must be before ends_at")
+
+    cities = promotion.get("cities")
+    if cities is not None:
+        _expect(cities, list, f"{field}.cities")
+        cities = frozenset(_expect(city, str, f"{field}.cities").strip().lower() for city in cities)
+    strata = promotion.get("strata")
+    if strata is not None:
+        _expect(strata, list, f"{field}.strata")
+        try:
+            strata = frozenset(int(stratum) for stratum in strata)
+        except (TypeError, ValueError):
+            raise ValueError(f"{field}.strata: strata must be integers, got {strata!r}")
+    return _Promotion(
+        name=name,
+        starts_at=starts_at,
+        ends_at=ends_at,
+        cities=cities,
+        strata=strata,
+        tiers=_parse_tiers(promotion.get("discount_rules", []), f"{field}.discount_rules")
+    )
@@ -0,0 +1,55 @@
+"""
+Fast request parsing and response rendering for the order endpoints.
+
+FastAPI's default path decodes the body with ``json.loads``, validates the
+resulting dicts field by field, then serializes the response model through
+``jsonable_encoder`` and ``json.dumps``. For small carts that work costs more
+than pricing the order. This module does both ends in pydantic-core instead:
+
+- ``parse_body`` validates the raw body bytes in one step with a reusable
+  ``TypeAdapter`` (JSON decoding and validation in a single pass), and
+  raises the same ``RequestValidationError`` FastAPI would.
+- ``PydanticJSONResponse`` renders models with ``model_dump_json``, which
+  encodes Decimals as strings exactly like the default path.
+
+The validation rules are the ones declared on the models; nothing is skipped.
+"""
+from typing import Any, TypeVar
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from .models import OrderRequest
+
+T = TypeVar("T")
+
+# Built once: creating an adapter compiles a validator
+ORDER_REQUEST_ADAPTER = TypeAdapter(OrderRequest)
+
+def parse_body(adapter: TypeAdapter[T], body: bytes) -> T:
+    """
+    Decode and validate a JSON request body in one step.
+
+    Args:
+        adapter: TypeAdapter of the expected body type
+        body: Raw request body
+
+    Returns:
+        Validated body
+
+    Raises:
+        RequestValidationError: If the body is not valid JSON or fails validation;
+            errors are located under "body" as in FastAPI's own parsing
+    """
+    try:
+        return adapter.validate_json(body)
+    except ValidationError as e:
+        errors = [{**error, "loc": ("body", *error["loc"])} for error in e.errors()]
+        raise RequestValidationError(errors, body=body)
+
+class PydanticJSONResponse(JSONResponse):
+    """JSON response rendering pydantic models directly with pydantic-core."""
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.model_dump_json().encode()
+        return super().render(content)
@@ -1,9 +1,12 @@
 """
 Business logic for order processing.
 """
+import os
 from decimal import Decimal
-from typing import Tuple
-from .models import OrderRequest
+from typing import Any, Callable, Iterable, Optional, Tuple
+from pydantic import ValidationError
+from .pricing_rules import PRICING_RULES_ENV, PricingRules
+from .models import BatchOrderResponse, BatchOrderResult, OrderQuote, OrderRequest
 
 class OrderService:
     # Shipping fee matrix based on stratum (1-6)
@@ -23,6 +26,20 @@ class OrderService:
         (Decimal('20000'), Decimal('0.02')),   # 2% discount for orders over 20k
     ]
 
+    # Allowed order status transitions (created -> preparing -> assigned -> delivered)
+    STATUS_TRANSITIONS = {
+        'created': ('preparing', 'cancelled'),
+        'preparing': ('assigned', 'cancelled'),
+        'assigned': ('delivered', 'cancelled'),
+        'delivered': (),
+        'cancelled': (),
+    }
+
+    # Compiled pricing tables. The constants above are the defaults; a JSON
+    # rules file (PRICING_RULES_PATH) can override them per city, per stratum
+    # and with time-bound promotions.
+    pricing_rules = PricingRules(SHIPPING_FEES, DISCOUNT_RULES, os.getenv(PRICING_RULES_ENV))
+
     @staticmethod
     def calculate_order_totals(order: OrderRequest) -> Tuple[Decimal, Decimal, Decimal, Decimal]:
         """
@@ -34,17 +51,86 @@ class OrderService:
         # Calculate subtotal
         subtotal = sum(item.price * item.quantity for item in order.products)
         
-        # Get shipping fee based on stratum
-        shipping_fee = OrderService.SHIPPING_FEES[order.stratum]
+        # Get shipping fee based on city and stratum
+        pricing = OrderService.pricing_rules.current().lookup(order.stratum, order.city)
+        shipping_fee = pricing.shipping_fee
         
         # Calculate discount
         discount_amount = Decimal('0')
-        for threshold, discount_rate in OrderService.DISCOUNT_RULES:
-            if subtotal >= threshold:
-                discount_amount = subtotal * discount_rate
-                break
+        discount_rate = pricing.discount_rate(subtotal)
+        if discount_rate is not None:
+            discount_amount = subtotal * discount_rate
         
         # Calculate total
         total = subtotal + shipping_fee - discount_amount
         
-        return subtotal, shipping_fee, discount_amount, total
\ No newline at end of file
+        return subtotal, shipping_fee, discount_amount, total
+
+    @staticmethod
+    def previous_statuses(status: str) -> Tuple[str, ...]:
+        """
+        Get the statuses an order can be in to move to `status`.
+        """
+        return tuple(
+            current for current, following in OrderService.STATUS_TRANSITIONS.items()
+            if status in following
+        )
+
+    @staticmethod
+    def calculate_batch_totals(
+        payloads: Iterable[Any],
+        calculate: Optional[Callable[[OrderRequest], Tuple[Decimal, Decimal, Decimal, Decimal]]] = None
+    ) -> BatchOrderResponse:
+        """
+        Validate and price a batch of raw order payloads.
+
+        Each payload is validated and priced independently, so an invalid or
+        failing order is reported in its own result without aborting the batch.
+
+        Args:
+            payloads: Decoded JSON objects, one per order
+            calculate: Pricing function to apply; defaults to calculate_order_totals
+
+        Returns:
+            BatchOrderResponse with one result per payload, in input order
+        """
+        validate = OrderRequest.model_validate
+        if calculate is None:
+            calculate = OrderService.calculate_order_totals
+        results = []
+        failed = 0
+        for index, payload in enumerate(payloads):
+            try:
+                subtotal, shipping_fee, discount_amount, total = calculate(validate(payload))
+            except ValidationError as e:
+                failed += 1
+                results.append(BatchOrderResult(index=index, error=_format_validation_error(e)))
+                continue
+            except Exception as e:
+                failed += 1
+                results.append(BatchOrderResult(index=index, error=str(e)))
+                continue
+
+            results.append(BatchOrderResult(
+                index=index,
+                result=OrderQuote(
+                    subtotal=subtotal,
+                    shipping_fee=shipping_fee,
+                    discount_amount=discount_amount,
+                    total=total
+                )
+            ))
+
+        return BatchOrderResponse(
+            results=results,
+            succeeded=len(results) - failed,
+            failed=failed
+        )
+
+
+def _format_validation_error(error: ValidationError) -> str:
+    """Flatten a pydantic ValidationError into a single readable message."""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc']) or 'order'}: {item['msg']}"
+        for item in error.errors()
+    )
@@ -0,0 +1,300 @@
+"""
+Top-customers analytics precomputed in the background.
+
+``TopCustomersIndex`` follows a transactions CSV file (``transactions.csv``
+by default, or ``TRANSACTIONS_CSV_PATH``). A background task polls the file:
+
+- When it grows, only the appended rows are parsed
+  (``TransactionCSVHandler.read_appended``) and merged into per-day
+  per-customer counters.
+- When it is truncated or replaced, the counters are rebuilt from scratch.
+
+A query sums the counters of the days fully inside ``[start_date, end_date]``
+and only scans the individual transactions of the partial days at the edges,
+then selects the top N with ``CustomerAnalytics.select_top_customers``, so
+answers match ``CustomerAnalytics.get_top_customers`` on the whole file.
+
+Answers are cached per (start_date, end_date, top_n) together with the
+per-customer counts behind them. When rows are appended, the most recently
+requested queries are brought up to date in the background by adding just
+the new rows to their counts, so dashboards polling the same ranges are
+always answered from memory.
+
+CSV timestamps are naive local times; timezone-aware query dates are
+converted to local time before comparing.
+
+All state is updated on the event loop; only reading and parsing the file
+runs in a worker thread.
+"""
+import asyncio
+import bisect
+import logging
+import os
+from collections import OrderedDict, defaultdict
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+from src.csv_handler import TransactionCSVHandler
+from src.customer_analytics import CustomerAnalytics, Transaction
+
+logger = logging.getLogger(__name__)
+
+TRANSACTIONS_CSV_ENV = "TRANSACTIONS_CSV_PATH"
+DEFAULT_TRANSACTIONS_CSV = "transactions.csv"
+
+QueryKey = Tuple[datetime, datetime, int]
+
+def _to_naive(value: datetime) -> datetime:
+    """Convert an aware datetime to the naive local time used by the CSV."""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone().replace(tzinfo=None)
+
+class _Day:
+    __slots__ = ("counts", "transactions", "first", "last")
+
+    def __init__(self):
+        self.counts: Dict[str, int] = defaultdict(int)
+        # (timestamp, customer_id), only scanned when the day is partially covered
+        self.transactions: List[Tuple[datetime, str]] = []
+        self.first: Optional[datetime] = None
+        self.last: Optional[datetime] = None
+
+    def add(self, timestamp: datetime, customer_id: str) -> None:
+        self.counts[customer_id] += 1
+        self.transactions.append((timestamp, customer_id))
+        if self.first is None or timestamp < self.first:
+            self.first = timestamp
+        if self.last is None or timestamp > self.last:
+            self.last = timestamp
+
+class _Answer:
+    __slots__ = ("counts", "result")
+
+    def __init__(self, counts: Dict[str, int], result: List[Tuple[str, int]]):
+        self.counts = counts
+        self.result = result
+
+class TopCustomersIndex:
+    """
+    Incrementally maintained per-day transaction counters with cached answers.
+
+    Time Complexity:
+    - refresh: O(a) where a is the number of appended transactions
+    - uncached query: O(sum of customers per covered day + transactions of
+      the two edge days + m log k)
+    - cached query: O(1)
+    """
+
+    def __init__(
+        self,
+        filepath: str,
+        poll_interval: float = 1.0,
+        max_cached_queries: int = 256,
+        hot_queries: int = 16
+    ):
+        if poll_interval <= 0:
+            raise ValueError("Poll interval must be positive")
+        self.filepath = filepath
+        self.poll_interval = poll_interval
+        self.max_cached_queries = max_cached_queries
+        self.hot_queries = hot_queries
+
+        self._days: Dict[date, _Day] = {}
+        self._sorted_days: List[date] = []
+        self._offset = 0
+        self._file_id: Optional[Tuple[int, int]] = None
+        self._tail = b""
+        self._answers: "OrderedDict[QueryKey, _Answer]" = OrderedDict()
+        self._task: Optional[asyncio.Task] = None
+
+        self.loaded = False
+        self.transactions = 0
+        self.refreshed_at: Optional[datetime] = None
+        self.refreshes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def top_customers(self, start_date: datetime, end_date: datetime, top_n: int = 10) -> List[Tuple[str, int]]:
+        """
+        Get the top N customers by transaction frequency in a given date range.
+
+        Aware dates are converted to naive local time first.
+
+        Returns:
+            List of tuples containing (customer_id, transaction_count) sorted by count descending
+
+        Raises:
+            ValueError: If top_n is not positive or start_date is not before end_date
+        """
+        if top_n < 1:
+            raise ValueError("top_n must be positive")
+        start_date, end_date = _to_naive(start_date), _to_naive(end_date)
+        if start_date >= end_date:
+            raise ValueError("Start date must be before end date")
+
+        key = (start_date, end_date, top_n)
+        answer = self._answers.get(key)
+        if answer is not None:
+            self._answers.move_to_end(key)
+            self.hits += 1
+            return answer.result
+
+        self.misses += 1
+        answer = self._answers[key] = self._compute(start_date, end_date, top_n)
+        while len(self._answers) > self.max_cached_queries:
+            self._answers.popitem(last=False)
+        return answer.result
+
+    def add_transactions(self, transactions: List[Transaction]) -> None:
+        """
+        Merge new transactions into the counters, update the hot cached
+        answers with them and drop the other cached answers.
+        """
+        if not transactions:
+            return
+        self._merge(transactions)
+
+        hot = list(self._answers.items())[-self.hot_queries:] if self.hot_queries else []
+        self._answers.clear()
+        for (start_date, end_date, top_n), answer in hot:
+            counts = answer.counts
+            for transaction in transactions:
+                if start_date <= transaction.timestamp <= end_date:
+                    counts[transaction.customer_id] += 1
+            answer.result = CustomerAnalytics.select_top_customers(counts, top_n)
+            self._answers[(start_date, end_date, top_n)] = answer
+
+    def _merge(self, transactions: List[Transaction]) -> None:
+        for transaction in transactions:
+            day_key = transaction.timestamp.date()
+            day = self._days.get(day_key)
+            if day is None:
+                day = self._days[day_key] = _Day()
+                bisect.insort(self._sorted_days, day_key)
+            day.add(transaction.timestamp, transaction.customer_id)
+        self.transactions += len(transactions)
+
+    def refresh(self) -> int:
+        """
+        Read the rows appended since the last refresh, or reload the whole
+        file if it was truncated or replaced.
+
+        Returns:
+            Number of transactions added
+        """
+        changes = self._read_changes()
+        if changes is None:
+            return 0
+        self._apply(*changes)
+        return len(changes[2])
+
+    async def refresh_async(self) -> int:
+        """Like refresh, but reads and parses the file in a worker thread."""
+        changes = await asyncio.to_thread(self._read_changes)
+        if changes is None:
+            return 0
+        self._apply(*changes)
+        return len(changes[2])
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "loaded": self.loaded,
+            "transactions": self.transactions,
+            "days": len(self._days),
+            "refreshes": self.refreshes,
+            "refreshed_at": self.refreshed_at.isoformat() if self.refreshed_at else None,
+            "cached_queries": len(self._answers),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def _compute(self, start_date: datetime, end_date: datetime, top_n: int) -> _Answer:
+        customer_counts: Dict[str, int] = defaultdict(int)
+        first = bisect.bisect_left(self._sorted_days, start_date.date())
+        last = bisect.bisect_right(self._sorted_days, end_date.date())
+        for day_key in self._sorted_days[first:last]:
+            day = self._days[day_key]
+            if start_date <= day.first and day.last <= end_date:
+                for customer_id, count in day.counts.items():
+                    customer_counts[customer_id] += count
+            else:
+                for timestamp, customer_id in day.transactions:
+                    if start_date <= timestamp <= end_date:
+                        customer_counts[customer_id] += 1
+        return _Answer(customer_counts, CustomerAnalytics.select_top_customers(customer_counts, top_n))
+
+    def _read_changes(self) -> Optional[Tuple[Tuple[int, int], bool, List[Transaction], int, bytes]]:
+        """
+        Read what changed in the file since the last refresh, without
+        touching the counters (safe to run in a worker thread).
+
+        Returns:
+            None if nothing changed, else (file id, whether the file was
+            replaced, transactions, new offset, bytes just before the offset)
+        """
+        try:
+            stat = os.stat(self.filepath)
+            file_id = (stat.st_dev, stat.st_ino)
+            # Files rewritten in place keep their inode; the bytes just before
+            # the offset tell whether the read prefix is unchanged
+            reset = file_id != self._file_id or not TransactionCSVHandler.prefix_unchanged(
+                self.filepath, self._offset, self._tail
+            )
+        except FileNotFoundError:
+            return None
+        if not reset and stat.st_size == self._offset:
+            return None
+
+        transactions, offset = TransactionCSVHandler.read_appended(
+            self.filepath, 0 if reset else self._offset
+        )
+        tail = TransactionCSVHandler.read_tail(self.filepath, offset)
+        return file_id, reset, transactions, offset, tail
+
+    def _apply(
+        self,
+        file_id: Tuple[int, int],
+        reset: bool,
+        transactions: List[Transaction],
+        offset: int,
+        tail: bytes
+    ) -> None:
+        if reset:
+            # The file was replaced: rebuild the counters and the hot answers
+            hot = list(self._answers)[-self.hot_queries:] if self.hot_queries else []
+            self._days = {}
+            self._sorted_days = []
+            self.transactions = 0
+            self._answers.clear()
+            self._merge(transactions)
+            for key in hot:
+                self._answers[key] = self._compute(*key)
+        else:
+            self.add_transactions(transactions)
+        self._file_id = file_id
+        self._offset = offset
+        self._tail = tail
+        self.loaded = True
+        self.refreshes += 1
+        self.refreshed_at = datetime.now()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh_async()
+            except Exception:
+                logger.exception("Failed to refresh top customers from %s", self.filepath)
+            await asyncio.sleep(self.poll_interval)
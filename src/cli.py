@@ -0,0 +1,129 @@
+"""
+Command line entry point for the analytics jobs and benchmarks.
+
+Usage:
+    python -m src.cli generate [--transactions N] [--customers N] [--output FILE | --dataset DIR]
+    python -m src.cli analyze [--input FILE | --dataset DIR] [--start DATE] [--end DATE] [--top N]
+    python -m src.cli analyze --input FILE --checkpoint FILE [--top N]
+    python -m src.cli benchmark {pricing,load} [options of src.api.benchmark / src.api.load_test]
+
+The CLI runs as a short-lived job, so it only imports what the chosen
+subcommand needs: argument parsing never loads the analytics modules, and
+FastAPI/pydantic are only loaded by the benchmarks.
+"""
+import argparse
+import sys
+from typing import List, Optional
+
+DEFAULT_START = "2023-01-01"
+DEFAULT_END = "2023-12-31"
+
+def _parse_date(value: str):
+    from datetime import datetime
+
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid date '{value}', expected YYYY-MM-DD[ HH:MM:SS]")
+
+def generate(args: argparse.Namespace) -> int:
+    """Generate a random transaction dataset as a CSV file or a partitioned dataset."""
+    import random
+    from src.csv_handler import TransactionCSVHandler
+    from src.customer_analytics import CustomerAnalytics
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    transactions = CustomerAnalytics().generate_transaction_data(
+        num_transactions=args.transactions,
+        start_date=args.start,
+        end_date=args.end,
+        num_customers=args.customers
+    )
+    if args.dataset:
+        TransactionCSVHandler.save_partitioned(transactions, args.dataset)
+        print(f"{len(transactions)} transactions saved to dataset {args.dataset}")
+    else:
+        TransactionCSVHandler.save_transactions(transactions, args.output)
+        print(f"{len(transactions)} transactions saved to {args.output}")
+    return 0
+
+def analyze(args: argparse.Namespace) -> int:
+    """Print the top customers by transaction frequency in a date range."""
+    from src.csv_handler import TransactionCSVHandler
+    from src.customer_analytics import CustomerAnalytics
+
+    analytics = CustomerAnalytics()
+    if args.checkpoint:
+        if args.dataset or args.start or args.end:
+            raise ValueError("--checkpoint counts the whole CSV history; it cannot be combined with --dataset, --start or --end")
+        top_customers = analytics.get_top_customers_incremental(args.input, args.checkpoint, args.top)
+    else:
+        start = args.start or _parse_date(DEFAULT_START)
+        end = args.end or _parse_date(DEFAULT_END)
+        if args.dataset:
+            top_customers = analytics.get_top_customers_from_dataset(args.dataset, start, end, args.top)
+        else:
+            transactions, _ = TransactionCSVHandler.read_appended(args.input)
+            top_customers = analytics.get_top_customers(transactions, start, end, args.top)
+
+    print(f"Top {args.top} Customers by Transaction Frequency:")
+    print("-" * 45)
+    print(f"{'Customer ID':<15} {'Transaction Count':<15}")
+    print("-" * 45)
+    for customer_id, count in top_customers:
+        print(f"{customer_id:<15} {count:<15}")
+    return 0
+
+def benchmark(args: argparse.Namespace) -> int:
+    """Run the pricing benchmark or the API load test."""
+    if args.target == "pricing":
+        from src.api.benchmark import main as run
+    else:
+        from src.api.load_test import main as run
+    run(args.options)
+    return 0
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m src.cli", description="Customer analytics jobs")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    generate_parser = subparsers.add_parser("generate", help="Generate a random transaction dataset")
+    generate_parser.add_argument("--transactions", type=int, default=100000)
+    generate_parser.add_argument("--customers", type=int, default=10000)
+    generate_parser.add_argument("--start", type=_parse_date, default=DEFAULT_START)
+    generate_parser.add_argument("--end", type=_parse_date, default=DEFAULT_END)
+    generate_parser.add_argument("--seed", type=int)
+    target = generate_parser.add_mutually_exclusive_group()
+    target.add_argument("--output", default="transactions.csv", help="CSV file to write")
+    target.add_argument("--dataset", help="Write a month-partitioned dataset to this directory")
+    generate_parser.set_defaults(handler=generate)
+
+    analyze_parser = subparsers.add_parser("analyze", help="Show the top customers in a date range")
+    source = analyze_parser.add_mutually_exclusive_group()
+    source.add_argument("--input", default="transactions.csv", help="Transactions CSV file")
+    source.add_argument("--dataset", help="Month-partitioned dataset directory")
+    analyze_parser.add_argument("--start", type=_parse_date, help=f"Default: {DEFAULT_START}")
+    analyze_parser.add_argument("--end", type=_parse_date, help=f"Default: {DEFAULT_END}")
+    analyze_parser.add_argument("--top", type=int, default=10)
+    analyze_parser.add_argument("--checkpoint",
+                                help="Count incrementally over the whole CSV, keeping progress in this file")
+    analyze_parser.set_defaults(handler=analyze)
+
+    benchmark_parser = subparsers.add_parser("benchmark", help="Benchmark pricing or load test the API")
+    benchmark_parser.add_argument("target", choices=("pricing", "load"))
+    benchmark_parser.add_argument("options", nargs=argparse.REMAINDER,
+                                  help="Options passed to the benchmark (see --help of each)")
+    benchmark_parser.set_defaults(handler=benchmark)
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        return args.handler(args)
+    except (ValueError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,6 +4,8 @@ This module contains utilities for CSV file operations with customer transaction
 The module provides functionality for:
 - Saving transaction data to CSV files
 - Loading transaction data from CSV files
+- Incrementally reading rows appended to a CSV file
+- Month-partitioned datasets with partition pruning
 - Data validation and error handling
 - Date format standardization
 
@@ -11,10 +13,23 @@ The CSV format includes the following fields:
 - timestamp: Date and time of the transaction (format: YYYY-MM-DD HH:MM:SS)
 - customer_id: Unique identifier for the customer
 - amount: Transaction amount in decimal format
+
+A partitioned dataset is a directory of CSV files grouped by month:
+
+    dataset/
+    ├── _manifest.json
+    ├── year=2023/month=01/part-00000.csv
+    └── year=2023/month=02/part-00000.csv
+
+The manifest lists every part file with its row count and min/max
+timestamps, so range reads only open the files that overlap the range.
 """
 import csv
+import json
+import os
+from collections import defaultdict
 from datetime import datetime
-from typing import List
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from dataclasses import asdict
 from src.customer_analytics import Transaction
 
@@ -77,4 +92,217 @@ class TransactionCSVHandler:
                 except (ValueError, KeyError) as e:
                     raise ValueError(f"Invalid data format in CSV: {str(e)}")
                 
-        return transactions
\ No newline at end of file
+        return transactions
+
+    @staticmethod
+    def read_appended(filepath: str, offset: int = 0) -> Tuple[List[Transaction], int]:
+        """
+        Load the transactions appended to a CSV file after a byte offset.
+
+        Only complete lines are read, so a row that is still being written is
+        picked up by the next call.
+
+        Args:
+            filepath: Path to the CSV file
+            offset: Byte offset returned by the previous call, or 0 to read
+                the whole file
+
+        Returns:
+            Tuple of (new transactions, byte offset to resume from)
+
+        Raises:
+            ValueError: If the CSV file has an invalid format or the offset is
+                past the end of the file (the file was truncated or replaced)
+        """
+        required_fields = {'timestamp', 'customer_id', 'amount'}
+
+        with open(filepath, 'rb') as csvfile:
+            header = csvfile.readline()
+            fieldnames = next(csv.reader([header.decode()]), [])
+            if not required_fields.issubset(fieldnames):
+                raise ValueError(
+                    f"CSV file must contain fields: {', '.join(required_fields)}"
+                )
+
+            offset = max(offset, len(header))
+            csvfile.seek(0, 2)
+            if offset > csvfile.tell():
+                raise ValueError(f"Offset {offset} is past the end of {filepath}")
+            csvfile.seek(offset)
+            data = csvfile.read()
+
+        complete = data[:data.rfind(b'\n') + 1]
+        timestamp_col = fieldnames.index('timestamp')
+        customer_col = fieldnames.index('customer_id')
+        amount_col = fieldnames.index('amount')
+        transactions = []
+        for row in csv.reader(complete.decode().splitlines()):
+            try:
+                timestamp = row[timestamp_col]
+                # fromisoformat is much faster than strptime; the length check
+                # keeps it to the YYYY-MM-DD HH:MM:SS format
+                if len(timestamp) != 19:
+                    raise ValueError(f"time data '{timestamp}' does not match format '{TransactionCSVHandler.DATE_FORMAT}'")
+                transactions.append(Transaction(
+                    timestamp=datetime.fromisoformat(timestamp),
+                    customer_id=row[customer_col],
+                    amount=float(row[amount_col])
+                ))
+            except (ValueError, IndexError) as e:
+                raise ValueError(f"Invalid data format in CSV: {str(e)}")
+
+        return transactions, offset + len(complete)
+
+    # Bytes kept from the end of a read to detect files rewritten in place
+    TAIL_BYTES = 64
+
+    @staticmethod
+    def read_tail(filepath: str, offset: int) -> bytes:
+        """
+        Read the bytes just before `offset` (at most TAIL_BYTES).
+
+        Saved with an offset returned by read_appended, they let a later
+        reader check with prefix_unchanged that the rows already read were
+        not rewritten.
+        """
+        length = min(offset, TransactionCSVHandler.TAIL_BYTES)
+        with open(filepath, 'rb') as f:
+            f.seek(offset - length)
+            return f.read(length)
+
+    @staticmethod
+    def prefix_unchanged(filepath: str, offset: int, tail: bytes) -> bool:
+        """
+        Check that a file still holds the first `offset` bytes read earlier.
+
+        Returns:
+            False if the file is shorter than `offset` or the bytes before it
+            differ from `tail` (the file was truncated or rewritten)
+        """
+        if os.path.getsize(filepath) < offset:
+            return False
+        return TransactionCSVHandler.read_tail(filepath, offset) == tail
+
+    MANIFEST_FILE = "_manifest.json"
+
+    @staticmethod
+    def save_partitioned(transactions: Iterable[Transaction], directory: str) -> List[str]:
+        """
+        Add transactions to a month-partitioned dataset.
+
+        Every call writes new part files (one per month present in the
+        transactions) next to the existing ones and records them in the
+        manifest.
+
+        Args:
+            transactions: Transactions to save
+            directory: Root directory of the dataset
+
+        Returns:
+            Paths of the written part files, relative to the directory
+        """
+        by_month: Dict[Tuple[int, int], List[Transaction]] = defaultdict(list)
+        for transaction in transactions:
+            by_month[(transaction.timestamp.year, transaction.timestamp.month)].append(transaction)
+
+        manifest = TransactionCSVHandler.load_manifest(directory)
+        written = []
+        for (year, month), month_transactions in sorted(by_month.items()):
+            partition = f"year={year:04d}/month={month:02d}"
+            os.makedirs(os.path.join(directory, partition), exist_ok=True)
+            part = sum(1 for entry in manifest if entry["path"].startswith(partition + "/"))
+            path = f"{partition}/part-{part:05d}.csv"
+            TransactionCSVHandler.save_transactions(month_transactions, os.path.join(directory, path))
+
+            timestamps = [t.timestamp for t in month_transactions]
+            manifest.append({
+                "path": path,
+                "rows": len(month_transactions),
+                "min_timestamp": min(timestamps).strftime(TransactionCSVHandler.DATE_FORMAT),
+                "max_timestamp": max(timestamps).strftime(TransactionCSVHandler.DATE_FORMAT),
+            })
+            written.append(path)
+
+        # Replace the manifest atomically so readers never see a partial one
+        manifest_path = os.path.join(directory, TransactionCSVHandler.MANIFEST_FILE)
+        os.makedirs(directory, exist_ok=True)
+        with open(manifest_path + ".tmp", 'w') as f:
+            json.dump({"files": manifest}, f, indent=2)
+        os.replace(manifest_path + ".tmp", manifest_path)
+        return written
+
+    @staticmethod
+    def load_manifest(directory: str) -> List[dict]:
+        """
+        Load the manifest entries of a partitioned dataset.
+
+        Returns:
+            List of entries with path, rows, min_timestamp and max_timestamp;
+            empty if the dataset does not exist yet
+        """
+        try:
+            with open(os.path.join(directory, TransactionCSVHandler.MANIFEST_FILE)) as f:
+                return json.load(f)["files"]
+        except FileNotFoundError:
+            return []
+
+    @staticmethod
+    def partitions_for_range(
+        directory: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> List[str]:
+        """
+        List the part files whose timestamps overlap [start_date, end_date].
+
+        Returns:
+            Part file paths relative to the directory, in chronological order
+        """
+        # Timestamps in DATE_FORMAT sort lexicographically like datetimes
+        start = start_date.strftime(TransactionCSVHandler.DATE_FORMAT) if start_date else None
+        end = end_date.strftime(TransactionCSVHandler.DATE_FORMAT) if end_date else None
+        entries = sorted(
+            TransactionCSVHandler.load_manifest(directory),
+            key=lambda entry: (entry["min_timestamp"], entry["path"])
+        )
+        return [
+            entry["path"] for entry in entries
+            if (end is None or entry["min_timestamp"] <= end)
+            and (start is None or entry["max_timestamp"] >= start)
+        ]
+
+    @staticmethod
+    def iter_partitioned(
+        directory: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> Iterator[Transaction]:
+        """
+        Stream the transactions of a partitioned dataset within [start_date, end_date].
+
+        Only the part files overlapping the range are opened.
+
+        Raises:
+            ValueError: If a part file has an invalid format
+        """
+        for path in TransactionCSVHandler.partitions_for_range(directory, start_date, end_date):
+            transactions, _ = TransactionCSVHandler.read_appended(os.path.join(directory, path))
+            for transaction in transactions:
+                if (start_date is None or transaction.timestamp >= start_date) and (
+                    end_date is None or transaction.timestamp <= end_date
+                ):
+                    yield transaction
+
+    @staticmethod
+    def load_partitioned(
+        directory: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> List[Transaction]:
+        """
+        Load the transactions of a partitioned dataset within [start_date, end_date].
+
+        Returns:
+            List of Transaction objects
+        """
+        return list(TransactionCSVHandler.iter_partitioned(directory, start_date, end_date))
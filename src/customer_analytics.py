@@ -1,9 +1,11 @@
 """
 This module contains the implementation for generating and analyzing customer transaction data.
 """
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import List, Dict, Tuple
+from typing import Iterable, List, Dict, Optional, Tuple
+import json
+import os
 import random
 import heapq
 from collections import defaultdict
@@ -14,6 +16,49 @@ class Transaction:
     customer_id: str
     amount: float
 
+@dataclass
+class CountCheckpoint:
+    """
+    Progress of incremental counting over an append-only transactions CSV.
+
+    Attributes:
+        offset: Byte offset in the CSV up to which rows were counted
+        counts: Transactions counted per customer
+        last_timestamp: Latest transaction timestamp counted
+        tail: Bytes just before the offset, to detect rewritten files
+    """
+    offset: int = 0
+    counts: Dict[str, int] = field(default_factory=dict)
+    last_timestamp: Optional[datetime] = None
+    tail: bytes = b""
+
+    @classmethod
+    def load(cls, path: str) -> "CountCheckpoint":
+        """Load a checkpoint, or return an empty one if the file does not exist."""
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return cls()
+        return cls(
+            offset=data["offset"],
+            counts=data["counts"],
+            last_timestamp=datetime.fromisoformat(data["last_timestamp"]) if data["last_timestamp"] else None,
+            tail=bytes.fromhex(data["tail"])
+        )
+
+    def save(self, path: str) -> None:
+        """Write the checkpoint atomically, so a crash never leaves a partial one."""
+        data = {
+            "offset": self.offset,
+            "last_timestamp": self.last_timestamp.isoformat() if self.last_timestamp else None,
+            "tail": self.tail.hex(),
+            "counts": self.counts,
+        }
+        with open(path + ".tmp", 'w') as f:
+            json.dump(data, f)
+        os.replace(path + ".tmp", path)
+
 class CustomerAnalytics:
     def generate_transaction_data(
         self,
@@ -66,7 +111,7 @@ class CustomerAnalytics:
 
     def get_top_customers(
         self,
-        transactions: List[Transaction],
+        transactions: Iterable[Transaction],
         start_date: datetime,
         end_date: datetime,
         top_n: int = 10
@@ -75,7 +120,8 @@ class CustomerAnalytics:
         Get the top N customers by transaction frequency in a given date range.
         
         Args:
-            transactions: List of transactions to analyze
+            transactions: Transactions to analyze (any iterable, e.g. a stream
+                from a partitioned dataset)
             start_date: Start date for analysis
             end_date: End date for analysis
             top_n: Number of top customers to return
@@ -97,6 +143,116 @@ class CustomerAnalytics:
             if start_date <= transaction.timestamp <= end_date:
                 customer_counts[transaction.customer_id] += 1
         
+        return CustomerAnalytics.select_top_customers(customer_counts, top_n)
+
+    def get_top_customers_from_dataset(
+        self,
+        directory: str,
+        start_date: datetime,
+        end_date: datetime,
+        top_n: int = 10
+    ) -> List[Tuple[str, int]]:
+        """
+        Get the top N customers from a month-partitioned dataset.
+
+        Only the partitions overlapping the date range are read (see
+        TransactionCSVHandler.save_partitioned).
+
+        Args:
+            directory: Root directory of the partitioned dataset
+            start_date: Start date for analysis
+            end_date: End date for analysis
+            top_n: Number of top customers to return
+
+        Returns:
+            List of tuples containing (customer_id, transaction_count) sorted by count descending
+        """
+        # Imported here: csv_handler imports Transaction from this module
+        from src.csv_handler import TransactionCSVHandler
+
+        if top_n < 1:
+            raise ValueError("top_n must be positive")
+        if start_date >= end_date:
+            raise ValueError("Start date must be before end date")
+        transactions = TransactionCSVHandler.iter_partitioned(directory, start_date, end_date)
+        return self.get_top_customers(transactions, start_date, end_date, top_n)
+
+    def update_customer_counts(self, csv_path: str, checkpoint_path: str) -> CountCheckpoint:
+        """
+        Count the transactions appended to a CSV since the last checkpoint.
+
+        Only rows after the checkpointed byte offset are parsed and merged
+        into the saved per-customer counts, so the cost of a run is
+        proportional to the new data. If the file was truncated or rewritten
+        the counts are rebuilt from the start.
+
+        Args:
+            csv_path: Append-only transactions CSV
+            checkpoint_path: JSON checkpoint file, created on the first run
+
+        Returns:
+            The updated (and saved) checkpoint
+        """
+        # Imported here: csv_handler imports Transaction from this module
+        from src.csv_handler import TransactionCSVHandler
+
+        checkpoint = CountCheckpoint.load(checkpoint_path)
+        if not TransactionCSVHandler.prefix_unchanged(csv_path, checkpoint.offset, checkpoint.tail):
+            checkpoint = CountCheckpoint()
+
+        transactions, offset = TransactionCSVHandler.read_appended(csv_path, checkpoint.offset)
+        if offset == checkpoint.offset:
+            return checkpoint
+
+        counts = checkpoint.counts
+        for transaction in transactions:
+            counts[transaction.customer_id] = counts.get(transaction.customer_id, 0) + 1
+        if transactions:
+            latest = max(transaction.timestamp for transaction in transactions)
+            if checkpoint.last_timestamp is None or latest > checkpoint.last_timestamp:
+                checkpoint.last_timestamp = latest
+        checkpoint.offset = offset
+        checkpoint.tail = TransactionCSVHandler.read_tail(csv_path, offset)
+        checkpoint.save(checkpoint_path)
+        return checkpoint
+
+    def get_top_customers_incremental(
+        self,
+        csv_path: str,
+        checkpoint_path: str,
+        top_n: int = 10
+    ) -> List[Tuple[str, int]]:
+        """
+        Get the top N customers of an append-only CSV over its whole history,
+        parsing only the rows appended since the last run.
+
+        Args:
+            csv_path: Append-only transactions CSV
+            checkpoint_path: JSON checkpoint file
+            top_n: Number of top customers to return
+
+        Returns:
+            List of tuples containing (customer_id, transaction_count) sorted by count descending
+        """
+        if top_n < 1:
+            raise ValueError("top_n must be positive")
+        checkpoint = self.update_customer_counts(csv_path, checkpoint_path)
+        return self.select_top_customers(checkpoint.counts, top_n)
+
+    @staticmethod
+    def select_top_customers(customer_counts: Dict[str, int], top_n: int) -> List[Tuple[str, int]]:
+        """
+        Select the top N customers from precomputed transaction counts.
+
+        Args:
+            customer_counts: Mapping of customer ID to transaction count
+            top_n: Number of top customers to return
+
+        Returns:
+            List of tuples containing (customer_id, transaction_count) sorted by count descending
+
+        Time Complexity: O(m log k) where m is number of customers and k is top_n
+        """
         # Use a min heap to keep track of top N customers
         heap = []
         for customer_id, count in customer_counts.items():
@@ -110,5 +266,4 @@ class CustomerAnalytics:
         # Convert heap to sorted list of (customer_id, count) tuples
         result = [(cid, cnt) for cnt, cid in heap]
         result.sort(key=lambda x: (-x[1], x[0]))  # Sort by count desc, then by customer_id
-        print("RESULT", result)  # Debug print statement
-        return result
\ No newline at end of file
+        return result
@@ -1,6 +1,7 @@
 """
 This script demonstrates the functionality of a public transport route system.
 """
+from datetime import time
 from transport_routes import TransportRouteSystem, Stop
 
 def create_example_system():
@@ -55,6 +56,24 @@ def show_routes_by_stop(system, stop_id):
         for stop in stops:
             print(f"    * {stop.name} (ID: {stop.id})")
 
+def add_example_timetables(system):
+    """Adds morning timetables to routes R1 and R2"""
+    system.set_timetable("R1", ["EST-01", "PAR-02", "MER-03", "HOS-04"], [
+        [time(7, 0), time(7, 8), time(7, 15), time(7, 25)],
+        [time(7, 20), time(7, 28), time(7, 35), time(7, 45)],
+        [time(7, 40), time(7, 48), time(7, 55), time(8, 5)],
+    ])
+    system.set_timetable("R2", ["EST-01", "UNI-05", "BIB-06", "PAR-02"], [
+        [time(7, 10), time(7, 18), time(7, 24), time(7, 32)],
+        [time(7, 40), time(7, 48), time(7, 54), time(8, 2)],
+    ])
+
+def show_next_departures(system, stop_id, at):
+    """Shows the next departures from a stop"""
+    print(f"\nNext departures from {stop_id} after {at:%H:%M}:")
+    for departure in system.get_next_departures(stop_id, at):
+        print(f"  - {departure.time:%H:%M} route {departure.route_id}")
+
 def main():
     print("Initializing public transport route system...")
     system = create_example_system()
@@ -71,6 +90,13 @@ def main():
     # Find routes passing through Central Market
     show_routes_by_stop(system, "MER-03")
     
+    # Demonstrate timetable queries
+    print("\n=== Timetables ===")
+    add_example_timetables(system)
+    show_next_departures(system, "PAR-02", time(7, 10))
+    departure, arrival = system.get_eta("R1", "EST-01", "HOS-04", time(7, 5))
+    print(f"\nNext R1 trip from EST-01 to HOS-04: departs {departure:%H:%M}, arrives {arrival:%H:%M}")
+
     # Demonstrate stop removal
     print("\n=== Route Modification ===")
     print("Removing 'Main Park' stop from route R1...")
@@ -0,0 +1,224 @@
+"""
+This module contains an external merge sort for transaction CSV files.
+
+Exports usually arrive unsorted and can be larger than memory. The sort
+works in two phases with bounded memory:
+
+1. Run generation: the input is read in chunks of at most `chunk_rows`
+   rows; each chunk is sorted by timestamp and spilled to a temporary run
+   file. Chunks are sorted in parallel by a pool of worker processes, with
+   at most one chunk per worker in flight.
+2. Merge: the runs are k-way merged with `heapq.merge` (in several passes
+   if there are more runs than `max_open_runs`) into a sorted CSV file or
+   a month-partitioned dataset (see TransactionCSVHandler.save_partitioned).
+
+Timestamps use the fixed YYYY-MM-DD HH:MM:SS format, so they sort
+lexicographically in chronological order and are never parsed. The sort
+is stable: rows with equal timestamps keep their input order.
+"""
+import csv
+import heapq
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from itertools import islice
+from typing import TYPE_CHECKING, Iterator, List, Optional
+from src.csv_handler import TransactionCSVHandler
+from src.customer_analytics import Transaction
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+FIELDNAMES = ['timestamp', 'customer_id', 'amount']
+TIMESTAMP_LENGTH = 19
+
+def _sort_run(rows: List[List[str]], path: str) -> str:
+    """Sort one chunk by timestamp and write it as a run file (header-less)."""
+    rows.sort(key=lambda row: row[0])
+    with open(path, 'w', newline='') as f:
+        csv.writer(f).writerows(rows)
+    return path
+
+def _read_run(path: str) -> Iterator[List[str]]:
+    with open(path, newline='') as f:
+        yield from csv.reader(f)
+
+def _read_rows(input_path: str) -> Iterator[List[str]]:
+    """Yield input rows as [timestamp, customer_id, amount], validating timestamps."""
+    with open(input_path, newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        if not set(FIELDNAMES).issubset(header):
+            raise ValueError(f"CSV file must contain fields: {', '.join(FIELDNAMES)}")
+        columns = [header.index(field) for field in FIELDNAMES]
+        for line, row in enumerate(reader, start=2):
+            try:
+                ordered = [row[column] for column in columns]
+            except IndexError:
+                raise ValueError(f"Invalid data format in CSV at line {line}: {row}")
+            timestamp = ordered[0]
+            if len(timestamp) != TIMESTAMP_LENGTH or timestamp[4] != '-' or timestamp[10] != ' ':
+                raise ValueError(f"Invalid timestamp in CSV at line {line}: '{timestamp}'")
+            yield ordered
+
+def _generate_runs(
+    input_path: str,
+    run_dir: str,
+    chunk_rows: int,
+    executor: "Executor",
+    max_in_flight: int
+) -> List[str]:
+    rows = _read_rows(input_path)
+    runs: List[str] = []
+    pending = []
+    while True:
+        chunk = list(islice(rows, chunk_rows))
+        if not chunk:
+            break
+        path = os.path.join(run_dir, f"run-{len(runs) + len(pending):06d}.csv")
+        pending.append(executor.submit(_sort_run, chunk, path))
+        # Bound memory: never hold more unsorted chunks than workers
+        if len(pending) >= max_in_flight:
+            runs.append(pending.pop(0).result())
+    runs.extend(future.result() for future in pending)
+    return runs
+
+def _merge_runs(runs: List[str]) -> Iterator[List[str]]:
+    return heapq.merge(*(_read_run(path) for path in runs), key=lambda row: row[0])
+
+def _reduce_runs(runs: List[str], run_dir: str, max_open_runs: int) -> List[str]:
+    """Merge runs in groups until at most max_open_runs remain."""
+    generation = 0
+    while len(runs) > max_open_runs:
+        merged = []
+        for start in range(0, len(runs), max_open_runs):
+            group = runs[start:start + max_open_runs]
+            path = os.path.join(run_dir, f"merge-{generation}-{start // max_open_runs:06d}.csv")
+            with open(path, 'w', newline='') as f:
+                csv.writer(f).writerows(_merge_runs(group))
+            for run in group:
+                os.remove(run)
+            merged.append(path)
+        runs = merged
+        generation += 1
+    return runs
+
+def sorted_rows(
+    input_path: str,
+    run_dir: str,
+    chunk_rows: int = 500_000,
+    workers: Optional[int] = None,
+    max_open_runs: int = 128
+) -> Iterator[List[str]]:
+    """
+    Sort a transactions CSV externally and stream its rows in timestamp order.
+
+    Args:
+        input_path: Unsorted transactions CSV
+        run_dir: Directory for the temporary run files
+        chunk_rows: Maximum rows sorted in memory at once per worker; peak
+            memory is about chunk_rows * (workers + 1) rows
+        workers: Number of worker processes for run generation (default:
+            CPU count); 0 or 1 sorts in a single background thread
+        max_open_runs: Maximum run files merged at once
+
+    Returns:
+        Iterator of [timestamp, customer_id, amount] rows
+
+    Raises:
+        ValueError: If the arguments or the CSV format are invalid
+    """
+    if chunk_rows < 1:
+        raise ValueError("chunk_rows must be positive")
+    if max_open_runs < 2:
+        raise ValueError("max_open_runs must be at least 2")
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    # Imported here: concurrent.futures pulls in multiprocessing
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+    if workers > 1:
+        executor: "Executor" = ProcessPoolExecutor(max_workers=workers)
+    else:
+        # One thread overlaps sorting with reading the next chunk without
+        # the cost of starting worker processes
+        executor = ThreadPoolExecutor(max_workers=1)
+    with executor:
+        runs = _generate_runs(input_path, run_dir, chunk_rows, executor, max(workers, 1))
+
+    runs = _reduce_runs(runs, run_dir, max_open_runs)
+    return _merge_runs(runs)
+
+def external_sort_csv(
+    input_path: str,
+    output_path: str,
+    chunk_rows: int = 500_000,
+    workers: Optional[int] = None,
+    max_open_runs: int = 128,
+    temp_dir: Optional[str] = None
+) -> int:
+    """
+    Sort a transactions CSV by timestamp into a new CSV with bounded memory.
+
+    Args:
+        input_path: Unsorted transactions CSV
+        output_path: Sorted CSV to write (same format as save_transactions)
+        chunk_rows: Maximum rows sorted in memory at once per worker
+        workers: Number of worker processes for run generation
+        max_open_runs: Maximum run files merged at once
+        temp_dir: Where to spill runs (default: the system temp directory)
+
+    Returns:
+        Number of rows written
+    """
+    run_dir = tempfile.mkdtemp(prefix="external-sort-", dir=temp_dir)
+    try:
+        count = 0
+        with open(output_path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(FIELDNAMES)
+            for row in sorted_rows(input_path, run_dir, chunk_rows, workers, max_open_runs):
+                writer.writerow(row)
+                count += 1
+        return count
+    finally:
+        shutil.rmtree(run_dir, ignore_errors=True)
+
+def external_sort_to_dataset(
+    input_path: str,
+    directory: str,
+    chunk_rows: int = 500_000,
+    workers: Optional[int] = None,
+    max_open_runs: int = 128,
+    temp_dir: Optional[str] = None
+) -> int:
+    """
+    Sort a transactions CSV by timestamp into a month-partitioned dataset.
+
+    The merged stream is written in batches of `chunk_rows` rows, each
+    adding time-ordered part files to the dataset.
+
+    Returns:
+        Number of rows written
+    """
+    run_dir = tempfile.mkdtemp(prefix="external-sort-", dir=temp_dir)
+    try:
+        rows = sorted_rows(input_path, run_dir, chunk_rows, workers, max_open_runs)
+        count = 0
+        while True:
+            batch = [
+                Transaction(
+                    timestamp=datetime.fromisoformat(timestamp),
+                    customer_id=customer_id,
+                    amount=float(amount)
+                )
+                for timestamp, customer_id, amount in islice(rows, chunk_rows)
+            ]
+            if not batch:
+                return count
+            TransactionCSVHandler.save_partitioned(batch, directory)
+            count += len(batch)
+    finally:
+        shutil.rmtree(run_dir, ignore_errors=True)
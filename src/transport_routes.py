@@ -6,11 +6,20 @@ The system provides efficient operations for:
 - Adding and removing stops from routes
 - Querying routes by stop
 - Querying stops in a route
+- Route timetables with next-departure and ETA queries
 
-All operations are designed to be O(1) time complexity using a bi-directional
-mapping between routes and stops.
+All route/stop operations are designed to be O(1) time complexity using a
+bi-directional mapping between routes and stops.
+
+Timetables list the trips of a route with their departure time at each stop.
+They are stored per stop as sorted arrays of seconds since midnight, so the
+next departure from a stop is a `bisect` lookup. Answers for busy stops are
+cached per time slot and dropped whenever a timetable through the stop changes.
 """
-from typing import Set, Dict, List
+from bisect import bisect_left
+from collections import OrderedDict
+from datetime import time
+from typing import Set, Dict, List, Optional, Tuple
 from dataclasses import dataclass
 
 @dataclass(frozen=True)  # Make the class immutable and hashable
@@ -26,6 +35,44 @@ class Stop:
             return False
         return self.id == other.id  # Compare based on ID only
 
+@dataclass(frozen=True)
+class Departure:
+    route_id: str
+    time: time
+
+def _to_seconds(value: time) -> int:
+    return value.hour * 3600 + value.minute * 60 + value.second
+
+def _from_seconds(seconds: int) -> time:
+    return time(seconds // 3600, seconds // 60 % 60, seconds % 60)
+
+class _Timetable:
+    """
+    Trips of one route, indexed per stop.
+
+    Attributes:
+        position: stop_id -> index of the stop in the trip times
+        schedule: Departure seconds of each trip, in stop sequence order
+        departures: stop_id -> sorted departure seconds at the stop
+        trips: stop_id -> trip index of each departure (parallel to departures)
+    """
+
+    def __init__(self, stop_ids: List[str], schedule: List[List[int]]):
+        self.position = {stop_id: index for index, stop_id in enumerate(stop_ids)}
+        self.schedule = schedule
+        self.departures: Dict[str, List[int]] = {}
+        self.trips: Dict[str, List[int]] = {}
+        for stop_id, index in self.position.items():
+            # Trips may overtake each other, so each stop is sorted on its own
+            order = sorted(range(len(schedule)), key=lambda trip: schedule[trip][index])
+            self.departures[stop_id] = [schedule[trip][index] for trip in order]
+            self.trips[stop_id] = order
+
+    def remove_stop(self, stop_id: str) -> None:
+        del self.position[stop_id]
+        del self.departures[stop_id]
+        del self.trips[stop_id]
+
 class TransportRouteSystem:
     """
     A system for managing public transport routes and their stops.
@@ -36,12 +83,27 @@ class TransportRouteSystem:
     - Adding/removing stops: O(1)
     - Querying routes by stop: O(1)
     
-    Space Complexity: O(R * S) where R is number of routes and S is average stops per route
+    - Next departure / ETA on a route: O(log T) where T is trips per route
+    - Next departures at a stop: O(1) amortized for cached time slots,
+      O(R log T) otherwise where R is routes through the stop
+    
+    Space Complexity: O(R * S) where R is number of routes and S is average stops per route,
+    plus O(R * S * T) for timetables
     """
+
+    # Width of the time slots whose next-departure answers are cached
+    SLOT_SECONDS = 60
     
-    def __init__(self):
+    def __init__(self, max_cached_answers: int = 4096):
         self.routes: Dict[str, Set[Stop]] = {}  # route_id -> set of stops
         self.stop_to_routes: Dict[str, Set[str]] = {}  # stop_id -> set of route_ids
+        self.timetables: Dict[str, _Timetable] = {}  # route_id -> timetable
+        self.max_cached_answers = max_cached_answers
+        # (stop_id, slot, limit) -> departures from the slot start, enough to
+        # answer any query time within the slot
+        self._answers: "OrderedDict[Tuple[str, int, int], List[Tuple[int, str]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
 
     def add_route(self, route_id: str) -> None:
         """
@@ -117,6 +179,12 @@ class TransportRouteSystem:
         if not self.stop_to_routes[stop_id]:
             del self.stop_to_routes[stop_id]
 
+        # The route no longer serves the stop
+        timetable = self.timetables.get(route_id)
+        if timetable and stop_id in timetable.position:
+            timetable.remove_stop(stop_id)
+        self._invalidate([stop_id])
+
     def get_routes_by_stop(self, stop_id: str) -> Set[str]:
         """
         Get all routes that contain a specific stop.
@@ -153,4 +221,166 @@ class TransportRouteSystem:
         if route_id not in self.routes:
             raise ValueError(f"Route {route_id} does not exist")
             
-        return self.routes[route_id]
\ No newline at end of file
+        return self.routes[route_id]
+
+    def set_timetable(self, route_id: str, stop_ids: List[str], trips: List[List[time]]) -> None:
+        """
+        Set the timetable of a route, replacing any previous one.
+
+        Args:
+            route_id: ID of the route
+            stop_ids: Stops in the order the route serves them
+            trips: Departure time of each trip at each stop, in stop_ids order
+
+        Raises:
+            ValueError: If the route doesn't exist, a stop is not in the route,
+                or a trip does not match the stops or goes back in time
+        """
+        if not route_id:
+            raise ValueError("Route ID cannot be empty")
+        if route_id not in self.routes:
+            raise ValueError(f"Route {route_id} does not exist")
+        route_stop_ids = {stop.id for stop in self.routes[route_id]}
+        for stop_id in stop_ids:
+            if stop_id not in route_stop_ids:
+                raise ValueError(f"Stop {stop_id} not found in route {route_id}")
+        if len(set(stop_ids)) != len(stop_ids):
+            raise ValueError("Timetable stops must be unique")
+
+        schedule = []
+        for trip in trips:
+            if len(trip) != len(stop_ids):
+                raise ValueError(f"Each trip must have one time per stop ({len(stop_ids)})")
+            seconds = [_to_seconds(departure) for departure in trip]
+            if any(later < earlier for earlier, later in zip(seconds, seconds[1:])):
+                raise ValueError("Trip times must not decrease along the route")
+            schedule.append(seconds)
+
+        previous = self.timetables.get(route_id)
+        self.timetables[route_id] = _Timetable(list(stop_ids), schedule)
+        changed = set(stop_ids) | (set(previous.position) if previous else set())
+        self._invalidate(changed)
+
+    def get_next_departure(self, route_id: str, stop_id: str, at: time) -> Optional[time]:
+        """
+        Get the first departure of a route from a stop at or after a time.
+
+        Args:
+            route_id: ID of the route
+            stop_id: ID of the stop
+            at: Time of day
+
+        Returns:
+            Departure time, or None if there are no more departures that day
+
+        Raises:
+            ValueError: If the route has no timetable or it does not serve the stop
+        """
+        departures = self._timetable_for(route_id, stop_id).departures[stop_id]
+        index = bisect_left(departures, _to_seconds(at))
+        return _from_seconds(departures[index]) if index < len(departures) else None
+
+    def get_eta(
+        self,
+        route_id: str,
+        from_stop_id: str,
+        to_stop_id: str,
+        at: time
+    ) -> Optional[Tuple[time, time]]:
+        """
+        Get the next trip of a route between two stops.
+
+        Args:
+            route_id: ID of the route
+            from_stop_id: ID of the boarding stop
+            to_stop_id: ID of the destination stop, later in the route
+            at: Earliest boarding time
+
+        Returns:
+            Tuple of (departure from the boarding stop, arrival at the
+            destination), or None if there are no more trips that day
+
+        Raises:
+            ValueError: If a stop is not served by the route or the
+                destination comes before the boarding stop
+        """
+        timetable = self._timetable_for(route_id, from_stop_id)
+        self._timetable_for(route_id, to_stop_id)
+        if timetable.position[to_stop_id] <= timetable.position[from_stop_id]:
+            raise ValueError(f"Stop {to_stop_id} does not come after {from_stop_id} in route {route_id}")
+
+        departures = timetable.departures[from_stop_id]
+        index = bisect_left(departures, _to_seconds(at))
+        if index == len(departures):
+            return None
+        trip = timetable.schedule[timetable.trips[from_stop_id][index]]
+        return _from_seconds(departures[index]), _from_seconds(trip[timetable.position[to_stop_id]])
+
+    def get_next_departures(self, stop_id: str, at: time, limit: int = 5) -> List[Departure]:
+        """
+        Get the next departures from a stop across all the routes serving it.
+
+        Answers are cached per stop and time slot (SLOT_SECONDS), so repeated
+        queries for a busy stop cost one bisect over a short list.
+
+        Args:
+            stop_id: ID of the stop
+            at: Time of day
+            limit: Maximum number of departures to return
+
+        Returns:
+            Departures at or after `at`, ordered by time and route ID
+
+        Raises:
+            ValueError: If stop_id is empty or limit is not positive
+        """
+        if not stop_id:
+            raise ValueError("Stop ID cannot be empty")
+        if limit < 1:
+            raise ValueError("limit must be positive")
+
+        seconds = _to_seconds(at)
+        key = (stop_id, seconds // self.SLOT_SECONDS, limit)
+        window = self._answers.get(key)
+        if window is None:
+            self.misses += 1
+            window = self._slot_window(stop_id, key[1] * self.SLOT_SECONDS, limit)
+            self._answers[key] = window
+            if len(self._answers) > self.max_cached_answers:
+                self._answers.popitem(last=False)
+        else:
+            self.hits += 1
+            self._answers.move_to_end(key)
+
+        index = bisect_left(window, (seconds, ""))
+        return [Departure(route_id, _from_seconds(departure)) for departure, route_id in window[index:index + limit]]
+
+    def _slot_window(self, stop_id: str, slot_start: int, limit: int) -> List[Tuple[int, str]]:
+        """Departures from slot_start: those within the slot plus `limit` more."""
+        slot_end = slot_start + self.SLOT_SECONDS
+        window = []
+        for route_id in self.stop_to_routes.get(stop_id, ()):
+            timetable = self.timetables.get(route_id)
+            if timetable is None or stop_id not in timetable.position:
+                continue
+            departures = timetable.departures[stop_id]
+            start = bisect_left(departures, slot_start)
+            end = bisect_left(departures, slot_end, start)
+            window.extend((departure, route_id) for departure in departures[start:end + limit])
+        window.sort()
+        in_slot = sum(1 for departure, _ in window if departure < slot_end)
+        return window[:in_slot + limit]
+
+    def _timetable_for(self, route_id: str, stop_id: str) -> _Timetable:
+        timetable = self.timetables.get(route_id)
+        if timetable is None:
+            raise ValueError(f"Route {route_id} has no timetable")
+        if stop_id not in timetable.position:
+            raise ValueError(f"Stop {stop_id} not found in timetable of route {route_id}")
+        return timetable
+
+    def _invalidate(self, stop_ids) -> None:
+        """Drop cached answers for stops whose departures changed."""
+        stop_ids = set(stop_ids)
+        for key in [key for key in self._answers if key[0] in stop_ids]:
+            del self._answers[key]
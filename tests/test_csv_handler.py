@@ -57,4 +57,96 @@ class TestTransactionCSVHandler:
             f.write("invalid,csv,format\n1,2,3\n")
         
         with pytest.raises(ValueError):
-            TransactionCSVHandler.load_transactions(str(invalid_file))
\ No newline at end of file
+            TransactionCSVHandler.load_transactions(str(invalid_file))
+
+    def test_read_appended(self, tmp_path):
+        """Test only rows appended after the offset are read"""
+        csv_file = str(tmp_path / "transactions.csv")
+        TransactionCSVHandler.save_transactions(self.test_transactions[:1], csv_file)
+
+        first, offset = TransactionCSVHandler.read_appended(csv_file)
+        assert [t.customer_id for t in first] == ["CUST001"]
+
+        with open(csv_file, 'a') as f:
+            f.write("2023-01-02 15:30:00,CUST002,200.75\n2023-01-03 08:00:00,CUST0")
+        appended, offset = TransactionCSVHandler.read_appended(csv_file, offset)
+        assert appended == self.test_transactions[1:]
+
+        # The partially written row is read once it is complete
+        with open(csv_file, 'a') as f:
+            f.write("03,50.00\n")
+        appended, offset = TransactionCSVHandler.read_appended(csv_file, offset)
+        assert [(t.customer_id, t.amount) for t in appended] == [("CUST003", 50.0)]
+        assert TransactionCSVHandler.read_appended(csv_file, offset) == ([], offset)
+
+    def test_read_appended_invalid_rows(self, tmp_path):
+        """Test invalid rows and offsets past the end are rejected"""
+        csv_file = tmp_path / "transactions.csv"
+        csv_file.write_text("timestamp,customer_id,amount\n2023-01-01,CUST001,1.0\n")
+
+        with pytest.raises(ValueError, match="Invalid data format"):
+            TransactionCSVHandler.read_appended(str(csv_file))
+        with pytest.raises(ValueError, match="past the end"):
+            TransactionCSVHandler.read_appended(str(csv_file), 10000)
+
+    def test_prefix_unchanged(self, tmp_path):
+        """Test appends keep the read prefix while truncation and rewrites do not"""
+        csv_file = str(tmp_path / "transactions.csv")
+        TransactionCSVHandler.save_transactions(self.test_transactions, csv_file)
+        _, offset = TransactionCSVHandler.read_appended(csv_file)
+        tail = TransactionCSVHandler.read_tail(csv_file, offset)
+
+        with open(csv_file, 'a') as f:
+            f.write("2023-01-04 10:00:00,CUST004,1.00\n")
+        assert TransactionCSVHandler.prefix_unchanged(csv_file, offset, tail)
+
+        TransactionCSVHandler.save_transactions(self.test_transactions[:1], csv_file)
+        assert not TransactionCSVHandler.prefix_unchanged(csv_file, offset, tail)
+
+        rewritten = [Transaction(t.timestamp, t.customer_id, t.amount + 1) for t in self.test_transactions]
+        TransactionCSVHandler.save_transactions(rewritten, csv_file)
+        assert not TransactionCSVHandler.prefix_unchanged(csv_file, offset, tail)
+
+class TestPartitionedDataset:
+    def setup_method(self):
+        self.transactions = [
+            Transaction(datetime(2023, month, day, 12, 0, 0), f"CUST{month:03d}", float(day))
+            for month in range(1, 13)
+            for day in (1, 15, 28)
+        ]
+
+    def test_save_and_load_partitioned(self, tmp_path):
+        """Test transactions are written by month and read back with the manifest"""
+        directory = str(tmp_path / "dataset")
+        written = TransactionCSVHandler.save_partitioned(self.transactions, directory)
+
+        assert len(written) == 12
+        assert written[2] == "year=2023/month=03/part-00000.csv"
+        manifest = TransactionCSVHandler.load_manifest(directory)
+        assert manifest[2]["rows"] == 3
+        assert manifest[2]["min_timestamp"] == "2023-03-01 12:00:00"
+        assert manifest[2]["max_timestamp"] == "2023-03-28 12:00:00"
+        assert TransactionCSVHandler.load_partitioned(directory) == self.transactions
+
+    def test_partition_pruning(self, tmp_path):
+        """Test range reads only open overlapping partitions and filter rows"""
+        directory = str(tmp_path / "dataset")
+        TransactionCSVHandler.save_partitioned(self.transactions, directory)
+        start, end = datetime(2023, 3, 10), datetime(2023, 4, 10)
+
+        assert TransactionCSVHandler.partitions_for_range(directory, start, end) == [
+            "year=2023/month=03/part-00000.csv",
+            "year=2023/month=04/part-00000.csv",
+        ]
+        loaded = TransactionCSVHandler.load_partitioned(directory, start, end)
+        assert loaded == [t for t in self.transactions if start <= t.timestamp <= end]
+
+    def test_appending_adds_parts(self, tmp_path):
+        """Test later batches add new part files to existing partitions"""
+        directory = str(tmp_path / "dataset")
+        TransactionCSVHandler.save_partitioned(self.transactions[:3], directory)
+        extra = [Transaction(datetime(2023, 1, 30, 8, 0, 0), "CUST999", 5.0)]
+
+        assert TransactionCSVHandler.save_partitioned(extra, directory) == ["year=2023/month=01/part-00001.csv"]
+        assert TransactionCSVHandler.load_partitioned(directory) == self.transactions[:3] + extra
+        assert TransactionCSVHandler.load_partitioned(str(tmp_path / "missing")) == []
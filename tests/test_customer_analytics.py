@@ -3,7 +3,7 @@ Tests for the customer analytics module.
 """
 from datetime import datetime, timedelta
 import pytest
-from src.customer_analytics import CustomerAnalytics, Transaction
+from src.customer_analytics import CountCheckpoint, CustomerAnalytics, Transaction
 import time
 
 class TestCustomerAnalytics:
@@ -121,4 +121,85 @@ class TestCustomerAnalytics:
         
         # Performance assertions (adjust thresholds as needed)
         assert gen_time < 2.0, f"Data generation took too long: {gen_time:.2f}s"
-        assert analysis_time < 1.0, f"Analysis took too long: {analysis_time:.2f}s"
\ No newline at end of file
+        assert analysis_time < 1.0, f"Analysis took too long: {analysis_time:.2f}s"
+
+    def test_get_top_customers_from_dataset(self, tmp_path):
+        """Test top customers from a partitioned dataset match the in-memory analysis"""
+        from src.csv_handler import TransactionCSVHandler
+
+        transactions = self.analytics.generate_transaction_data(5000, self.start_date, self.end_date, 100)
+        directory = str(tmp_path / "dataset")
+        TransactionCSVHandler.save_partitioned(transactions, directory)
+        start, end = datetime(2023, 5, 10), datetime(2023, 6, 20)
+
+        assert self.analytics.get_top_customers_from_dataset(directory, start, end, 5) == \
+            self.analytics.get_top_customers(transactions, start, end, 5)
+
+class TestIncrementalCounts:
+    def setup_method(self):
+        self.analytics = CustomerAnalytics()
+        self.transactions = self.analytics.generate_transaction_data(
+            2000, datetime(2023, 1, 1), datetime(2023, 12, 31), 50
+        )
+
+    def write(self, path, transactions, mode='w'):
+        from src.csv_handler import TransactionCSVHandler
+
+        if mode == 'w':
+            TransactionCSVHandler.save_transactions(transactions, str(path))
+            return
+        with open(path, mode) as f:
+            for t in transactions:
+                f.write(f"{t.timestamp.strftime(TransactionCSVHandler.DATE_FORMAT)},{t.customer_id},{t.amount}\n")
+
+    def expected(self, transactions, top_n):
+        return self.analytics.get_top_customers(transactions, datetime(2023, 1, 1), datetime(2023, 12, 31), top_n)
+
+    def test_first_run_creates_checkpoint(self, tmp_path):
+        """Test the first run counts the whole file and saves the checkpoint"""
+        csv_file, checkpoint_file = tmp_path / "transactions.csv", str(tmp_path / "counts.json")
+        self.write(csv_file, self.transactions)
+
+        result = self.analytics.get_top_customers_incremental(str(csv_file), checkpoint_file, 5)
+
+        assert result == self.expected(self.transactions, 5)
+        checkpoint = CountCheckpoint.load(checkpoint_file)
+        assert checkpoint.offset == csv_file.stat().st_size
+        assert sum(checkpoint.counts.values()) == 2000
+        assert checkpoint.last_timestamp == max(t.timestamp for t in self.transactions)
+
+    def test_appended_rows_are_merged(self, tmp_path):
+        """Test later runs only count the appended rows"""
+        csv_file, checkpoint_file = tmp_path / "transactions.csv", str(tmp_path / "counts.json")
+        self.write(csv_file, self.transactions[:1500])
+        self.analytics.update_customer_counts(str(csv_file), checkpoint_file)
+
+        self.write(csv_file, self.transactions[1500:], mode='a')
+        checkpoint = self.analytics.update_customer_counts(str(csv_file), checkpoint_file)
+
+        assert sum(checkpoint.counts.values()) == 2000
+        assert self.analytics.get_top_customers_incremental(str(csv_file), checkpoint_file, 10) == \
+            self.expected(self.transactions, 10)
+
+    def test_rewritten_file_resets_counts(self, tmp_path):
+        """Test a truncated or rewritten file is counted from scratch"""
+        csv_file, checkpoint_file = tmp_path / "transactions.csv", str(tmp_path / "counts.json")
+        self.write(csv_file, self.transactions)
+        self.analytics.update_customer_counts(str(csv_file), checkpoint_file)
+
+        self.write(csv_file, self.transactions[:300])
+        checkpoint = self.analytics.update_customer_counts(str(csv_file), checkpoint_file)
+        assert sum(checkpoint.counts.values()) == 300
+
+        replacement = [Transaction(datetime(2023, 6, 1), "NEW001", 1.0)] + self.transactions[1:]
+        self.write(csv_file, replacement)
+        checkpoint = self.analytics.update_customer_counts(str(csv_file), checkpoint_file)
+        assert checkpoint.counts["NEW001"] == 1
+        assert sum(checkpoint.counts.values()) == 2000
+
+    def test_incremental_validation(self, tmp_path):
+        """Test invalid top_n values are rejected"""
+        csv_file = tmp_path / "transactions.csv"
+        self.write(csv_file, self.transactions)
+        with pytest.raises(ValueError, match="top_n must be positive"):
+            self.analytics.get_top_customers_incremental(str(csv_file), str(tmp_path / "counts.json"), 0)
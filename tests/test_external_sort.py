@@ -0,0 +1,64 @@
+"""
+Tests for the external merge sort of transaction CSV files.
+"""
+import os
+import random
+from datetime import datetime, timedelta
+import pytest
+from src.csv_handler import TransactionCSVHandler
+from src.customer_analytics import Transaction
+from src.external_sort import external_sort_csv, external_sort_to_dataset
+
+class TestExternalSort:
+    def setup_method(self):
+        rng = random.Random(3)
+        start = datetime(2023, 1, 1)
+        # Few distinct timestamps so stability is exercised
+        self.transactions = [
+            Transaction(start + timedelta(days=rng.randint(0, 90)), f"CUST{i:05d}", float(i))
+            for i in range(1000)
+        ]
+        self.expected = sorted(self.transactions, key=lambda t: t.timestamp)
+
+    @pytest.mark.parametrize("chunk_rows, workers, max_open_runs", [
+        (10000, 1, 128),  # single run
+        (37, 1, 128),     # many runs, single merge
+        (37, 1, 3),       # multi-pass merge
+        (100, 2, 4),      # parallel run generation
+    ])
+    def test_sort_csv(self, tmp_path, chunk_rows, workers, max_open_runs):
+        """Test unsorted files are sorted stably by timestamp"""
+        input_path = str(tmp_path / "unsorted.csv")
+        output_path = str(tmp_path / "sorted.csv")
+        TransactionCSVHandler.save_transactions(self.transactions, input_path)
+
+        count = external_sort_csv(
+            input_path, output_path,
+            chunk_rows=chunk_rows, workers=workers, max_open_runs=max_open_runs,
+            temp_dir=str(tmp_path)
+        )
+
+        assert count == 1000
+        assert TransactionCSVHandler.load_transactions(output_path) == self.expected
+        # Temporary runs are cleaned up
+        assert sorted(os.listdir(tmp_path)) == ["sorted.csv", "unsorted.csv"]
+
+    def test_sort_to_dataset(self, tmp_path):
+        """Test sorted output can be written as a partitioned dataset"""
+        input_path = str(tmp_path / "unsorted.csv")
+        directory = str(tmp_path / "dataset")
+        TransactionCSVHandler.save_transactions(self.transactions, input_path)
+
+        assert external_sort_to_dataset(input_path, directory, chunk_rows=300, workers=1) == 1000
+        assert TransactionCSVHandler.load_partitioned(directory) == self.expected
+
+    def test_invalid_input(self, tmp_path):
+        """Test invalid timestamps and headers are rejected"""
+        input_path = tmp_path / "invalid.csv"
+        input_path.write_text("timestamp,customer_id,amount\n2023/01/01 10:00,CUST1,1.0\n")
+        with pytest.raises(ValueError, match="Invalid timestamp"):
+            external_sort_csv(str(input_path), str(tmp_path / "out.csv"), workers=1)
+
+        input_path.write_text("a,b,c\n1,2,3\n")
+        with pytest.raises(ValueError, match="must contain fields"):
+            external_sort_csv(str(input_path), str(tmp_path / "out.csv"), workers=1)
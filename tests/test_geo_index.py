@@ -0,0 +1,107 @@
+"""
+Tests for the driver spatial index and the nearby drivers endpoint.
+"""
+import math
+import random
+import pytest
+from fastapi.testclient import TestClient
+from src.api import main
+from src.api.geo_index import METERS_PER_DEGREE, DriverGridIndex
+
+# Bogota city centre
+LAT, LON = 4.6097, -74.0817
+
+def offset(meters_north, meters_east):
+    """Coordinates displaced from the reference point by the given metres"""
+    return (
+        LAT + meters_north / METERS_PER_DEGREE,
+        LON + meters_east / (METERS_PER_DEGREE * math.cos(math.radians(LAT)))
+    )
+
+class TestDriverGridIndex:
+    def setup_method(self):
+        self.index = DriverGridIndex(cell_size_m=500)
+
+    def test_update_and_remove(self):
+        """Test drivers can be inserted, moved and removed"""
+        self.index.update("d1", *offset(0, 0))
+        self.index.update("d1", *offset(3000, 0), status="busy")
+
+        assert len(self.index) == 1
+        assert self.index.get("d1")[2] == "busy"
+        assert self.index.nearby(*offset(0, 0), radius_m=1000, status=None) == []
+
+        self.index.remove("d1")
+        assert "d1" not in self.index
+        with pytest.raises(ValueError, match="not indexed"):
+            self.index.remove("d1")
+
+    def test_update_validation(self):
+        """Test invalid driver updates are rejected"""
+        with pytest.raises(ValueError, match="Driver ID cannot be empty"):
+            self.index.update("", LAT, LON)
+        with pytest.raises(ValueError, match="Invalid coordinates"):
+            self.index.update("d1", 91.0, LON)
+
+    def test_nearby_radius_and_order(self):
+        """Test radius queries return drivers in range sorted by distance"""
+        self.index.update("near", *offset(100, 0))
+        self.index.update("mid", *offset(0, -600))
+        self.index.update("edge", *offset(990, 0))
+        self.index.update("far", *offset(1500, 0))
+        self.index.update("busy", *offset(50, 0), status="busy")
+
+        results = self.index.nearby(LAT, LON, radius_m=1000)
+        assert [driver_id for driver_id, _, _ in results] == ["near", "mid", "edge"]
+        assert results[0][1] == pytest.approx(100, abs=1)
+
+        assert [r[0] for r in self.index.nearby(LAT, LON, radius_m=1000, limit=2)] == ["near", "mid"]
+        assert "busy" in [r[0] for r in self.index.nearby(LAT, LON, radius_m=1000, status=None)]
+
+    def test_matches_brute_force(self):
+        """Test radius and k-nearest queries agree with a full scan"""
+        rng = random.Random(7)
+        for i in range(5000):
+            self.index.update(f"d{i}", *offset(rng.uniform(-8000, 8000), rng.uniform(-8000, 8000)))
+
+        everything = self.index.nearby(LAT, LON, radius_m=50000)
+        assert len(everything) == 5000
+
+        within = [r for r in everything if r[1] <= 1200]
+        assert self.index.nearby(LAT, LON, radius_m=1200) == within
+
+        nearest = self.index.nearest(LAT, LON, k=15)
+        assert [r[0] for r in nearest] == [r[0] for r in everything[:15]]
+
+    def test_nearest_respects_max_radius(self):
+        """Test k-nearest does not return drivers beyond max_radius_m"""
+        self.index.update("d1", *offset(200, 0))
+        self.index.update("d2", *offset(5000, 0))
+
+        assert [r[0] for r in self.index.nearest(LAT, LON, k=5, max_radius_m=1000)] == ["d1"]
+
+class TestNearbyDriversEndpoint:
+    def test_nearby_drivers(self, monkeypatch):
+        """Test the endpoint returns available drivers with rounded distances"""
+        index = DriverGridIndex()
+        index.update("driver-1", *offset(250, 0))
+        index.update("driver-2", *offset(2000, 0))
+        monkeypatch.setattr(main, "driver_index", index)
+
+        client = TestClient(main.app)
+        response = client.get("/api/v1/drivers/nearby", params={"lat": LAT, "lon": LON})
+        assert response.status_code == 200
+        assert response.json() == [
+            {"driver_id": "driver-1", "distance_meters": 250, "status": "available"}
+        ]
+
+        response = client.get(
+            "/api/v1/drivers/nearby", params={"lat": LAT, "lon": LON, "radius_m": 3000}
+        )
+        assert [d["driver_id"] for d in response.json()] == ["driver-1", "driver-2"]
+
+    def test_invalid_query(self):
+        """Test out of range coordinates are rejected"""
+        client = TestClient(main.app)
+        response = client.get("/api/v1/drivers/nearby", params={"lat": 100, "lon": LON})
+        assert response.status_code == 422
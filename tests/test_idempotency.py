@@ -0,0 +1,108 @@
+"""
+Tests for the idempotency cache.
+"""
+import asyncio
+import pytest
+from src.api.idempotency import (
+    IdempotencyCache,
+    IdempotencyKeyConflict,
+    IdempotencyRecord,
+    InMemoryIdempotencyStore,
+)
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class TestInMemoryIdempotencyStore:
+    def test_lru_eviction(self):
+        """Test the least recently used key is evicted when full"""
+        store = InMemoryIdempotencyStore(max_entries=2)
+        store.set("a", IdempotencyRecord("fp", 1))
+        store.set("b", IdempotencyRecord("fp", 2))
+
+        # Touch "a" so that "b" becomes the eviction candidate
+        assert store.get("a").response == 1
+        store.set("c", IdempotencyRecord("fp", 3))
+
+        assert len(store) == 2
+        assert store.get("b") is None
+        assert store.get("a").response == 1
+        assert store.get("c").response == 3
+
+    def test_ttl_expiration(self):
+        """Test entries expire after their TTL"""
+        clock = FakeClock()
+        store = InMemoryIdempotencyStore(ttl_seconds=10, clock=clock)
+        store.set("a", IdempotencyRecord("fp", 1))
+
+        clock.now = 9.9
+        assert store.get("a") is not None
+        clock.now = 10.0
+        assert store.get("a") is None
+        assert len(store) == 0
+
+    def test_validation(self):
+        """Test store limits must be positive"""
+        with pytest.raises(ValueError, match="max_entries must be positive"):
+            InMemoryIdempotencyStore(max_entries=0)
+        with pytest.raises(ValueError, match="ttl_seconds must be positive"):
+            InMemoryIdempotencyStore(ttl_seconds=0)
+
+class TestIdempotencyCache:
+    def setup_method(self):
+        self.cache = IdempotencyCache(InMemoryIdempotencyStore())
+        self.calls = 0
+
+    async def compute(self):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return {"call": self.calls}
+
+    def test_replays_stored_response(self):
+        """Test a repeated key returns the stored response"""
+        async def run():
+            first = await self.cache.execute("key", "fp", self.compute)
+            second = await self.cache.execute("key", "fp", self.compute)
+            return first, second
+
+        first, second = asyncio.run(run())
+        assert first == ({"call": 1}, False)
+        assert second == ({"call": 1}, True)
+        assert self.calls == 1
+
+    def test_coalesces_concurrent_duplicates(self):
+        """Test concurrent requests with the same key share one computation"""
+        async def run():
+            return await asyncio.gather(
+                *(self.cache.execute("key", "fp", self.compute) for _ in range(20))
+            )
+
+        results = asyncio.run(run())
+        assert self.calls == 1
+        assert all(response == {"call": 1} for response, _ in results)
+        assert sum(1 for _, replayed in results if not replayed) == 1
+
+    def test_conflicting_payload(self):
+        """Test reusing a key with another payload is rejected"""
+        async def run():
+            await self.cache.execute("key", "fp-1", self.compute)
+            await self.cache.execute("key", "fp-2", self.compute)
+
+        with pytest.raises(IdempotencyKeyConflict):
+            asyncio.run(run())
+
+    def test_failures_are_not_stored(self):
+        """Test a failed computation can be retried with the same key"""
+        async def failing():
+            raise RuntimeError("provider down")
+
+        async def run():
+            with pytest.raises(RuntimeError):
+                await self.cache.execute("key", "fp", failing)
+            return await self.cache.execute("key", "fp", self.compute)
+
+        assert asyncio.run(run()) == ({"call": 1}, False)
@@ -0,0 +1,51 @@
+"""
+Tests for the order API load-testing harness.
+"""
+import asyncio
+import json
+import pytest
+from src.api.load_test import generate_payloads, load_test, parse_mix, percentile
+
+class TestLoadTestHelpers:
+    def test_parse_mix(self):
+        """Test weighted mixes are parsed, with weight 1 by default"""
+        assert parse_mix("1:5,3:3,10") == {1: 5.0, 3: 3.0, 10: 1.0}
+        with pytest.raises(ValueError):
+            parse_mix("1:0,2:0")
+
+    def test_generate_payloads_follows_mixes(self):
+        """Test payloads only use cart sizes and strata from the mixes and are reproducible"""
+        payloads = generate_payloads(200, {2: 1.0, 4: 1.0}, {3: 1.0, 6: 0.0})
+
+        orders = [json.loads(body) for body in payloads]
+        assert {len(order["products"]) for order in orders} == {2, 4}
+        assert {order["stratum"] for order in orders} == {3}
+        assert generate_payloads(200, {2: 1.0, 4: 1.0}, {3: 1.0, 6: 0.0}) == payloads
+
+    def test_percentile(self):
+        """Test nearest-rank percentiles"""
+        values = [float(i) for i in range(1, 101)]
+        assert percentile(values, 0.5) == 50.0
+        assert percentile(values, 0.99) == 99.0
+        assert percentile(values, 1.0) == 100.0
+        assert percentile([], 0.5) == 0.0
+
+class TestLoadTest:
+    def test_asgi_run_report(self):
+        """Test an in-process run reports throughput and latency percentiles"""
+        report = asyncio.run(load_test(num_requests=50, concurrency=4, warmup=5))
+
+        assert report["requests"] == 50
+        assert report["succeeded"] == 50
+        assert report["status_codes"] == {"200": 50}
+        assert report["throughput_rps"] > 0
+        latency = report["latency_ms"]
+        assert 0 < latency["p50"] <= latency["p90"] <= latency["p99"] <= latency["max"]
+        json.dumps(report)
+
+    def test_invalid_arguments(self):
+        """Test invalid concurrency and transports are rejected"""
+        with pytest.raises(ValueError):
+            asyncio.run(load_test(num_requests=10, concurrency=0))
+        with pytest.raises(ValueError):
+            asyncio.run(load_test(num_requests=10, transport="grpc"))
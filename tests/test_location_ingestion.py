@@ -0,0 +1,138 @@
+"""
+Tests for the driver location ingestion pipeline.
+"""
+import asyncio
+from fastapi.testclient import TestClient
+from src.api import main
+from src.api.geo_index import DriverGridIndex
+from src.api.location_ingestion import LocationIngestionPipeline, LocationUpdate
+
+LAT, LON = 4.6097, -74.0817
+
+def update(driver_id, timestamp, lat=LAT, status="available"):
+    return LocationUpdate(driver_id, lat, LON, status, timestamp)
+
+class TestLocationIngestionPipeline:
+    def setup_method(self):
+        self.index = DriverGridIndex()
+        self.pipeline = LocationIngestionPipeline(self.index, max_pending_drivers=3)
+
+    def test_coalesces_per_driver(self):
+        """Test only the newest pending update per driver is applied"""
+        accepted, rejected = self.pipeline.submit([
+            update("d1", 1.0, lat=4.60),
+            update("d1", 3.0, lat=4.62),
+            update("d1", 2.0, lat=4.61),
+            update("d2", 1.0)
+        ])
+        assert (accepted, rejected) == (4, 0)
+        assert self.pipeline.pending == 2
+        assert len(self.index) == 0
+
+        assert self.pipeline.apply_pending() == 2
+        assert self.index.get("d1")[0] == 4.62
+
+        stats = self.pipeline.stats()
+        assert stats["received"] == 4
+        assert stats["coalesced"] == 1
+        assert stats["stale"] == 1
+        assert stats["applied"] == 2
+        assert stats["pending"] == 0
+        assert stats["ticks"] == 1
+
+    def test_out_of_order_updates_after_apply(self):
+        """Test updates older than the applied position are dropped"""
+        self.pipeline.submit([update("d1", 5.0, lat=4.62)])
+        self.pipeline.apply_pending()
+
+        self.pipeline.submit([update("d1", 4.0, lat=4.60)])
+        assert self.pipeline.pending == 0
+        assert self.index.get("d1")[0] == 4.62
+
+    def test_offline_drivers_are_removed(self):
+        """Test an offline report removes the driver from the index"""
+        self.pipeline.submit([update("d1", 1.0)])
+        self.pipeline.apply_pending()
+        self.pipeline.submit([update("d1", 2.0, status="offline"), update("d2", 2.0, status="offline")])
+        self.pipeline.apply_pending()
+
+        assert "d1" not in self.index
+        assert "d2" not in self.index
+
+    def test_offline_drivers_are_forgotten(self):
+        """Test offline drivers leave the applied map and recent ones still drop stale reports"""
+        self.pipeline.submit([update("d1", 1.0)])
+        self.pipeline.apply_pending()
+        self.pipeline.submit([update("d1", 2.0, status="offline")])
+        self.pipeline.apply_pending()
+        assert "d1" not in self.pipeline._last_applied
+
+        self.pipeline.submit([update("d1", 1.5)])
+        assert self.pipeline.pending == 0
+
+        for batch in range(3):
+            self.pipeline.submit([update(f"x{batch}-{i}", 3.0, status="offline") for i in range(3)])
+            self.pipeline.apply_pending()
+        assert len(self.pipeline._offline_at) == 3
+        assert self.pipeline._last_applied == {}
+
+    def test_backpressure(self):
+        """Test new drivers are rejected once the pending limit is reached"""
+        accepted, rejected = self.pipeline.submit([update(f"d{i}", 1.0) for i in range(5)])
+        assert (accepted, rejected) == (3, 2)
+
+        # Drivers already pending can still be refreshed
+        assert self.pipeline.submit([update("d0", 2.0)]) == (1, 0)
+        assert self.pipeline.stats()["rejected"] == 2
+
+    def test_background_ticks(self):
+        """Test the tick task applies updates without explicit calls"""
+        pipeline = LocationIngestionPipeline(self.index, tick_interval=0.01)
+
+        async def run():
+            pipeline.start()
+            pipeline.submit([update("d1", 1.0)])
+            await asyncio.sleep(0.05)
+            assert "d1" in self.index
+            pipeline.submit([update("d2", 1.0)])
+            await pipeline.stop()
+
+        asyncio.run(run())
+        assert "d2" in self.index
+        assert pipeline.ticks >= 2
+
+class TestLocationIngestionEndpoint:
+    def test_ingest_and_query(self, monkeypatch):
+        """Test ingested locations become visible to nearby queries"""
+        index = DriverGridIndex()
+        pipeline = LocationIngestionPipeline(index, max_pending_drivers=2)
+        monkeypatch.setattr(main, "driver_index", index)
+        monkeypatch.setattr(main, "location_pipeline", pipeline)
+        client = TestClient(main.app)
+
+        response = client.post("/api/v1/drivers/locations", json=[
+            {"driver_id": "driver-1", "lat": LAT, "lon": LON},
+            {"driver_id": "driver-1", "lat": LAT, "lon": LON, "timestamp": "2020-01-01T00:00:00Z"},
+            {"driver_id": "driver-2", "lat": LAT, "lon": LON, "status": "busy"},
+            {"driver_id": "driver-3", "lat": LAT, "lon": LON}
+        ])
+        assert response.status_code == 202
+        assert response.json() == {"accepted": 3, "rejected": 1}
+        assert response.headers["Retry-After"] == "1"
+
+        pipeline.apply_pending()
+        nearby = client.get("/api/v1/drivers/nearby", params={"lat": LAT, "lon": LON}).json()
+        assert [d["driver_id"] for d in nearby] == ["driver-1"]
+
+        stats = client.get("/api/v1/drivers/locations/stats").json()
+        assert stats["stale"] == 1
+        assert stats["rejected"] == 1
+        assert stats["indexed_drivers"] == 2
+
+    def test_invalid_updates(self):
+        """Test malformed location reports are rejected"""
+        client = TestClient(main.app)
+        response = client.post("/api/v1/drivers/locations", json=[
+            {"driver_id": "driver-1", "lat": LAT, "lon": LON, "status": "sleeping"}
+        ])
+        assert response.status_code == 422
@@ -0,0 +1,128 @@
+"""
+Tests for the request metrics and the /metrics endpoint.
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.api import main
+from src.api.metrics import LatencyHistogram, MetricsMiddleware, MetricsRegistry, timed_route_class
+
+ORDER = {
+    "products": [{"id": "1", "name": "Product 1", "price": 10000.00, "quantity": 2}],
+    "stratum": 3,
+    "address": "Test Address 123"
+}
+
+class TestLatencyHistogram:
+    def test_percentiles_within_bucket_error(self):
+        """Test percentiles stay within the relative error of a sub-bucket"""
+        histogram = LatencyHistogram()
+        for i in range(1, 1001):
+            histogram.record(i / 1000)
+
+        assert histogram.count == 1000
+        assert histogram.percentile(0.5) == pytest.approx(0.5, rel=1 / 32)
+        assert histogram.percentile(0.99) == pytest.approx(0.99, rel=1 / 32)
+        assert histogram.percentile(1.0) == pytest.approx(1.0)
+
+    def test_out_of_range_values_are_clamped(self):
+        """Test values outside the tracked range land in the edge buckets"""
+        histogram = LatencyHistogram()
+        histogram.record(0.0)
+        histogram.record(1e-9)
+        histogram.record(3600.0)
+
+        assert histogram.counts[0] == 2
+        assert histogram.counts[-1] == 1
+        assert histogram.percentile(1.0) == 3600.0
+
+    def test_cumulative_buckets(self):
+        """Test Prometheus buckets are cumulative at powers of two"""
+        histogram = LatencyHistogram()
+        histogram.record(0.003)
+        histogram.record(0.3)
+
+        buckets = dict(histogram.cumulative_buckets())
+        assert buckets[2 ** -8] == 1
+        assert buckets[0.5] == 2
+        assert histogram.percentile(0.5) == pytest.approx(0.003, rel=1 / 32)
+
+    def test_overflow_only_in_inf_bucket(self):
+        """Test values over the top bound are not counted in finite buckets"""
+        histogram = LatencyHistogram()
+        histogram.record(63.0)
+        histogram.record(100.0)
+
+        assert histogram.cumulative_buckets()[-1] == (64.0, 1)
+        registry = MetricsRegistry()
+        registry.observe_request("GET", "/slow", 200, 100.0)
+        body = registry.render_prometheus()
+        assert 'http_request_duration_seconds_bucket{method="GET",route="/slow",le="64"} 0' in body
+        assert 'http_request_duration_seconds_bucket{method="GET",route="/slow",le="+Inf"} 1' in body
+
+class TestMetricsMiddleware:
+    def setup_method(self):
+        self.registry = MetricsRegistry()
+        app = FastAPI()
+        app.router.route_class = timed_route_class(self.registry)
+        app.add_middleware(MetricsMiddleware, registry=self.registry)
+
+        @app.get("/items/{item_id}")
+        async def get_item(item_id: int):
+            assert self.registry.in_flight["/items/{item_id}"] == 1
+            return {"id": item_id}
+
+        @app.get("/sync")
+        def sync_endpoint():
+            return {}
+
+        self.client = TestClient(app)
+
+    def test_requests_are_labelled_by_route_template(self):
+        """Test latency is recorded per route template and status"""
+        self.client.get("/items/1")
+        self.client.get("/items/2")
+        self.client.get("/items/abc")
+        self.client.get("/missing")
+
+        assert self.registry.requests[("GET", "/items/{item_id}", 200)] == 2
+        assert self.registry.requests[("GET", "/items/{item_id}", 422)] == 1
+        assert self.registry.requests[("GET", "unmatched", 404)] == 1
+        assert self.registry.latency[("GET", "/items/{item_id}")].count == 3
+        assert self.registry.in_flight["/items/{item_id}"] == 0
+
+    def test_stage_timings(self):
+        """Test endpoint and framework stages are recorded for async and sync endpoints"""
+        self.client.get("/items/1")
+        self.client.get("/sync")
+
+        for route in ("/items/{item_id}", "/sync"):
+            assert self.registry.stages[(route, "endpoint")].count == 1
+            assert self.registry.stages[(route, "framework")].count == 1
+        # Validation failures never reach the endpoint
+        self.client.get("/items/abc")
+        assert self.registry.stages[("/items/{item_id}", "endpoint")].count == 1
+        assert self.registry.stages[("/items/{item_id}", "framework")].count == 2
+
+class TestMetricsEndpoint:
+    def test_prometheus_exposition(self):
+        """Test /metrics exposes order latency and stage timings"""
+        client = TestClient(main.app)
+        key = ("POST", "/api/v1/orders", 200)
+        before = main.metrics.requests.get(key, 0)
+        client.post("/api/v1/orders", json=ORDER)
+        assert main.metrics.requests[key] == before + 1
+
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        body = response.text
+        count = before + 1
+        assert f'http_requests_total{{method="POST",route="/api/v1/orders",status="200"}} {count}' in body
+        assert f'http_request_duration_seconds_count{{method="POST",route="/api/v1/orders"}} ' in body
+        assert 'http_request_duration_seconds_bucket{method="POST",route="/api/v1/orders",le="+Inf"}' in body
+        assert 'http_request_duration_quantile_seconds{method="POST",route="/api/v1/orders",quantile="0.99"}' in body
+        for stage in ("framework", "endpoint", "pricing"):
+            assert f'http_request_stage_duration_seconds_count{{route="/api/v1/orders",stage="{stage}"}}' in body
+        assert 'http_requests_in_flight{route="/metrics"} 1' in body
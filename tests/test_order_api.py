@@ -1,11 +1,13 @@
 """
 Tests for the order processing API.
 """
+import json
 from decimal import Decimal
 import pytest
 from fastapi.testclient import TestClient
 from src.api.main import app
 from src.api.models import Product, OrderRequest
+from src.api.pricing import calculate_order_totals_cents, get_pricing_engine
 from src.api.service import OrderService
 
 client = TestClient(app)
@@ -160,4 +162,186 @@ class TestOrderService:
         order = create_test_order(products)
         
         subtotal, _, discount, _ = OrderService.calculate_order_totals(order)
-        assert discount == Decimal("0")  # No discount
\ No newline at end of file
+        assert discount == Decimal("0")  # No discount
+
+class TestBatchOrderProcessing:
+    def valid_order(self, price="10.00", quantity=1, stratum=1):
+        return {
+            "products": [
+                {"id": "1", "name": "Test Product", "price": price, "quantity": quantity}
+            ],
+            "stratum": stratum,
+            "address": "Test Address 123"
+        }
+
+    def test_batch_json_array(self):
+        """Test a JSON array of orders is priced order by order"""
+        orders = [
+            self.valid_order(price="10.00", quantity=2),
+            self.valid_order(price="100000.00", stratum=2)
+        ]
+
+        response = client.post("/api/v1/orders/batch", json=orders)
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data["succeeded"] == 2
+        assert data["failed"] == 0
+        assert [r["index"] for r in data["results"]] == [0, 1]
+        assert data["results"][0]["result"]["total"] == "2020.00"
+        assert "order_id" not in data["results"][0]["result"]
+        assert "status" not in data["results"][0]["result"]
+        assert Decimal(data["results"][1]["result"]["discount_amount"]) == Decimal("10000")
+        assert Decimal(data["results"][1]["result"]["shipping_fee"]) == Decimal("3000")
+
+    def test_batch_partial_failures(self):
+        """Test invalid orders are reported without failing the whole batch"""
+        orders = [
+            self.valid_order(),
+            self.valid_order(stratum=7),
+            self.valid_order(price="-1.00")
+        ]
+
+        response = client.post("/api/v1/orders/batch", json=orders)
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data["succeeded"] == 1
+        assert data["failed"] == 2
+        assert data["results"][0]["error"] is None
+        assert "stratum" in data["results"][1]["error"]
+        assert "price" in data["results"][2]["error"]
+        assert data["results"][2]["result"] is None
+
+    def test_batch_ndjson(self):
+        """Test NDJSON bodies are accepted, including undecodable lines"""
+        lines = [json.dumps(self.valid_order()), "{not json", json.dumps(self.valid_order(stratum=6))]
+
+        response = client.post(
+            "/api/v1/orders/batch",
+            content="\n".join(lines) + "\n",
+            headers={"Content-Type": "application/x-ndjson"}
+        )
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data["succeeded"] == 2
+        assert data["failed"] == 1
+        assert data["results"][1]["error"] is not None
+        assert data["results"][2]["result"]["total"] == "7010.00"
+
+    def test_batch_rejects_non_array(self):
+        """Test a JSON body that is not an array is rejected"""
+        response = client.post("/api/v1/orders/batch", json=self.valid_order())
+        assert response.status_code == 400
+
+    def test_batch_size_limit(self, monkeypatch):
+        """Test oversized batches are rejected"""
+        from src.api import main
+        monkeypatch.setattr(main, "MAX_BATCH_SIZE", 2)
+
+        response = client.post("/api/v1/orders/batch", json=[self.valid_order()] * 3)
+        assert response.status_code == 413
+
+    def test_batch_priced_off_the_event_loop(self, monkeypatch):
+        """Test batches are priced in a worker thread, not on the event loop"""
+        import asyncio
+        from src.api import main
+
+        loops = []
+
+        def engine(order):
+            try:
+                loops.append(asyncio.get_running_loop())
+            except RuntimeError:
+                loops.append(None)
+            return OrderService.calculate_order_totals(order)
+
+        monkeypatch.setattr(main, "pricing_engine", engine)
+        response = client.post("/api/v1/orders/batch", json=[self.valid_order()] * 2)
+        assert response.status_code == 200
+        assert loops == [None, None]
+
+
+class TestPricingEngines:
+    # (price, quantity, stratum) vectors taken from the tests above
+    VECTORS = [
+        ("10.00", 2, 1),
+        ("100000.00", 1, 1),
+        ("100000", 1, 1),
+        ("50000", 1, 1),
+        ("1000", 1, 1),
+        ("10.00", 1, 6),
+    ]
+
+    @pytest.mark.parametrize("price,quantity,stratum", VECTORS)
+    def test_cents_engine_matches_decimal(self, price, quantity, stratum):
+        """Test the integer cents engine reproduces the Decimal engine"""
+        products = [Product(id="1", name="Test Product", price=Decimal(price), quantity=quantity)]
+        order = create_test_order(products, stratum=stratum)
+
+        expected = OrderService.calculate_order_totals(order)
+        assert calculate_order_totals_cents(order) == expected
+
+    def test_cents_engine_rounds_discount_half_up(self):
+        """Test fractional-cent discounts are rounded half up to whole cents"""
+        # 2% of 20000.25 is 400.0050
+        products = [Product(id="1", name="Test Product", price=Decimal("20000.25"), quantity=1)]
+        order = create_test_order(products)
+
+        subtotal, shipping, discount, total = calculate_order_totals_cents(order)
+        assert discount == Decimal("400.01")
+        assert total == subtotal + shipping - discount
+        assert total.as_tuple().exponent == -2
+
+    def test_cents_engine_falls_back_on_sub_cent_prices(self):
+        """Test prices with sub-cent precision are priced with Decimal"""
+        products = [Product(id="1", name="Test Product", price=Decimal("10.005"), quantity=3)]
+        order = create_test_order(products)
+
+        assert calculate_order_totals_cents(order) == OrderService.calculate_order_totals(order)
+
+    def test_engine_selection(self, monkeypatch):
+        """Test engines are resolved by name or from the environment"""
+        assert get_pricing_engine("cents") is calculate_order_totals_cents
+        assert get_pricing_engine("decimal") == OrderService.calculate_order_totals
+
+        monkeypatch.setenv("ORDER_PRICING_ENGINE", "cents")
+        assert get_pricing_engine() is calculate_order_totals_cents
+
+        with pytest.raises(ValueError, match="Unknown pricing engine"):
+            get_pricing_engine("float")
+
+
+class TestIdempotentOrderSubmission:
+    order_data = {
+        "products": [{"id": "1", "name": "Test Product", "price": "10.00", "quantity": 1}],
+        "stratum": 2,
+        "address": "Test Address 123"
+    }
+
+    def test_retry_replays_response(self, monkeypatch):
+        """Test retries with the same key are not recomputed"""
+        from src.api import main
+        calls = []
+        engine = main.pricing_engine
+        monkeypatch.setattr(main, "pricing_engine", lambda order: calls.append(order) or engine(order))
+
+        headers = {"Idempotency-Key": "retry-test-1"}
+        first = client.post("/api/v1/orders", json=self.order_data, headers=headers)
+        second = client.post("/api/v1/orders", json=self.order_data, headers=headers)
+
+        assert first.status_code == second.status_code == 200
+        assert first.json() == second.json()
+        assert "Idempotent-Replayed" not in first.headers
+        assert second.headers["Idempotent-Replayed"] == "true"
+        assert len(calls) == 1
+
+    def test_key_reuse_with_different_payload(self):
+        """Test a key cannot be reused for a different order"""
+        headers = {"Idempotency-Key": "retry-test-2"}
+        assert client.post("/api/v1/orders", json=self.order_data, headers=headers).status_code == 200
+
+        other = dict(self.order_data, stratum=3)
+        response = client.post("/api/v1/orders", json=other, headers=headers)
+        assert response.status_code == 422
@@ -0,0 +1,210 @@
+"""
+Tests for the order status cache and the order status endpoints.
+"""
+import asyncio
+from decimal import Decimal
+import pytest
+from fastapi.testclient import TestClient
+from src.api import main
+from src.api.models import OrderResponse
+from src.api.order_cache import OrderStatusCache
+
+def make_response(order_id, status="created"):
+    return OrderResponse(
+        order_id=order_id,
+        status=status,
+        subtotal=Decimal("20.00"),
+        shipping_fee=Decimal("2000.00"),
+        discount_amount=Decimal("0"),
+        total=Decimal("2020.00")
+    )
+
+class FakeStorage:
+    def __init__(self):
+        self.orders = {}
+        self.reads = 0
+
+    async def load(self, order_id):
+        self.reads += 1
+        order = self.orders.get(order_id)
+        await asyncio.sleep(0.01)
+        return order
+
+class TestOrderStatusCache:
+    def setup_method(self):
+        self.storage = FakeStorage()
+        self.storage.orders["o1"] = make_response("o1")
+        self.cache = OrderStatusCache(self.storage.load, max_entries=2)
+
+    def test_read_through(self):
+        """Test misses load from storage once and hits are served from memory"""
+        async def run():
+            first = await self.cache.get("o1")
+            second = await self.cache.get("o1")
+            return first, second
+
+        first, second = asyncio.run(run())
+        assert first is second
+        assert b'"status":"created"' in first.body
+        assert first.etag.startswith('"')
+        assert self.storage.reads == 1
+        assert (self.cache.hits, self.cache.misses) == (1, 1)
+
+    def test_coalesces_concurrent_misses(self):
+        """Test concurrent misses share one storage read"""
+        async def run():
+            return await asyncio.gather(*(self.cache.get("o1") for _ in range(50)))
+
+        results = asyncio.run(run())
+        assert self.storage.reads == 1
+        assert all(result is results[0] for result in results)
+
+    def test_missing_orders_are_not_cached(self):
+        """Test unknown orders are looked up again on the next request"""
+        async def run():
+            assert await self.cache.get("missing") is None
+            self.storage.orders["missing"] = make_response("missing")
+            return await self.cache.get("missing")
+
+        assert asyncio.run(run()) is not None
+        assert self.storage.reads == 2
+
+    def test_invalidation(self):
+        """Test invalidated orders are reloaded with a new ETag"""
+        async def run():
+            before = await self.cache.get("o1")
+            self.storage.orders["o1"] = make_response("o1", status="preparing")
+            self.cache.invalidate("o1")
+            after = await self.cache.get("o1")
+            return before, after
+
+        before, after = asyncio.run(run())
+        assert b'"status":"preparing"' in after.body
+        assert before.etag != after.etag
+
+    def test_invalidation_during_load(self):
+        """Test a load racing with a write is not cached"""
+        async def run():
+            load = asyncio.ensure_future(self.cache.get("o1"))
+            await asyncio.sleep(0)
+            self.storage.orders["o1"] = make_response("o1", status="preparing")
+            self.cache.invalidate("o1")
+            stale = await load
+            fresh = await self.cache.get("o1")
+            return stale, fresh
+
+        stale, fresh = asyncio.run(run())
+        assert b'"status":"created"' in stale.body
+        assert b'"status":"preparing"' in fresh.body
+        assert self.storage.reads == 2
+
+    def test_lru_bound(self):
+        """Test the cache evicts the least recently used order"""
+        for order_id in ("o1", "o2", "o3"):
+            self.cache.put(order_id, make_response(order_id))
+
+        assert len(self.cache) == 2
+        asyncio.run(self.cache.get("o1"))
+        assert self.storage.reads == 1
+
+class TestOrderStatusEndpoints:
+    order_data = {
+        "products": [{"id": "1", "name": "Product 1", "price": "10.00", "quantity": 2}],
+        "stratum": 1,
+        "address": "Test Address 123"
+    }
+
+    @pytest.fixture
+    def client(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("ORDER_DB_PATH", str(tmp_path / "orders.db"))
+        monkeypatch.setattr(main, "order_cache", OrderStatusCache(main._load_order))
+        with TestClient(main.app) as client:
+            yield client
+
+    def test_get_order_with_etag(self, client):
+        """Test orders can be polled and unchanged orders return 304"""
+        order_id = client.post("/api/v1/orders", json=self.order_data).json()["order_id"]
+
+        response = client.get(f"/api/v1/orders/{order_id}")
+        assert response.status_code == 200
+        assert response.json()["status"] == "created"
+        assert response.json()["total"] == "2020.00"
+        etag = response.headers["ETag"]
+
+        response = client.get(f"/api/v1/orders/{order_id}", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+
+        response = client.get(f"/api/v1/orders/{order_id}", headers={"If-None-Match": f'"other", W/{etag}'})
+        assert response.status_code == 304
+
+    def test_read_through_from_storage(self, client):
+        """Test orders not in the cache are loaded from storage"""
+        order_id = client.post("/api/v1/orders", json=self.order_data).json()["order_id"]
+        client.portal.call(main.app.state.order_writer.flush)
+        main.order_cache.invalidate(order_id)
+
+        response = client.get(f"/api/v1/orders/{order_id}")
+        assert response.status_code == 200
+        assert response.json()["order_id"] == order_id
+        assert main.order_cache.misses == 1
+
+    def test_etag_unchanged_after_reload(self, client):
+        """Test the cached copy written at creation matches what storage returns"""
+        order = {
+            "products": [{"id": "1", "name": "Product 1", "price": "50000.005", "quantity": 2}],
+            "stratum": 1,
+            "address": "Test Address 123"
+        }
+        order_id = client.post("/api/v1/orders", json=order).json()["order_id"]
+        created = client.get(f"/api/v1/orders/{order_id}")
+
+        client.portal.call(main.app.state.order_writer.flush)
+        main.order_cache.invalidate(order_id)
+        response = client.get(f"/api/v1/orders/{order_id}", headers={"If-None-Match": created.headers["ETag"]})
+
+        assert response.status_code == 304
+        assert main.order_cache.misses == 1
+
+    def test_status_transitions_invalidate(self, client):
+        """Test status changes are visible to pollers holding an old ETag"""
+        order_id = client.post("/api/v1/orders", json=self.order_data).json()["order_id"]
+        etag = client.get(f"/api/v1/orders/{order_id}").headers["ETag"]
+
+        for status in ("preparing", "assigned", "delivered"):
+            response = client.patch(f"/api/v1/orders/{order_id}/status", json={"status": status})
+            assert response.status_code == 200
+            assert response.json()["status"] == status
+
+        response = client.get(f"/api/v1/orders/{order_id}", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json()["status"] == "delivered"
+        assert response.headers["ETag"] != etag
+
+    def test_invalid_transitions(self, client):
+        """Test transitions out of order or on unknown orders are rejected"""
+        order_id = client.post("/api/v1/orders", json=self.order_data).json()["order_id"]
+
+        response = client.patch(f"/api/v1/orders/{order_id}/status", json={"status": "delivered"})
+        assert response.status_code == 409
+
+        response = client.patch("/api/v1/orders/missing/status", json={"status": "preparing"})
+        assert response.status_code == 404
+
+        response = client.patch(f"/api/v1/orders/{order_id}/status", json={"status": "created"})
+        assert response.status_code == 422
+
+    def test_status_update_of_unwritten_order(self, client, monkeypatch):
+        """Test a status update gives up with 503 while its order is still buffered"""
+        async def never_written(order_id, timeout):
+            raise asyncio.TimeoutError
+
+        order_id = client.post("/api/v1/orders", json=self.order_data).json()["order_id"]
+        monkeypatch.setattr(main.app.state.order_writer, "wait_written", never_written)
+
+        response = client.patch(f"/api/v1/orders/{order_id}/status", json={"status": "preparing"})
+        assert response.status_code == 503
+
+    def test_unknown_order(self, client):
+        """Test unknown orders return 404"""
+        assert client.get("/api/v1/orders/missing").status_code == 404
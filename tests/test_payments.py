@@ -0,0 +1,172 @@
+"""
+Tests for the asynchronous payment processing subsystem.
+"""
+import asyncio
+from decimal import Decimal
+import pytest
+from fastapi.testclient import TestClient
+from src.api import main
+from src.api.payments import (
+    FakePaymentProvider,
+    Payment,
+    PaymentQueueFull,
+    PaymentStore,
+    PaymentWorkerPool,
+)
+
+def run_payments(provider, num_payments=1, **pool_options):
+    """Submit payments to a fresh pool and wait for every attempt"""
+    store = PaymentStore()
+    options = dict(base_delay=0.001, max_delay=0.01)
+    options.update(pool_options)
+    pool = PaymentWorkerPool(provider, store, **options)
+
+    async def run():
+        pool.start()
+        payments = [
+            pool.submit(f"order-{i}", Decimal("60000.00"), "card") for i in range(num_payments)
+        ]
+        await pool.join()
+        await pool.stop()
+        return payments
+
+    return asyncio.run(run()), pool
+
+class TestPaymentWorkerPool:
+    def test_confirmed_payment(self):
+        """Test a successful charge confirms the payment"""
+        (payment,), _ = run_payments(FakePaymentProvider())
+
+        assert payment.status == "confirmed"
+        assert payment.retry_count == 0
+        assert payment.provider_transaction_id.startswith("fake-")
+
+    def test_retries_until_success(self):
+        """Test transient failures are retried and counted"""
+        provider = FakePaymentProvider(outcomes=["error", "retry"])
+        (payment,), _ = run_payments(provider)
+
+        assert payment.status == "confirmed"
+        assert payment.retry_count == 2
+        assert provider.calls == 3
+
+    def test_gives_up_after_max_retries(self):
+        """Test a payment fails once retries are exhausted"""
+        provider = FakePaymentProvider(outcomes=["error"] * 10)
+        (payment,), _ = run_payments(provider, max_retries=3)
+
+        assert payment.status == "failed"
+        assert payment.retry_count == 3
+        assert provider.calls == 4
+        assert payment.provider_response == {"error": "Fake provider error"}
+
+    def test_declined_payment_is_not_retried(self):
+        """Test a definitive decline fails without retries"""
+        provider = FakePaymentProvider(outcomes=["failed"])
+        (payment,), _ = run_payments(provider)
+
+        assert payment.status == "failed"
+        assert provider.calls == 1
+
+    def test_timeouts_are_retried(self):
+        """Test slow provider calls time out and are retried"""
+        provider = FakePaymentProvider(latency=0.05)
+        (payment,), _ = run_payments(provider, attempt_timeout=0.01, max_retries=1)
+
+        assert payment.status == "failed"
+        assert payment.retry_count == 1
+        assert payment.provider_response == {"error": "TimeoutError"}
+
+    def test_bounded_concurrency(self):
+        """Test no more than `concurrency` provider calls run at once"""
+        in_flight = []
+        peak = []
+
+        class TrackingProvider(FakePaymentProvider):
+            async def charge(self, payment):
+                in_flight.append(payment.id)
+                peak.append(len(in_flight))
+                try:
+                    return await super().charge(payment)
+                finally:
+                    in_flight.remove(payment.id)
+
+        payments, _ = run_payments(TrackingProvider(latency=0.005), num_payments=20, concurrency=3)
+
+        assert all(payment.status == "confirmed" for payment in payments)
+        assert max(peak) == 3
+
+    def test_backoff_delays(self):
+        """Test retry delays grow exponentially up to max_delay"""
+        pool = PaymentWorkerPool(FakePaymentProvider(), PaymentStore(), base_delay=1, max_delay=5)
+
+        assert 0.5 <= pool.retry_delay(1) <= 1
+        assert 1 <= pool.retry_delay(2) <= 2
+        assert 2 <= pool.retry_delay(3) <= 4
+        assert 2.5 <= pool.retry_delay(10) <= 5
+
+    def test_queue_limit(self):
+        """Test submissions are rejected when the queue is full"""
+        pool = PaymentWorkerPool(FakePaymentProvider(), PaymentStore(), max_queued=1)
+        pool.submit("order-1", Decimal("10.00"), "card")
+        with pytest.raises(PaymentQueueFull):
+            pool.submit("order-2", Decimal("10.00"), "card")
+
+    def test_unexpected_provider_errors_are_retried(self):
+        """Test exceptions other than ProviderError are retried, then fail the payment"""
+        class BrokenProvider(FakePaymentProvider):
+            async def charge(self, payment):
+                self.calls += 1
+                raise ConnectionError("connection reset")
+
+        provider = BrokenProvider()
+        (payment,), pool = run_payments(provider, max_retries=2)
+
+        assert payment.status == "failed"
+        assert payment.retry_count == 2
+        assert provider.calls == 3
+        assert payment.provider_response == {"error": "connection reset"}
+        assert pool.scheduled_retries == 0
+
+    def test_store_evicts_finalized_payments(self):
+        """Test the store stays bounded and keeps payments still in flight"""
+        store = PaymentStore(max_payments=2)
+        pending = Payment(id="p0", order_id="o0", amount=Decimal("1.00"), method="card", status="pending")
+        store.save(pending)
+        for i in range(1, 4):
+            store.save(Payment(id=f"p{i}", order_id=f"o{i}", amount=Decimal("1.00"), method="card", status="confirmed"))
+
+        assert len(store) == 2
+        assert store.get("p0") is pending
+        assert store.get("p3") is not None
+        assert store.get("p1") is None
+
+class TestPaymentEndpoints:
+    def test_create_and_poll_payment(self):
+        """Test payments are accepted immediately and processed in the background"""
+        with TestClient(main.app) as client:
+            response = client.post(
+                "/api/v1/payments",
+                json={"order_id": "order-1", "amount": "60000.00", "method": "card"}
+            )
+            assert response.status_code == 201
+            created = response.json()
+            assert created["status"] in ("initiated", "pending", "confirmed")
+            assert created["amount"] == "60000.00"
+
+            client.portal.call(main.payment_workers.join)
+            payment = client.get(f"/api/v1/payments/{created['payment_id']}").json()
+            assert payment["status"] == "confirmed"
+
+    def test_unknown_payment(self):
+        """Test polling an unknown payment returns 404"""
+        client = TestClient(main.app)
+        assert client.get("/api/v1/payments/missing").status_code == 404
+
+    def test_invalid_payment(self):
+        """Test invalid payment requests are rejected"""
+        client = TestClient(main.app)
+        response = client.post(
+            "/api/v1/payments", json={"order_id": "order-1", "amount": "-5", "method": "card"}
+        )
+        assert response.status_code == 422
@@ -0,0 +1,278 @@
+"""
+Tests for the order persistence layer.
+"""
+import asyncio
+import sqlite3
+import threading
+from datetime import datetime
+from decimal import Decimal
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from src.api import main
+from src.api.persistence import (
+    OrderItemRecord,
+    OrderRecord,
+    OrderRepository,
+    OrderWriteBehind,
+    SQLiteConnectionPool,
+    WriteBufferFull,
+)
+
+def make_record(order_id, num_items=1):
+    return OrderRecord(
+        id=order_id,
+        status="created",
+        subtotal=Decimal("100000.00"),
+        shipping=Decimal("2000.00"),
+        discount=Decimal("10000.0000"),
+        total=Decimal("92000.0000"),
+        created_at=datetime(2025, 1, 1, 12, 0, 0),
+        items=tuple(
+            OrderItemRecord(f"{order_id}-item-{i}", str(i), 1, Decimal("10.005"))
+            for i in range(num_items)
+        )
+    )
+
+@pytest.fixture
+def repository(tmp_path):
+    pool = SQLiteConnectionPool(str(tmp_path / "orders.db"), size=2)
+    repository = OrderRepository(pool)
+    repository.create_schema()
+    yield repository
+    pool.close()
+
+class TestOrderRepository:
+    def test_insert_orders(self, repository):
+        """Test orders and items are stored with numeric(12, 2) amounts"""
+        repository.insert_orders([make_record("order-1", num_items=2)])
+
+        with repository.pool.connection() as connection:
+            order = connection.execute(
+                "select status, subtotal, discount, total from orders where id = 'order-1'"
+            ).fetchone()
+            items = connection.execute(
+                "select menu_item_id, quantity, price from order_items where order_id = 'order-1' order by menu_item_id"
+            ).fetchall()
+
+        assert order == ("created", "100000.00", "10000.00", "92000.00")
+        assert items == [("0", 1, "10.01"), ("1", 1, "10.01")]
+
+    def test_multi_row_inserts_are_chunked(self, repository):
+        """Test batches above the bound parameter limit are split"""
+        records = [make_record(f"order-{i}", num_items=3) for i in range(500)]
+        repository.insert_orders(records)
+
+        assert repository.count_orders() == 500
+        with repository.pool.connection() as connection:
+            assert connection.execute("select count(*) from order_items").fetchone()[0] == 1500
+
+    def test_failed_batch_is_rolled_back(self, repository):
+        """Test a batch is written atomically"""
+        with pytest.raises(sqlite3.IntegrityError):
+            repository.insert_orders([make_record("dup"), make_record("dup")])
+        assert repository.count_orders() == 0
+
+    def test_memory_database_uses_single_connection(self):
+        """Test shared in-memory databases are not pooled"""
+        pool = SQLiteConnectionPool("file:test_pool?mode=memory&cache=shared", size=4)
+        assert pool.size == 1
+        pool.close()
+
+class TestOrderWriteBehind:
+    def test_batches_submitted_orders(self, repository):
+        """Test submitted orders are written in batches"""
+        async def run():
+            writer = OrderWriteBehind(repository, max_batch_size=100)
+            writer.start()
+            for i in range(250):
+                writer.submit(make_record(f"order-{i}"))
+            await writer.stop()
+            return writer
+
+        writer = asyncio.run(run())
+        assert writer.written == 250
+        assert writer.failed == 0
+        assert writer.batches >= 3
+        assert repository.count_orders() == 250
+
+    def test_buffer_full(self, repository):
+        """Test submit fails fast when the buffer is full"""
+        async def run():
+            writer = OrderWriteBehind(repository, max_pending=1)
+            writer.submit(make_record("order-1"))
+            with pytest.raises(WriteBufferFull):
+                writer.submit(make_record("order-2"))
+
+        asyncio.run(run())
+
+    def test_failed_batches_are_counted(self, repository):
+        """Test a failing batch is written order by order and only bad orders are dropped"""
+        async def run():
+            writer = OrderWriteBehind(repository, retry_delay=0)
+            writer.start()
+            writer.submit(make_record("dup"))
+            writer.submit(make_record("dup"))
+            await writer.flush()
+            writer.submit(make_record("order-2"))
+            await writer.stop()
+            return writer
+
+        writer = asyncio.run(run())
+        assert writer.failed == 1
+        assert writer.written == 2
+        assert writer.retries == 4
+        assert repository.count_orders() == 2
+
+    def test_transient_errors_are_retried(self, repository):
+        """Test a batch that fails once with a locked database is written on retry"""
+        class FlakyRepository:
+            calls = 0
+
+            def insert_orders(self, records):
+                self.calls += 1
+                if self.calls == 1:
+                    raise sqlite3.OperationalError("database is locked")
+                repository.insert_orders(records)
+
+        async def run():
+            writer = OrderWriteBehind(FlakyRepository(), max_attempts=1, retry_delay=0)
+            writer.start()
+            for i in range(3):
+                writer.submit(make_record(f"order-{i}"))
+            await writer.stop()
+            return writer
+
+        writer = asyncio.run(run())
+        assert (writer.written, writer.failed, writer.retries) == (3, 0, 1)
+        assert repository.count_orders() == 3
+
+    def test_lock_retries_are_bounded(self, repository):
+        """Test a database that stays locked neither blocks the writer nor shutdown forever"""
+        class LockedRepository:
+            def insert_orders(self, records):
+                raise sqlite3.OperationalError("database is locked")
+
+        async def run():
+            writer = OrderWriteBehind(LockedRepository(), retry_delay=0.01, max_retry_seconds=0.05)
+            writer.start()
+            writer.submit(make_record("order-1"))
+            writer.submit(make_record("order-2"))
+            await writer.flush()
+            assert (writer.written, writer.failed) == (0, 2)
+
+            stuck = OrderWriteBehind(LockedRepository(), retry_delay=0.01, max_retry_seconds=60)
+            stuck.start()
+            stuck.submit(make_record("order-3"))
+            await asyncio.wait_for(stuck.stop(timeout=0.1), 5)
+
+        asyncio.run(run())
+
+    def test_wait_written_waits_for_one_order(self, repository):
+        """Test waiting for an order does not wait for the orders queued after it"""
+        release = threading.Event()
+
+        class SlowRepository:
+            def insert_orders(self, records):
+                if records[0].id == "slow":
+                    release.wait(5)
+                repository.insert_orders(records)
+
+        async def run():
+            writer = OrderWriteBehind(SlowRepository(), max_batch_size=1)
+            writer.start()
+            for order_id in ("order-1", "slow", "order-3"):
+                writer.submit(make_record(order_id))
+
+            assert await writer.wait_written("order-1", timeout=5) is True
+            with pytest.raises(asyncio.TimeoutError):
+                await writer.wait_written("order-3", timeout=0.05)
+            assert await writer.wait_written("unknown", timeout=0) is True
+
+            release.set()
+            assert await writer.wait_written("order-3", timeout=5) is True
+            await writer.stop()
+
+        asyncio.run(run())
+        assert repository.count_orders() == 3
+
+    def test_wait_written_reports_failures(self, repository):
+        """Test waiting for an order that cannot be stored returns False"""
+        async def run():
+            writer = OrderWriteBehind(repository, retry_delay=0)
+            writer.start()
+            writer.submit(make_record("dup"))
+            await writer.flush()
+            writer.submit(make_record("dup"))
+            written = await writer.wait_written("dup", timeout=5)
+            await writer.stop()
+            return written
+
+        assert asyncio.run(run()) is False
+
+class TestOrderApiPersistence:
+    order_data = {
+        "products": [
+            {"id": "1", "name": "Product 1", "price": "10.00", "quantity": 2},
+            {"id": "2", "name": "Product 2", "price": "5.00", "quantity": 1}
+        ],
+        "stratum": 1,
+        "address": "Test Address 123"
+    }
+
+    def test_concurrent_submissions_are_persisted(self, repository, monkeypatch):
+        """Test hundreds of concurrent orders are all written"""
+        async def run():
+            writer = OrderWriteBehind(repository)
+            writer.start()
+            monkeypatch.setattr(main.app.state, "order_writer", writer)
+
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                responses = await asyncio.gather(
+                    *(client.post("/api/v1/orders", json=self.order_data) for _ in range(300))
+                )
+            await writer.stop()
+            return responses
+
+        responses = asyncio.run(run())
+        assert all(response.status_code == 200 for response in responses)
+        order_ids = {response.json()["order_id"] for response in responses}
+        assert len(order_ids) == 300
+
+        assert repository.count_orders() == 300
+        with repository.pool.connection() as connection:
+            assert connection.execute("select count(*) from order_items").fetchone()[0] == 600
+
+    def test_lifespan_configures_persistence(self, tmp_path, monkeypatch):
+        """Test the app persists orders while its lifespan is running"""
+        monkeypatch.setenv("ORDER_DB_PATH", str(tmp_path / "api.db"))
+
+        with TestClient(main.app) as client:
+            response = client.post("/api/v1/orders", json=self.order_data)
+            assert response.status_code == 200
+            assert response.json()["status"] == "created"
+
+        assert main.app.state.order_writer is None
+        connection = sqlite3.connect(str(tmp_path / "api.db"))
+        row = connection.execute("select id, total from orders").fetchone()
+        connection.close()
+        assert row == (response.json()["order_id"], "2025.00")
+
+    def test_response_amounts_match_storage(self, tmp_path, monkeypatch):
+        """Test the POST response carries the same cent-rounded amounts as storage"""
+        monkeypatch.setenv("ORDER_DB_PATH", str(tmp_path / "api.db"))
+        order = {
+            "products": [{"id": "1", "name": "Product 1", "price": "50000.005", "quantity": 2}],
+            "stratum": 1,
+            "address": "Test Address 123"
+        }
+
+        with TestClient(main.app) as client:
+            created = client.post("/api/v1/orders", json=order).json()
+            client.portal.call(main.app.state.order_writer.flush)
+            main.order_cache.invalidate(created["order_id"])
+            stored = client.get(f"/api/v1/orders/{created['order_id']}").json()
+
+        assert created["total"] == "92000.01"
+        assert stored == created
@@ -0,0 +1,217 @@
+"""
+Tests for the compiled pricing rule tables.
+"""
+import json
+import os
+from datetime import datetime
+from decimal import Decimal
+import pytest
+from src.api.models import OrderRequest, Product
+from src.api.pricing import calculate_order_totals_cents
+from src.api.pricing_rules import PricingRules, compile_pricing_rules
+from src.api.service import OrderService
+
+DEFAULT_FEES = OrderService.SHIPPING_FEES
+DEFAULT_RULES = OrderService.DISCOUNT_RULES
+
+PROMO_START = datetime(2025, 11, 28).timestamp()
+PROMO_END = datetime(2025, 11, 29).timestamp()
+
+def compile_rules(config):
+    return compile_pricing_rules(config, DEFAULT_FEES, DEFAULT_RULES)
+
+class TestCompiledPricingRules:
+    def test_defaults_match_order_service(self):
+        """Test an empty config reproduces the hardcoded rules"""
+        rules = compile_rules({})
+
+        for stratum, fee in DEFAULT_FEES.items():
+            assert rules.lookup(stratum).shipping_fee == fee
+
+        pricing = rules.lookup(1)
+        assert pricing.discount_rate(Decimal("19999.99")) is None
+        assert pricing.discount_rate(Decimal("20000")) == Decimal("0.02")
+        assert pricing.discount_rate(Decimal("50000")) == Decimal("0.05")
+        assert pricing.discount_rate(Decimal("99999.99")) == Decimal("0.05")
+        assert pricing.discount_rate(Decimal("100000")) == Decimal("0.10")
+        assert pricing.discount_basis_points(2000000) == 200
+
+    def test_city_overrides(self):
+        """Test cities override fees and tiers and fall back to the defaults"""
+        rules = compile_rules({
+            "cities": {
+                "Medellin": {
+                    "shipping_fees": {"1": "2500.00"},
+                    "discount_rules": [{"threshold": "10000", "rate": "0.03"}]
+                }
+            }
+        })
+
+        medellin = rules.lookup(1, "medellin")
+        assert medellin.shipping_fee == Decimal("2500.00")
+        assert medellin.discount_rate(Decimal("15000")) == Decimal("0.03")
+        assert medellin.discount_rate(Decimal("200000")) == Decimal("0.03")
+
+        # Strata not overridden keep the default fee
+        assert rules.lookup(2, " MEDELLIN ").shipping_fee == DEFAULT_FEES[2]
+        # Unknown cities use the default rules
+        assert rules.lookup(1, "bogota").shipping_fee == DEFAULT_FEES[1]
+
+    def test_time_bound_promotions(self):
+        """Test promotions only apply inside their window, city and strata"""
+        rules = compile_rules({
+            "promotions": [{
+                "name": "black-friday",
+                "starts_at": "2025-11-28T00:00:00",
+                "ends_at": "2025-11-29T00:00:00",
+                "cities": ["cali"],
+                "strata": [1, 2],
+                "discount_rules": [{"threshold": "30000", "rate": "0.15"}]
+            }]
+        })
+        subtotal = Decimal("60000")
+
+        assert rules.lookup(1, "cali", at=PROMO_START - 1).discount_rate(subtotal) == Decimal("0.05")
+        assert rules.lookup(1, "cali", at=PROMO_START).discount_rate(subtotal) == Decimal("0.15")
+        assert rules.lookup(1, "cali", at=PROMO_END).discount_rate(subtotal) == Decimal("0.05")
+        assert rules.lookup(3, "cali", at=PROMO_START).discount_rate(subtotal) == Decimal("0.05")
+        assert rules.lookup(1, None, at=PROMO_START).discount_rate(subtotal) == Decimal("0.05")
+
+        # The best rate wins: base 10% beats nothing, promo 15% beats base 10%
+        pricing = rules.lookup(1, "cali", at=PROMO_START)
+        assert pricing.discount_rate(Decimal("25000")) == Decimal("0.02")
+        assert pricing.discount_rate(Decimal("150000")) == Decimal("0.15")
+
+    def test_many_promotions(self):
+        """Test hundreds of promotion tiers compile into a single step table"""
+        promotions = [
+            {
+                "starts_at": "2025-11-28T00:00:00",
+                "ends_at": "2025-11-29T00:00:00",
+                "discount_rules": [{"threshold": str(1000 * (i + 1)), "rate": "0.01"}]
+            }
+            for i in range(300)
+        ]
+        rules = compile_rules({"promotions": promotions})
+
+        pricing = rules.lookup(1, at=PROMO_START)
+        assert len(pricing.thresholds) <= 5
+        assert pricing.discount_rate(Decimal("1000")) == Decimal("0.01")
+        assert pricing.discount_rate(Decimal("999")) is None
+
+    def test_invalid_configs(self):
+        """Test invalid configurations are rejected"""
+        with pytest.raises(ValueError, match="starts_at must be before ends_at"):
+            compile_rules({"promotions": [{
+                "starts_at": "2025-11-29T00:00:00",
+                "ends_at": "2025-11-28T00:00:00",
+                "discount_rules": []
+            }]})
+
+        with pytest.raises(ValueError, match="between 0 and 1"):
+            compile_rules({"discount_rules": [{"threshold": "1000", "rate": "1.5"}]})
+
+        with pytest.raises(ValueError, match="basis points"):
+            compile_rules({"discount_rules": [{"threshold": "1000", "rate": "0.00001"}]})
+
+        with pytest.raises(ValueError, match="threshold and a rate"):
+            compile_rules({"discount_rules": [{"threshold": "1000"}]})
+
+    @pytest.mark.parametrize("config", [
+        {"cities": {"x": []}},
+        {"cities": []},
+        {"promotions": ["a"]},
+        {"promotions": {}},
+        {"shipping_fees": []},
+        {"discount_rules": {}},
+        {"promotions": [{"starts_at": "2025-11-28", "ends_at": "2025-11-29", "cities": "cali"}]},
+        {"promotions": [{"starts_at": "2025-11-28", "ends_at": "2025-11-29", "strata": [[1]]}]},
+    ])
+    def test_wrongly_shaped_configs(self, config):
+        """Test valid JSON with the wrong structure is rejected with ValueError"""
+        with pytest.raises(ValueError):
+            compile_rules(config)
+
+class TestPricingRulesReload:
+    def write_config(self, path, fee):
+        with open(path, 'w') as f:
+            json.dump({"shipping_fees": {"1": fee}}, f)
+
+    def test_reload_swaps_tables(self, tmp_path):
+        """Test a modified rules file is picked up and swapped in"""
+        path = tmp_path / "pricing.json"
+        self.write_config(path, "2100.00")
+        holder = PricingRules(DEFAULT_FEES, DEFAULT_RULES, str(path))
+
+        before = holder.current()
+        assert before.lookup(1).shipping_fee == Decimal("2100.00")
+        assert holder.reload_if_changed() is False
+
+        self.write_config(path, "2200.00")
+        os.utime(path, (0, 1))
+        assert holder.reload_if_changed() is True
+
+        assert holder.current().lookup(1).shipping_fee == Decimal("2200.00")
+        # Tables handed out before the reload are never mutated
+        assert before.lookup(1).shipping_fee == Decimal("2100.00")
+
+    def test_invalid_reload_keeps_current_tables(self, tmp_path):
+        """Test a broken rules file does not replace the active tables"""
+        path = tmp_path / "pricing.json"
+        self.write_config(path, "2100.00")
+        holder = PricingRules(DEFAULT_FEES, DEFAULT_RULES, str(path))
+
+        path.write_text("{not json")
+        os.utime(path, (0, 1))
+        assert holder.reload_if_changed() is False
+        assert holder.current().lookup(1).shipping_fee == Decimal("2100.00")
+
+    def test_watcher_survives_bad_files(self, tmp_path, monkeypatch):
+        """Test the watcher thread keeps reloading after a wrongly shaped file or an unexpected error"""
+        import time
+
+        path = tmp_path / "pricing.json"
+        self.write_config(path, "2100.00")
+        holder = PricingRules(DEFAULT_FEES, DEFAULT_RULES, str(path))
+        holder.start_auto_reload(interval=0.01)
+        try:
+            path.write_text(json.dumps({"cities": {"x": []}}))
+            os.utime(path, (0, 1))
+            time.sleep(0.05)
+            assert holder._watcher.is_alive()
+
+            original = holder.reload_if_changed
+            calls = []
+
+            def flaky():
+                if not calls:
+                    calls.append(1)
+                    raise RuntimeError("boom")
+                return original()
+
+            monkeypatch.setattr(holder, "reload_if_changed", flaky)
+            self.write_config(path, "2300.00")
+            os.utime(path, (0, 2))
+            deadline = time.monotonic() + 2
+            while holder.current().lookup(1).shipping_fee != Decimal("2300.00") and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert holder.current().lookup(1).shipping_fee == Decimal("2300.00")
+            assert holder._watcher.is_alive()
+        finally:
+            holder.stop_auto_reload()
+
+    def test_order_service_uses_active_rules(self, monkeypatch):
+        """Test both pricing engines read the published tables"""
+        holder = PricingRules(DEFAULT_FEES, DEFAULT_RULES)
+        holder._rules = compile_rules({"cities": {"cali": {"shipping_fees": {"3": "1000.00"}}}})
+        monkeypatch.setattr(OrderService, "pricing_rules", holder)
+
+        order = OrderRequest(
+            products=[Product(id="1", name="Test Product", price=Decimal("10.00"), quantity=1)],
+            stratum=3,
+            address="Test Address 123",
+            city="Cali"
+        )
+
+        assert OrderService.calculate_order_totals(order)[1] == Decimal("1000.00")
+        assert calculate_order_totals_cents(order)[1] == Decimal("1000.00")
@@ -0,0 +1,108 @@
+"""
+Tests for the order request/response fast path.
+"""
+import json
+from decimal import Decimal
+import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
+from fastapi.testclient import TestClient
+from src.api.main import app
+from src.api.models import OrderResponse
+from src.api.serialization import ORDER_REQUEST_ADAPTER, PydanticJSONResponse, parse_body
+
+client = TestClient(app)
+
+ORDER = {
+    "products": [{"id": "1", "name": "Product 1", "price": "10.50", "quantity": 2}],
+    "stratum": 3,
+    "address": "Test Address 123"
+}
+
+class TestParseBody:
+    def test_valid_body(self):
+        """Test a raw body is decoded and validated in one step"""
+        order = parse_body(ORDER_REQUEST_ADAPTER, json.dumps(ORDER).encode())
+
+        assert order.stratum == 3
+        assert order.products[0].price == Decimal("10.50")
+
+    @pytest.mark.parametrize("field, value", [("price", "0"), ("quantity", 0)])
+    def test_product_rules_are_kept(self, field, value):
+        """Test price and quantity must stay positive"""
+        order = json.loads(json.dumps(ORDER))
+        order["products"][0][field] = value
+
+        with pytest.raises(RequestValidationError) as e:
+            parse_body(ORDER_REQUEST_ADAPTER, json.dumps(order).encode())
+        assert e.value.errors()[0]["loc"] == ("body", "products", 0, field)
+
+    def test_invalid_json(self):
+        """Test undecodable bodies are reported as body errors"""
+        with pytest.raises(RequestValidationError) as e:
+            parse_body(ORDER_REQUEST_ADAPTER, b"{not json")
+        assert e.value.errors()[0]["type"] == "json_invalid"
+        assert e.value.errors()[0]["loc"] == ("body",)
+
+class TestPydanticJSONResponse:
+    def test_matches_standard_encoding(self):
+        """Test responses match FastAPI's default encoding, Decimals as strings"""
+        response = OrderResponse(
+            subtotal=Decimal("21.00"),
+            shipping_fee=Decimal("4000.00"),
+            discount_amount=Decimal("0"),
+            total=Decimal("4021.00"),
+            order_id="o1",
+            status="created"
+        )
+
+        body = json.loads(PydanticJSONResponse(response).body)
+
+        assert body == jsonable_encoder(response)
+        assert body["total"] == "4021.00"
+
+class TestOrderEndpointFastPath:
+    def test_order_endpoint(self):
+        """Test the order endpoint validates and renders through the fast path"""
+        response = client.post("/api/v1/orders", json=ORDER)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        assert response.json()["subtotal"] == "21.00"
+
+    @pytest.mark.parametrize("stratum", [0, 7])
+    def test_stratum_rule_is_kept(self, stratum):
+        """Test strata outside 1-6 are rejected with a body error"""
+        response = client.post("/api/v1/orders", json={**ORDER, "stratum": stratum})
+
+        assert response.status_code == 422
+        assert response.json()["detail"][0]["loc"] == ["body", "stratum"]
+
+    def test_openapi_documents_request_body(self):
+        """Test the order schema is still documented"""
+        operation = app.openapi()["paths"]["/api/v1/orders"]["post"]
+
+        schema = operation["requestBody"]["content"]["application/json"]["schema"]
+        assert schema["title"] == "OrderRequest"
+
+    def test_openapi_references_resolve(self):
+        """Test every $ref in the OpenAPI document points at a registered component"""
+        document = app.openapi()
+        schemas = document["components"]["schemas"]
+
+        def refs(node):
+            if isinstance(node, dict):
+                if "$ref" in node:
+                    yield node["$ref"]
+                for value in node.values():
+                    yield from refs(value)
+            elif isinstance(node, list):
+                for value in node:
+                    yield from refs(value)
+
+        found = set(refs(document))
+        assert "#/components/schemas/Product" in found
+        assert "#/components/schemas/OrderRequest" in found
+        for ref in found:
+            assert ref.startswith("#/components/schemas/")
+            assert ref.rsplit("/", 1)[1] in schemas
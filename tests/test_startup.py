@@ -0,0 +1,68 @@
+"""
+Import-time regression checks for the CLI and the lightweight modules.
+
+Each check runs in a fresh interpreter so modules cached by other tests do
+not hide slow imports.
+"""
+import json
+import os
+import subprocess
+import sys
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Generous budget for importing a lightweight module in a fresh interpreter;
+# FastAPI alone takes several times this
+IMPORT_BUDGET_SECONDS = 0.15
+
+HEAVY_MODULES = ("fastapi", "pydantic", "starlette", "httpx", "numpy")
+
+LIGHT_MODULES = [
+    "src.cli",
+    "src.customer_analytics",
+    "src.csv_handler",
+    "src.external_sort",
+    "src.transport_routes",
+    "src.api.geo_index",
+    "src.api.idempotency",
+    "src.api.location_ingestion",
+    "src.api.metrics",
+    "src.api.payments",
+    "src.api.pricing_rules",
+    "src.api.top_customers",
+]
+
+def measure_import(module):
+    code = (
+        "import json, sys, time\n"
+        "started = time.perf_counter()\n"
+        f"import {module}\n"
+        "elapsed = time.perf_counter() - started\n"
+        f"print(json.dumps({{'seconds': elapsed, 'heavy': [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output)
+
+class TestStartup:
+    @pytest.mark.parametrize("module", LIGHT_MODULES)
+    def test_light_modules_avoid_heavy_imports(self, module):
+        """Test lightweight modules do not import web or validation frameworks"""
+        result = measure_import(module)
+
+        assert result["heavy"] == []
+        assert result["seconds"] < IMPORT_BUDGET_SECONDS, (
+            f"Importing {module} took {result['seconds']:.3f}s"
+        )
+
+    def test_cli_help(self):
+        """Test the CLI starts and lists its subcommands"""
+        result = subprocess.run(
+            [sys.executable, "-m", "src.cli", "--help"], cwd=ROOT, capture_output=True, text=True
+        )
+
+        assert result.returncode == 0
+        for command in ("generate", "analyze", "benchmark"):
+            assert command in result.stdout
@@ -0,0 +1,165 @@
+"""
+Tests for the precomputed top-customers analytics and its API endpoint.
+"""
+import asyncio
+import os
+import random
+from datetime import datetime, timedelta
+import pytest
+from fastapi.testclient import TestClient
+from src.api import main
+from src.api.top_customers import TopCustomersIndex
+from src.csv_handler import TransactionCSVHandler
+from src.customer_analytics import CustomerAnalytics, Transaction
+
+START = datetime(2023, 1, 1)
+END = datetime(2023, 12, 31)
+
+def append_rows(filepath, transactions):
+    with open(filepath, 'a') as f:
+        for t in transactions:
+            f.write(f"{t.timestamp.strftime(TransactionCSVHandler.DATE_FORMAT)},{t.customer_id},{t.amount}\n")
+
+class TestTopCustomersIndex:
+    def setup_method(self):
+        random.seed(7)
+        self.analytics = CustomerAnalytics()
+        self.transactions = self.analytics.generate_transaction_data(3000, START, END, 50)
+
+    def test_matches_full_scan(self, tmp_path):
+        """Test precomputed answers match get_top_customers for arbitrary ranges"""
+        csv_file = str(tmp_path / "transactions.csv")
+        TransactionCSVHandler.save_transactions(self.transactions, csv_file)
+        index = TopCustomersIndex(csv_file)
+        assert index.refresh() == 3000
+
+        rng = random.Random(1)
+        ranges = [(START, END), (datetime(2023, 3, 1), datetime(2023, 3, 31, 23, 59, 59))]
+        for _ in range(20):
+            a = START + timedelta(seconds=rng.randint(0, 364 * 86400))
+            b = START + timedelta(seconds=rng.randint(0, 364 * 86400))
+            if a != b:
+                ranges.append((min(a, b), max(a, b)))
+        for start_date, end_date in ranges:
+            expected = self.analytics.get_top_customers(self.transactions, start_date, end_date, 5)
+            assert index.top_customers(start_date, end_date, 5) == expected
+
+    def test_incremental_refresh_updates_cached_answers(self, tmp_path):
+        """Test appended rows are merged into counters and hot cached answers"""
+        csv_file = str(tmp_path / "transactions.csv")
+        TransactionCSVHandler.save_transactions(self.transactions[:2000], csv_file)
+        index = TopCustomersIndex(csv_file)
+        index.refresh()
+        index.top_customers(START, END, 10)
+
+        append_rows(csv_file, self.transactions[2000:])
+        assert index.refresh() == 1000
+        assert index.refresh() == 0
+
+        expected = self.analytics.get_top_customers(self.transactions, START, END, 10)
+        assert index.top_customers(START, END, 10) == expected
+        assert (index.hits, index.misses) == (1, 1)
+        assert index.transactions == 3000
+
+    def test_rewritten_file_is_reloaded(self, tmp_path):
+        """Test truncated or rewritten files are reloaded from scratch"""
+        csv_file = str(tmp_path / "transactions.csv")
+        TransactionCSVHandler.save_transactions(self.transactions, csv_file)
+        index = TopCustomersIndex(csv_file)
+        index.refresh()
+        index.top_customers(START, END, 3)
+
+        replacement = [Transaction(datetime(2023, 5, 1) + timedelta(hours=i), "NEW001", 1.0) for i in range(3)]
+        replacement += self.transactions[:2999]
+        TransactionCSVHandler.save_transactions(replacement, csv_file)
+        assert os.path.getsize(csv_file) > index._offset
+        index.refresh()
+
+        assert index.transactions == 3002
+        expected = self.analytics.get_top_customers(replacement, START, END, 3)
+        assert index.top_customers(START, END, 3) == expected
+
+    def test_missing_file_and_validation(self, tmp_path):
+        """Test a missing file is not loaded and invalid queries are rejected"""
+        index = TopCustomersIndex(str(tmp_path / "missing.csv"))
+        assert index.refresh() == 0
+        assert not index.loaded
+
+        with pytest.raises(ValueError, match="top_n must be positive"):
+            index.top_customers(START, END, 0)
+        with pytest.raises(ValueError, match="Start date must be before end date"):
+            index.top_customers(END, START)
+
+    def test_background_refresh(self, tmp_path):
+        """Test the background task picks up appended rows"""
+        csv_file = str(tmp_path / "transactions.csv")
+        TransactionCSVHandler.save_transactions(self.transactions[:10], csv_file)
+        index = TopCustomersIndex(csv_file, poll_interval=0.01)
+
+        async def run():
+            index.start()
+            await asyncio.sleep(0.05)
+            append_rows(csv_file, self.transactions[10:20])
+            await asyncio.sleep(0.05)
+            await index.stop()
+
+        asyncio.run(run())
+        assert index.transactions == 20
+
+class TestTopCustomersEndpoint:
+    def test_top_customers_endpoint(self, tmp_path, monkeypatch):
+        """Test the endpoint answers from the precomputed index"""
+        transactions = [
+            Transaction(datetime(2023, 1, 1, 10), "CUST1", 10.0),
+            Transaction(datetime(2023, 1, 2, 10), "CUST1", 20.0),
+            Transaction(datetime(2023, 1, 3, 10), "CUST2", 30.0),
+        ]
+        csv_file = str(tmp_path / "transactions.csv")
+        TransactionCSVHandler.save_transactions(transactions, csv_file)
+        index = TopCustomersIndex(csv_file)
+        index.refresh()
+        monkeypatch.setattr(main, "top_customers", index)
+        client = TestClient(main.app)
+
+        response = client.get(
+            "/api/v1/analytics/top-customers",
+            params={"start_date": "2023-01-01T00:00:00", "end_date": "2023-01-31T00:00:00", "top_n": 1}
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["customers"] == [{"customer_id": "CUST1", "transaction_count": 2}]
+        assert data["transactions_indexed"] == 3
+
+    def test_top_customers_endpoint_aware_dates(self, tmp_path, monkeypatch):
+        """Test timezone-aware dates are compared with the CSV's naive local times"""
+        csv_file = str(tmp_path / "transactions.csv")
+        TransactionCSVHandler.save_transactions([
+            Transaction(datetime(2023, 1, 15, 10), "CUST1", 10.0),
+            Transaction(datetime(2023, 6, 1, 10), "CUST2", 20.0),
+        ], csv_file)
+        index = TopCustomersIndex(csv_file)
+        index.refresh()
+        monkeypatch.setattr(main, "top_customers", index)
+        client = TestClient(main.app)
+
+        response = client.get(
+            "/api/v1/analytics/top-customers",
+            params={"start_date": "2023-01-01T00:00:00Z", "end_date": "2023-03-01T00:00:00Z"}
+        )
+
+        assert response.status_code == 200
+        assert response.json()["customers"] == [{"customer_id": "CUST1", "transaction_count": 1}]
+
+    def test_top_customers_endpoint_errors(self, tmp_path, monkeypatch):
+        """Test invalid ranges and unavailable data"""
+        monkeypatch.setattr(main, "top_customers", TopCustomersIndex(str(tmp_path / "missing.csv")))
+        client = TestClient(main.app)
+        params = {"start_date": "2023-02-01T00:00:00", "end_date": "2023-01-01T00:00:00"}
+
+        assert client.get("/api/v1/analytics/top-customers", params=params).status_code == 503
+
+        main.top_customers.loaded = True
+        response = client.get("/api/v1/analytics/top-customers", params=params)
+        assert response.status_code == 400
+        assert "Start date must be before end date" in response.json()["detail"]
@@ -1,8 +1,9 @@
 """
 Tests for the transport routes module.
 """
+from datetime import time
 import pytest
-from src.transport_routes import TransportRouteSystem, Stop
+from src.transport_routes import Departure, TransportRouteSystem, Stop
 
 class TestTransportRouteSystem:
     def setup_method(self):
@@ -153,4 +154,88 @@ class TestTransportRouteSystem:
         self.system.remove_stop_from_route(routes[0], stops[0].id)
         updated_routes = self.system.get_routes_by_stop(stops[0].id)
         assert len(updated_routes) == 1
-        assert routes[2] in updated_routes
\ No newline at end of file
+        assert routes[2] in updated_routes
+
+class TestTimetables:
+    def setup_method(self):
+        """Set up two routes sharing the stop PAR-02"""
+        self.system = TransportRouteSystem()
+        for route_id, stop_ids in {"R1": ["EST-01", "PAR-02", "MER-03"], "R2": ["UNI-05", "PAR-02"]}.items():
+            self.system.add_route(route_id)
+            for stop_id in stop_ids:
+                self.system.add_stop_to_route(route_id, Stop(stop_id, stop_id))
+        # The 8:05 express overtakes the 8:00 trip before MER-03
+        self.system.set_timetable("R1", ["EST-01", "PAR-02", "MER-03"], [
+            [time(8, 0), time(8, 10), time(8, 30)],
+            [time(7, 0), time(7, 10), time(7, 20)],
+            [time(8, 5), time(8, 12), time(8, 20)],
+        ])
+        self.system.set_timetable("R2", ["UNI-05", "PAR-02"], [
+            [time(7, 55), time(8, 11)],
+            [time(8, 25), time(8, 41)],
+        ])
+
+    def test_next_departure(self):
+        """Test next departure lookups on a route"""
+        assert self.system.get_next_departure("R1", "PAR-02", time(7, 11)) == time(8, 10)
+        assert self.system.get_next_departure("R1", "PAR-02", time(8, 10)) == time(8, 10)
+        assert self.system.get_next_departure("R1", "PAR-02", time(8, 12, 1)) is None
+
+    def test_eta_follows_the_trip(self):
+        """Test the ETA uses the arrival of the trip that departs next"""
+        assert self.system.get_eta("R1", "EST-01", "MER-03", time(7, 30)) == (time(8, 0), time(8, 30))
+        assert self.system.get_eta("R1", "EST-01", "MER-03", time(8, 1)) == (time(8, 5), time(8, 20))
+        assert self.system.get_eta("R1", "EST-01", "MER-03", time(9, 0)) is None
+
+    def test_next_departures_across_routes(self):
+        """Test departures from a shared stop are merged across routes"""
+        departures = self.system.get_next_departures("PAR-02", time(8, 10, 30), limit=3)
+        assert departures == [
+            Departure("R2", time(8, 11)),
+            Departure("R1", time(8, 12)),
+            Departure("R2", time(8, 41)),
+        ]
+        assert self.system.get_next_departures("HOS-04", time(8, 0)) == []
+
+    def test_slot_cache_matches_uncached_answers(self):
+        """Test cached time-slot answers are exact for every second of the slot"""
+        all_departures = sorted([
+            (time(7, 10), "R1"), (time(8, 10), "R1"), (time(8, 12), "R1"),
+            (time(8, 11), "R2"), (time(8, 41), "R2"),
+        ])
+        for second in range(60):
+            at = time(8, 10, second)
+            expected = [Departure(route_id, t) for t, route_id in all_departures if t >= at][:2]
+            assert self.system.get_next_departures("PAR-02", at, limit=2) == expected
+        assert (self.system.hits, self.system.misses) == (59, 1)
+
+    def test_cache_invalidated_on_changes(self):
+        """Test new timetables and removed stops are reflected in cached answers"""
+        self.system.get_next_departures("PAR-02", time(8, 0), limit=1)
+        self.system.set_timetable("R2", ["UNI-05", "PAR-02"], [[time(7, 50), time(8, 1)]])
+        assert self.system.get_next_departures("PAR-02", time(8, 0), limit=1) == [Departure("R2", time(8, 1))]
+
+        self.system.remove_stop_from_route("R2", "PAR-02")
+        assert self.system.get_next_departures("PAR-02", time(8, 0), limit=1) == [Departure("R1", time(8, 10))]
+        with pytest.raises(ValueError, match="not found in timetable"):
+            self.system.get_next_departure("R2", "PAR-02", time(8, 0))
+
+    def test_timetable_validation(self):
+        """Test invalid timetables and queries are rejected"""
+        with pytest.raises(ValueError, match="does not exist"):
+            self.system.set_timetable("nonexistent", [], [])
+        with pytest.raises(ValueError, match="not found in route"):
+            self.system.set_timetable("R2", ["EST-01"], [])
+        with pytest.raises(ValueError, match="one time per stop"):
+            self.system.set_timetable("R2", ["UNI-05", "PAR-02"], [[time(8, 0)]])
+        with pytest.raises(ValueError, match="must not decrease"):
+            self.system.set_timetable("R2", ["UNI-05", "PAR-02"], [[time(8, 0), time(7, 0)]])
+        with pytest.raises(ValueError, match="does not come after"):
+            self.system.get_eta("R1", "MER-03", "EST-01", time(8, 0))
+        with pytest.raises(ValueError, match="limit must be positive"):
+            self.system.get_next_departures("PAR-02", time(8, 0), limit=0)
+
+        self.system.add_route("R3")
+        with pytest.raises(ValueError, match="has no timetable"):
+            self.system.get_next_departure("R3", "PAR-02", time(8, 0))
+